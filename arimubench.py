@@ -0,0 +1,486 @@
+"""Benchmarks for the hot paths of the ARIMU hub.
+
+The benchmarks run headless against simulated ARIMUs (see arimusim), and
+the results are written to a JSON file, so that releases can be compared.
+
+    python arimubench.py results.json [quick]
+    python arimubench.py compare base.json new.json
+
+Author: Sivakumar Balasubramanian
+Date: 17 October 2026
+Email: siva82kb@gmail.com
+"""
+
+import asyncio
+import concurrent.futures
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime as dt
+
+import jedi
+from arimusim import ArimuSimulator, make_files, start_simulators
+from asyncarimu import (ArimuAdditionalFlags,
+                        ArimuAsync,
+                        ArimuCommands,
+                        ArimuStates,
+                        IMU_RECORD,
+                        decode_imu_records)
+from jediframe import JediDecoder, encode_frame
+from jeditransport import open_device
+
+# Endings of the names of the results where higher or lower is better.
+HIGHER_IS_BETTER = ("MBps", "kBps", "kBps_per_device", "_per_s")
+LOWER_IS_BETTER = ("_ms", "seconds", "cpu_per_idle_second")
+
+
+def make_jedi_frame(payload):
+    """Returns the JEDI frame for the given payload bytes."""
+    _frame = bytearray([255, 255, len(payload) + 1]) + bytearray(payload)
+    _frame.append(sum(_frame) % 256)
+    return bytes(_frame)
+
+
+def random_bytes(rnd, nbytes):
+    """Returns 'nbytes' random bytes from the random.Random 'rnd'."""
+    if nbytes == 0:
+        return b""
+    return rnd.getrandbits(8 * nbytes).to_bytes(nbytes, "little")
+
+
+def make_jedi_stream(nbytes, seed=0):
+    """Returns a byte stream of about 'nbytes' bytes made of full sized
+    FILECONTENT like frames."""
+    _rnd = random.Random(seed)
+    _frames = []
+    _n = 0
+    while _n < nbytes:
+        _pl = bytes([3, 4, 0, 3, _rnd.randrange(255)]
+                    + [_rnd.randrange(256) for _ in range(249)])
+        _frames.append(make_jedi_frame(_pl))
+        _n += len(_frames[-1])
+    return b"".join(_frames)
+
+
+class _BytePort(object):
+    """A serial port like object that serves bytes from a buffer."""
+
+    def __init__(self, data):
+        self._data = io.BytesIO(data)
+        self._left = len(data)
+
+    @property
+    def in_waiting(self):
+        return self._left
+
+    def inWaiting(self):
+        return self._left
+
+    def read(self, size=1):
+        _data = self._data.read(size)
+        self._left -= len(_data)
+        return _data
+
+
+def _bytewise_parse(port, inform):
+    """The byte-by-byte JEDI parser that was used before the chunked
+    decoder. This is kept here as the reference for the benchmark."""
+    _state = 0
+    while port.inWaiting():
+        _byte = port.read()
+        if _state == 0:
+            if ord(_byte) == 0xff:
+                _state = 1
+        elif _state == 1:
+            if ord(_byte) == 0xff:
+                _state = 2
+            else:
+                _state = 0
+        elif _state == 2:
+            if ord(_byte) == 0:
+                _state = 0
+                continue
+            _N = ord(_byte)
+            _cnt = 0
+            _chksum = 255 + 255 + _N
+            _in_payload = [None] * (_N - 1)
+            _state = 3
+        elif _state == 3:
+            _in_payload[_cnt] = ord(_byte)
+            _chksum += ord(_byte)
+            _cnt += 1
+            if _cnt == _N - 1:
+                _state = 4
+        elif _state == 4:
+            if _chksum % 256 == ord(_byte):
+                inform(_in_payload)
+            _state = 0
+
+
+def _chunked_parse(port, inform, chunksz):
+    """Reads what is waiting on the port in chunks, and decodes it with the
+    chunked JEDI decoder."""
+    _decoder = JediDecoder()
+    while port.in_waiting:
+        for _payload in _decoder.feed(port.read(chunksz)):
+            inform(_payload)
+
+
+def bench_frame_parse(nbytes=1 << 20, chunksz=4096):
+    """Compares the throughput (MB/s) of the byte-by-byte parser and the
+    chunked decoder on the same byte stream."""
+    _stream = make_jedi_stream(nbytes)
+    _res = {}
+    for _name, _parse in (("bytewise", _bytewise_parse),
+                          ("chunked", lambda p, f: _chunked_parse(p, f, chunksz))):
+        _frames = []
+        _strt = time.perf_counter()
+        _parse(_BytePort(_stream), _frames.append)
+        _dur = time.perf_counter() - _strt
+        _res[_name] = {"frames": len(_frames),
+                       "seconds": _dur,
+                       "MBps": len(_stream) / _dur / 1e6}
+    return _res
+
+
+def bench_idle_reader_cpu(seconds=2.0):
+    """Measures the CPU time used per second by a JEDI reader thread waiting
+    on a port with no incoming data. A pseudo-terminal stands in for the
+    docked watch, so this runs only where pseudo-terminals are available."""
+    _master, _slave = os.openpty()
+    _reader = jedi.JediComm(os.ttyname(_slave), 115200,
+                            inform=lambda payload: None)
+    _reader.start()
+    time.sleep(0.2)
+    _cpu = time.process_time()
+    _strt = time.perf_counter()
+    time.sleep(seconds)
+    _cpu = time.process_time() - _cpu
+    _dur = time.perf_counter() - _strt
+    _reader.abort()
+    _reader.join()
+    os.close(_master)
+    os.close(_slave)
+    return {"seconds": _dur,
+            "cpu_seconds": _cpu,
+            "cpu_per_idle_second": _cpu / _dur}
+
+
+def _latency_stats(latencies):
+    """Returns the p50/p99 and the mean of the given latencies in ms."""
+    _ms = sorted(_l * 1e3 for _l in latencies)
+    return {"n": len(_ms),
+            "p50_ms": _ms[len(_ms) // 2],
+            "p99_ms": _ms[min(len(_ms) - 1, int(0.99 * len(_ms)))],
+            "mean_ms": statistics.mean(_ms)}
+
+
+def bench_loopback_throughput(nbytes=8 << 20, chunksz=4096):
+    """Measures the throughput (MB/s) of a JEDI reader thread receiving a
+    stream of frames over an in-process memory link, i.e. the cost of the
+    reader and the decoder without the limits of a real port."""
+    _stream = make_jedi_stream(nbytes)
+    _nframes = len(JediDecoder().feed(_stream))
+    _dev = open_device("mem://bench_loopback")
+    _done = threading.Event()
+    _count = [0]
+
+    def _inform(payload):
+        _count[0] += 1
+        if _count[0] == _nframes:
+            _done.set()
+
+    _reader = jedi.JediComm(_dev.host_url, inform=_inform)
+    _reader.start()
+    _strt = time.perf_counter()
+    for i in range(0, len(_stream), chunksz):
+        _dev.write(_stream[i:i + chunksz])
+    _done.wait(60)
+    _dur = time.perf_counter() - _strt
+    _reader.abort()
+    _dev.close()
+    return {"frames": _count[0],
+            "seconds": _dur,
+            "MBps": len(_stream) / _dur / 1e6}
+
+
+def _open_arimus(urls):
+    """Opens an ArimuAsync on each of the given URLs. They are opened in
+    parallel, as each open waits for the board to reset."""
+    with concurrent.futures.ThreadPoolExecutor(len(urls)) as _ex:
+        return list(_ex.map(ArimuAsync, urls))
+
+
+async def _closing(arimus, coro):
+    """Runs the coroutine, and closes the ARIMUs on the running loop after
+    it."""
+    try:
+        return await coro
+    finally:
+        for _a in arimus:
+            _a.close()
+
+
+def bench_command_latency(n=200, url="mem://bench_latency"):
+    """Measures the round trip latency of ArimuAsync commands against a
+    simulated ARIMU on the given device URL (see jeditransport), and returns
+    the p50/p99 latency of each command."""
+    _sim = ArimuSimulator(url, name="ARIMU_bench", seed=0,
+                          files=make_files("bench", nfiles=20, nrecords=(1, 1)))
+    _sim.start()
+
+    async def _listfiles(arimu):
+        return [_r async for _r in arimu.listfiles()]
+
+    async def _run(arimu):
+        await arimu.startdockstncomm()
+        _cmds = (("status", lambda: arimu.status()),
+                 ("ping", lambda: arimu.ping()),
+                 ("getsubject", lambda: arimu.getsubject()),
+                 ("settime", lambda: arimu.settime(dt.now())),
+                 ("gettime", lambda: arimu.gettime()),
+                 ("listfiles", lambda: _listfiles(arimu)))
+        _res = {}
+        for _name, _cmd in _cmds:
+            _lat = []
+            for _ in range(n):
+                _strt = time.perf_counter()
+                await _cmd()
+                _lat.append(time.perf_counter() - _strt)
+            _res[_name] = _latency_stats(_lat)
+        return _res
+
+    _arimu = ArimuAsync(_sim.host_url)
+    try:
+        return asyncio.run(_closing([_arimu], _run(_arimu)))
+    finally:
+        _sim.stop()
+
+
+def bench_listfiles(nfiles=10000, url="mem://bench_listfiles"):
+    """Measures the time taken to get the list of 'nfiles' files from a
+    simulated ARIMU."""
+    _files = {f"bench_data_{1700000000 + 60 * i}.bin": b""
+              for i in range(nfiles)}
+    _sim = ArimuSimulator(url, files=_files, seed=0)
+    _sim.start()
+
+    async def _run(arimu):
+        await arimu.startdockstncomm()
+        _names = []
+        _strt = time.perf_counter()
+        async for _r in arimu.listfiles(timeout=5.0):
+            if _r[0] is None:
+                break
+            _names += _r[3]
+        return len(_names), time.perf_counter() - _strt
+
+    _arimu = ArimuAsync(_sim.host_url)
+    try:
+        _n, _dur = asyncio.run(_closing([_arimu], _run(_arimu)))
+    finally:
+        _sim.stop()
+    return {"files": _n,
+            "seconds": _dur,
+            "files_per_s": _n / _dur}
+
+
+async def _download(arimu, fname):
+    """Gets a file with GETFILEDATA, and returns the number of bytes
+    received."""
+    _n = 0
+    async for _r in arimu.getfiledata(fname):
+        if _r[0] is None:
+            break
+        if _r[3][0] == ArimuAdditionalFlags.FILECONTENT:
+            _n += len(_r[3][2])
+    return _n
+
+
+def bench_getfiledata(sizes_mb=(1, 10, 100), url="mem://bench_getfiledata"):
+    """Measures the GETFILEDATA throughput (kB/s) for files of the given
+    sizes (MB) from a simulated ARIMU on a link with no rate limit."""
+    _rnd = random.Random(0)
+    _sim = ArimuSimulator(url, files={}, seed=0)
+    _sim.start()
+
+    async def _run(arimu):
+        await arimu.startdockstncomm()
+        _res = {}
+        for _mb in sizes_mb:
+            _sim.files = {"bench.bin": random_bytes(_rnd, int(_mb * (1 << 20)))}
+            _strt = time.perf_counter()
+            _n = await _download(arimu, "bench.bin")
+            _dur = time.perf_counter() - _strt
+            _res[f"{_mb}MB"] = {"bytes": _n,
+                                "seconds": _dur,
+                                "kBps": _n / _dur / 1e3}
+        return _res
+
+    _arimu = ArimuAsync(_sim.host_url)
+    try:
+        return asyncio.run(_closing([_arimu], _run(_arimu)))
+    finally:
+        _sim.stop()
+
+
+def bench_stream_decode(nsamples=100000):
+    """Measures the rate (samples/s) at which STARTSTREAM frames are decoded
+    into IMU samples."""
+    _rnd = random.Random(0)
+    _stream = b"".join(
+        encode_frame(bytes([ArimuCommands.STARTSTREAM, ArimuStates.STREAMING, 0])
+                     + IMU_RECORD.pack(1700000000 + i // 100, i * 10000,
+                                       *[_rnd.randint(-2048, 2047)
+                                         for _ in range(6)]))
+        for i in range(nsamples)
+    )
+    _decoder = JediDecoder()
+    _samples = []
+    _strt = time.perf_counter()
+    for i in range(0, len(_stream), 4096):
+        for _pl in _decoder.feed(_stream[i:i + 4096]):
+            _samples.append(IMU_RECORD.unpack_from(_pl, 3))
+    _dur = time.perf_counter() - _strt
+    return {"samples": len(_samples),
+            "seconds": _dur,
+            "samples_per_s": len(_samples) / _dur}
+
+
+def bench_bin_decode(nbytes=16 << 20):
+    """Measures the throughput (MB/s) of decoding the IMU records of a .bin
+    data file."""
+    _data = random_bytes(random.Random(0),
+                         nbytes - nbytes % IMU_RECORD.size)
+    _strt = time.perf_counter()
+    _recs = decode_imu_records(_data)
+    _dur = time.perf_counter() - _strt
+    return {"records": len(_recs),
+            "seconds": _dur,
+            "MBps": len(_data) / _dur / 1e6,
+            "records_per_s": len(_recs) / _dur}
+
+
+def bench_download_scaling(ndevices=(1, 2, 4, 8, 16, 32), filesz=32 << 10,
+                           link_rate=11520):
+    """Measures the total and per device GETFILEDATA throughput (kB/s) when
+    a file of 'filesz' bytes is downloaded from N simulated ARIMUs at once,
+    each on a link of 'link_rate' bytes/s (115200 baud)."""
+    _res = {}
+    for _N in ndevices:
+        _sims = start_simulators(_N, f"mem://bench_scaling{_N}_",
+                                 link_rate=link_rate)
+        for _sim in _sims:
+            _sim.files = {"bench.bin": random_bytes(random.Random(0), filesz)}
+        _arimus = _open_arimus([_sim.host_url for _sim in _sims])
+
+        async def _run():
+            await asyncio.gather(*[_a.startdockstncomm() for _a in _arimus])
+            _strt = time.perf_counter()
+            _n = await asyncio.gather(*[_download(_a, "bench.bin")
+                                        for _a in _arimus])
+            return sum(_n), time.perf_counter() - _strt
+
+        try:
+            _n, _dur = asyncio.run(_closing(_arimus, _run()))
+        finally:
+            for _sim in _sims:
+                _sim.stop()
+        _res[str(_N)] = {"bytes": _n,
+                         "seconds": _dur,
+                         "kBps": _n / _dur / 1e3,
+                         "kBps_per_device": _n / _dur / 1e3 / _N}
+    return _res
+
+
+def run_benchmarks(quick=False):
+    """Runs all the benchmarks, and returns the results with the details of
+    the run. 'quick' runs smaller versions of the slow benchmarks."""
+    _res = {
+        "frame_parse": bench_frame_parse(),
+        "loopback_throughput": bench_loopback_throughput(),
+        "command_latency": bench_command_latency(n=50 if quick else 200),
+        "listfiles": bench_listfiles(1000 if quick else 10000),
+        "getfiledata": bench_getfiledata((1,) if quick else (1, 10, 100)),
+        "stream_decode": bench_stream_decode(),
+        "bin_decode": bench_bin_decode(),
+        "download_scaling": bench_download_scaling((1, 4) if quick
+                                                   else (1, 2, 4, 8, 16, 32)),
+    }
+    if hasattr(os, "openpty"):
+        _res["idle_reader_cpu"] = bench_idle_reader_cpu()
+    return {"meta": _run_details(quick), "results": _res}
+
+
+def _run_details(quick):
+    try:
+        _rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))
+                              ).stdout.strip()
+    except OSError:
+        _rev = ""
+    return {"time": dt.now().isoformat(),
+            "revision": _rev,
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "quick": quick}
+
+
+def _flatten(res, prefix=""):
+    """Returns the numbers in the nested results as {"a.b.c": value}."""
+    _flat = {}
+    for _k, _v in res.items():
+        if isinstance(_v, dict):
+            _flat.update(_flatten(_v, f"{prefix}{_k}."))
+        elif isinstance(_v, (int, float)) and not isinstance(_v, bool):
+            _flat[f"{prefix}{_k}"] = _v
+    return _flat
+
+
+def compare_results(base, new, tolerance=0.1):
+    """Compares two sets of results from run_benchmarks, and returns the
+    list of (metric, base, new) that got worse by more than 'tolerance'."""
+    _base = _flatten(base["results"])
+    _new = _flatten(new["results"])
+    _worse = []
+    for _k in sorted(set(_base) & set(_new)):
+        _b, _n = _base[_k], _new[_k]
+        if _b == 0:
+            continue
+        if _k.endswith(HIGHER_IS_BETTER):
+            if _n < _b * (1 - tolerance):
+                _worse.append((_k, _b, _n))
+        elif _k.endswith(LOWER_IS_BETTER):
+            if _n > _b * (1 + tolerance):
+                _worse.append((_k, _b, _n))
+    return _worse
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "compare":
+        # python arimubench.py compare base.json new.json
+        with open(sys.argv[2]) as _f:
+            _base = json.load(_f)
+        with open(sys.argv[3]) as _f:
+            _new = json.load(_f)
+        _worse = compare_results(_base, _new)
+        for _k, _b, _n in _worse:
+            sys.stdout.write(f"{_k:<50} {_b:12.4f} -> {_n:12.4f}\n")
+        sys.stdout.write(f"{len(_worse)} regressions.\n")
+        sys.exit(1 if _worse else 0)
+    # python arimubench.py [results.json] [quick]
+    _out = sys.argv[1] if len(sys.argv) > 1 else "arimubench_results.json"
+    _res = run_benchmarks(quick="quick" in sys.argv[2:])
+    with open(_out, "w") as _f:
+        json.dump(_res, _f, indent=2)
+    for _k, _v in _flatten(_res["results"]).items():
+        sys.stdout.write(f"{_k:<50} {_v:14.4f}\n")
+    sys.stdout.write(f"Results written to {_out}.\n")
@@ -1,534 +1,775 @@
-"""Arimu Data Reader module for reading data from Arimu device(s).
-
-Author: Sivakumar Balasubramanian
-Date: 01 October 2022
-email: siva82kb@gmail.com
-"""
-
-import glob
-import sys
-from datetime import datetime as dt
-from datetime import timedelta as tdelta
-import enum
-from pathlib import Path
-import os
-import time
-
-# from PyQt5.QtGui import QTextCursor
-from PyQt5 import (
-    QtWidgets,)
-from PyQt5.QtCore import (
-    pyqtSignal,
-    QTimer,)
-# from PyQt5.QtWidgets import (
-#     QInputDialog,
-# )
-from arimuworker import ArimuDocWorker
-
-# import qtjedi
-from serial.tools.list_ports import comports
-
-from arimu_dreader_ui import Ui_ArimuDataReader
-# import _arimuworker
-from asyncarimu import ArimuAdditionalFlags
-from asyncarimu import (ArimuAdditionalFlags,)
-# from misc import (ProgressBar,)
-
-import logging
-import logging.config
-log = logging.getLogger(__name__)
-
-
-class ArmuRecorderStates(enum.Enum):
-    Start = 0
-    FindingSensors = 1
-    SensorsNotFound = 2
-    SensorsNotSelected = 3
-    WAITINGTOSTART = 4
-    WaitingToRecordTask = 5
-    RecordingTask = 6
-    ALLDONE = 7
-
-
-class DockStnReports(enum.Enum):
-    NEW = 0
-    APPEND = 1
-    OVERWRITE = 2
-    
-    def __str__(self):
-        return self.name
-
-
-class ArimuDataReaderStates(enum.Enum):
-    WAITINGTOSTART = 0
-    CONNECTTODEVICE = 1
-    GETFILELIST = 2
-    READINGFILESSTART = 3
-    READINGFILESLOGGING = 4
-    DELETINGFILES = 5
-    ALLDONE = 6
-
-
-class ArimuDataReader(QtWidgets.QMainWindow, Ui_ArimuDataReader):
-    """Main window of the ARIMU Data Reader.
-    """
-    # Watch dog time threshold
-    WATCHDOG_THRESHOLD = 5
-    close_signal = pyqtSignal()
-
-    def __init__(self, *args, **kwargs) -> None:
-        """View initializer."""
-        super(ArimuDataReader, self).__init__(*args, **kwargs)
-        self.setupUi(self)
-
-        # Fix size.
-        self.setFixedSize(self.geometry().width(),
-                          self.geometry().height())
-
-        # Set up console variables
-        self._max_lines = 24
-        self._console_text = []
-        self.display_text("ARIMU Data Reader")
-        self.display_text("-----------------")
-        self.display_text("Please selecte ARIMUs to read data from.")
-        
-        # Status text
-        self._statustext = ''
-        self._datarate = 0
-
-        # Search COM ports with ARIMUs connected.
-        self._comports = []
-        self._comportinx = 0
-        self._connected = False
-        self.update_list_of_comports()
-
-        # Data reader statemachine.
-        self._state : ArimuDataReaderStates = ArimuDataReaderStates.WAITINGTOSTART
-        self._setup_statehandlrs()
-
-        # ARIMU workers to get the data.
-        self.arimuwrkr = None
-        self.outdir = "subjectdata"
-        self.arimudata = {"allfiles": [],
-                          "subjs": [],
-                          "toget": [],
-                          "got": [],
-                          "notgot": [],
-                          "currfilename": '',
-                          "currfiledata": [],
-                          "filestodelete": None}
-
-        # ARIMU individual file reading flag.
-        self._readingcurrfile = False
-
-        # Attach callbacks
-        self.list_comports.itemSelectionChanged.connect(self._callback_com_item_changed)
-        self.btn_refresh_comports.clicked.connect(self._callback_refresh_comports)
-        self.btn_start_data_reading.clicked.connect(self._callback_start_reading)
-
-        # Variables for setting time on the devices after getting the data.
-        # ARIMU workers to set the time on the devices.
-        self._timesetwrkrs = [] 
-
-        # Populate the list of ARIMU devices.
-        self._datetimer = QTimer()
-        self._datetimer.timeout.connect(self._callback_datetimer)
-        self._datetimer.start(1000)
-        # A Timer that is activated when the data reading is in progress.
-        self._watchdogcounter = 0
-        self._data_read_progress_timer = QTimer()
-        self._data_read_progress_timer.timeout.connect(self._callback_data_read_progress_timer)
-        # A Timer for setting time on the watches.
-        self._time_setter_timer = QTimer()
-        self._time_setter_timer.timeout.connect(self._callback_time_setter_timer)
-        
-        # Update UI
-        self.update_ui()
-
-    def update_list_of_comports(self):
-        # Clear the current list.
-        self.list_comports.clear()
-        for p in comports():
-            # Found a COM port. Now check if this is 
-            self.list_comports.addItem(p.name)
-
-    def display_text(self, text, text_type=DockStnReports.NEW):
-        if text_type == DockStnReports.NEW:
-            self._console_text.append(text)
-            if len(self._console_text) > self._max_lines:
-                self._console_text.pop(0)
-        elif text_type == DockStnReports.APPEND:
-            self._console_text[-1] = self._console_text[-1] + text
-        else:
-            self._console_text[-1] = text
-
-        # Update the console text.
-        self.lbl_console.setText("\n".join(self._console_text))
-
-    def status_text(self, text, text_type=DockStnReports.NEW):
-        if text_type == DockStnReports.NEW:
-            self._statustext = text
-        else:
-            self._statustext += text
-
-        # Update the console text.
-        self.lbl_status.setText(self._statustext)
-
-    def update_ui(self):
-        print(self._comports)
-        # Enable refrsh button.
-        self.btn_refresh_comports.setEnabled(len(self._comports) == 0)
-
-        # Enable start data reading buttons.
-        self.btn_start_data_reading.setEnabled(
-            self.list_comports.count() > 0 and
-            len(self.list_comports.selectedItems()) > 0
-        )
-        
-        # If device is connected, then disable the list of COM ports.
-        if self._state != ArimuDataReaderStates.WAITINGTOSTART:
-            self.list_comports.setEnabled(False)
-            self.btn_refresh_comports.setEnabled(False)
-            self.btn_start_data_reading.setEnabled(False)
-
-    def _callback_refresh_comports(self):
-        self.update_list_of_comports()
-        self.update_ui()
-
-    def _callback_com_item_changed(self):
-        self.update_ui()
-
-    def _callback_datetimer(self):
-        self.lbl_datetime.setText(dt.now().strftime("%A, %d. %B %Y %I:%M:%S%p"))
-
-    def _callback_data_read_progress_timer(self):
-        """Runs only when the data reading is in progress."""
-        if self._state == ArimuDataReaderStates.READINGFILESLOGGING:
-            # Check the watchdog counter
-            self._watchdogcounter += 1
-            if self._watchdogcounter == ArimuDataReader.WATCHDOG_THRESHOLD:
-                self.status_text("WD: ON | ")
-                # The watchdog has timed out. Stop the data reading.
-                _str = f"> Getting {self.arimudata['currfilename']} ... Failed!"
-                self.display_text(_str, text_type=DockStnReports.OVERWRITE)
-                # Move read file to "got" and clear reading file flag.
-                self.arimudata['notgot'].append(self.arimudata['currfilename'])
-                self._readingcurrfile = False
-            else:
-                self.status_text("WD: OFF | ")
-            
-            # Update date rate
-            self.status_text(f"{self._datarate / 1024:3.1f} kBps | ", text_type=DockStnReports.APPEND)
-            self._datarate = 0
-            
-            # Check if current file is done.
-            if self._readingcurrfile is False:
-                # Call the file logging handler.
-                self._data_read_progress_timer.stop()
-                self._state_handlers[self._state]()
-    
-    def _callback_time_setter_timer(self):
-        """Runs when all data has been obtained. to regularly set the time on the watches.
-        """
-        if self._state == ArimuDataReaderStates.ALLDONE:
-            # Go through the different compots, connect to them and set the time.
-            _nowstr = dt.now().strftime('%d/%m/%y %H:%M:%S.%f')
-            self.display_text(f"> Setting time to {_nowstr} on ",
-                              text_type=DockStnReports.OVERWRITE)
-            for i, _com in enumerate(self._comports):
-                self._timesetwrkrs[i].set_time()
-                self.display_text(f"{_com} ", text_type=DockStnReports.APPEND)
-
-    def _callback_start_reading(self):
-        # Get the list of COM ports.
-        self._comports = [_it.text() for _it in self.list_comports.selectedItems()]
-
-        # State the state machine for reading data.
-        self._state = ArimuDataReaderStates.WAITINGTOSTART
-        self._state_handlers[self._state]()
-        self.update_ui()
-
-    def _setup_statehandlrs(self):
-        self._state_handlers = {
-            ArimuDataReaderStates.WAITINGTOSTART: self._handle_waiting_to_start,
-            ArimuDataReaderStates.CONNECTTODEVICE: self._handle_connect_to_device,
-            ArimuDataReaderStates.READINGFILESSTART: self._handle_reading_files_start,
-            ArimuDataReaderStates.READINGFILESLOGGING: self._handle_start_logging_files,
-            ArimuDataReaderStates.DELETINGFILES: self._handle_deleting_files,
-            ArimuDataReaderStates.ALLDONE: self._handle_all_done,
-        }
-
-    def _handle_arimuwrkr_connect_response(self, devname):
-        self._state = ArimuDataReaderStates.CONNECTTODEVICE
-        self._state_handlers[self._state](devname)
-
-    def _handle_arimuwrkr_filelist_response(self, filelist):
-        # Check if the list is empty.
-        if len(filelist) > 0:
-            # Check if this is the first packet.
-            self.arimudata['allfiles'] += tuple(filelist[0])
-            self.display_text(f"> Gettting list of files. [{len(self.arimudata['allfiles']):3d}]",
-                              text_type=DockStnReports.OVERWRITE)
-        else:
-            # Check if there are files from the device.
-            if len(self.arimudata['allfiles']) == 0:
-                self.display_text("> No files to be read.", text_type=DockStnReports.NEW)
-                 # Change state to start getting files for the different subjects.
-                self._state = ArimuDataReaderStates.ALLDONE
-                self._state_handlers[self._state]()
-                return
-            
-            # There are files to be read.
-            # Empty list of files. That marks the end of the response.
-            # 1. Find the list of files with the 'data' in its name and with
-            # the '.bin' extension.
-            self.arimudata['allfiles'] = [
-                _f for _f in self.arimudata['allfiles']
-                if "data" in _f and ".bin" in _f
-            ]
-
-            # 2. Get subjects from the file list.
-            self.arimudata['subjs'] = list(set([_f.split('_')[0] for _f in self.arimudata['allfiles']]))
-            self.display_text(f"> Subjects found: {', '.join(self.arimudata['subjs'])}",
-                              text_type=DockStnReports.NEW)
-
-            # 3. Create subject directories.
-            for _s in self.arimudata['subjs']:
-                # Create subject folders if they do not exist.
-                # Check if the directroy exits, else create it.
-                Path(os.sep.join((self.outdir, _s))).mkdir(parents=True, exist_ok=True)
-
-            # 3. Change state to start getting files for the different subjects.
-            self._state = ArimuDataReaderStates.READINGFILESSTART
-            self._state_handlers[self._state]()
-
-    def _handle_arimuwrkr_filedata_response(self, filedata):
-        # Check if its the file header
-        self._watchdogcounter = 0
-        if filedata[0] == ArimuAdditionalFlags.NOFILE:
-            # The current file was not found. Skip the current file.
-            pass
-        elif filedata[0] == ArimuAdditionalFlags.FILEHEADER:
-            # Header of the current file. Create a new file.
-            pass
-        elif filedata[0] == ArimuAdditionalFlags.FILECONTENT:
-            # Content of the current file. Save file data.
-            self.arimudata['currfiledata'] += filedata[1][1:]
-            _filestoget = [_f[0] for _f in self.arimudata['toget'] if _f[1] is True]
-            _str = " ".join((f"> Getting {self.arimudata['currfilename']}",
-                            f"({100 * filedata[1][0] / 255:3.1f}%)",
-                            f"[{len(_filestoget):3d} files left]"))
-            self.display_text(_str, text_type=DockStnReports.OVERWRITE)
-            # Numnber of bytes obtained.
-            self._datarate += len(filedata[1][1:])
-            # Check if this is the last packet.
-            if filedata[1][0] == 255:
-                # All data obtained. Write data to file.
-                # Get subject name.
-                _s = self.arimudata['currfilename'].split('_', maxsplit=1)[0]
-                with open(os.sep.join((self.outdir, _s, self.arimudata['currfilename'])), 'wb') as _f:
-                    _f.write(bytearray(self.arimudata['currfiledata']))
-                _str = f"> Getting {self.arimudata['currfilename']} ... Done!"
-                self.display_text(_str, text_type=DockStnReports.OVERWRITE)
-
-                # Move read file to "got" and clear reading file flag.
-                self.arimudata['got'].append(self.arimudata['currfilename'])
-                self._readingcurrfile = False
-
-    def _handle_arimuwrkr_filedelete_response(self):
-        # Check if all files are done.
-        if len(self.arimudata['filestodelete']) == 0:
-            self.display_text("Done deleting old files!", text_type=DockStnReports.NEW)
-            return
-
-        # More files to delete.
-        self._state_handlers[self._state]()
-
-    def _handle_all_done(self):
-        """All done with reading files.
-        """
-        # Disconnect the current device.
-        self.arimuwrkr.disconnect()
-        # Clear all other variables.
-        self.arimudata["allfiles"] = []
-        self.arimudata["subjs"] = []
-        self.arimudata["toget"] = []
-        self.arimudata["got"] = []
-        self.arimudata["notgot"] = []
-        self.arimudata["currfilename"] = ''
-        self.arimudata["currfiledata"] = []
-        self.arimudata["filestodelete"] = None
-
-        # Get to the next comport.
-        self._comportinx += 1
-        # Check if all comports have been handled.
-        if self._comportinx >= len(self._comports) :
-            self.display_text("> Done with all devices!")
-            #
-            # Set time till the devices are removed.
-            for _com in self._comports:
-                self._timesetwrkrs.append(
-                    ArimuDocWorker(_com, "noone", "data", donotdelete=True)
-                )
-                self._timesetwrkrs[-1].connect()
-                self._timesetwrkrs[-1].set_time()
-            self.display_text(f"> Setting time to {dt.now().strftime('%d/%m/%y %H:%M:%S.%f')}", text_type=DockStnReports.NEW)
-            # Start time for regular time setting
-            self._time_setter_timer.start(1000)
-            return
-
-        # More devices left.
-        self._state = ArimuDataReaderStates.WAITINGTOSTART
-        self._state_handlers[self._state]()
-
-    def _handle_deleting_files(self):
-        """Deleting old files on the device.
-        """
-        # Check if this is the first call to the function.
-        if self.arimudata['filestodelete'] is None:
-            self.display_text("> Looking for files to delete ... ", text_type=DockStnReports.NEW)
-            _today = dt.now()
-            _filedates = [(_f, dt.fromtimestamp(int(_f.split('_')[-1].split('.')[0])))
-                        for _f in self.arimudata['allfiles']]
-            self.arimudata['filestodelete'] = [_fd[0] for _fd in _filedates
-                                            if (_today - _fd[1]) > tdelta(days=7)]
-            self.arimuwrkr.file_delete.connect(self._handle_arimuwrkr_filedelete_response)
-            self.display_text(f"found {len(self.arimudata['filestodelete'])}.", text_type=DockStnReports.APPEND)
-
-        # Check if there are more files to be deleted.
-        if len(self.arimudata['filestodelete']) == 0:
-            self.display_text("> Done deleting old files!", text_type=DockStnReports.NEW)
-            # Change state to all done.
-            self._state = ArimuDataReaderStates.ALLDONE
-            self._state_handlers[self._state]()
-            return
-        
-        # There are files to delete.
-        _nextfile = self.arimudata['filestodelete'].pop(0)
-        self.arimuwrkr.delete_file(_nextfile)
-
-    def _handle_start_logging_files(self):
-        """Start logging data ready from the device.
-        """
-        # Get the next file.
-        _toget = False
-        while _toget is False and len(self.arimudata['toget']) > 0:
-            _filename, _toget = self.arimudata['toget'].pop(0)
-
-        # Check if there are still files to get.
-        if len(self.arimudata['toget']) == 0:
-            self.display_text("> Got all files!", text_type=DockStnReports.NEW)
-
-            # Change state to deleting files.
-            self._state = ArimuDataReaderStates.DELETINGFILES
-            self._state_handlers[self._state]()
-            return
-        
-        # Get file from the device.
-        self.display_text(f"> Getting {_filename}", text_type=DockStnReports.NEW)
-        self.arimudata['currfilename'] = _filename
-        self.arimudata['currfiledata'] = []
-        self._readingcurrfile = True
-        # Connect file data handler if it is not already connected.
-        try:
-            self.arimuwrkr.file_data.disconnect()
-        except TypeError:
-            pass
-        self.arimuwrkr.file_data.connect(self._handle_arimuwrkr_filedata_response)
-        self.arimuwrkr.get_file_data(_filename)
-
-        # Start the data reading progress timer.
-        self._data_read_progress_timer.start(1000)
-
-    def _handle_reading_files_start(self):
-        """Start reading files on the device. This functions generates the list
-        of files that need to be read.
-        """
-        _toget = []
-        for _s in self.arimudata['subjs']:
-            # Get the list of files for this subject.
-            _subjfiles = [_f for _f in self.arimudata['allfiles'] if _s == _f.split('_')[0]]
-            # Existing files.
-            _exstfiles = [_ef.split(os.sep)[-1]
-                          for _ef in glob.glob(os.sep.join((self.outdir, _s, "*.bin")))]
-            # Files to get
-            _toget += [_f for _f in _subjfiles if _f not in _exstfiles]
-
-        # Update the list of files to get.
-        self.arimudata['toget'] = [
-            (_f, _f in _toget)
-            for _f in self.arimudata['allfiles']
-        ]
-
-        # Change state to start logging files.
-        self._state = ArimuDataReaderStates.READINGFILESLOGGING
-        self._state_handlers[self._state]()
-
-    def _handle_waiting_to_start(self, *args):
-        """Check if there are any devices from which data is to be read.
-        """
-        if self._comportinx == len(self._comports):
-            self._state = ArimuDataReaderStates.WAITINGTOSTART
-            return
-        # There are devices from which data is to be read.
-        # Create a Arimu worker for this device.
-        self.arimuwrkr = ArimuDocWorker(self._comports[self._comportinx], "noone",
-                                        "data", donotdelete=True)
-        self.arimuwrkr.connect_response.connect(self._handle_arimuwrkr_connect_response)
-        self.arimuwrkr.connect()
-        self.display_text(f"> Connecting to {self._comports[self._comportinx]}.")
-
-    def _handle_connect_to_device(self, *args):
-        # Check if the device is an ARIMU device.
-        if "ARIMU" in args[0]:
-            self.display_text(f" Device is {args[0]}.", text_type=DockStnReports.APPEND)
-            # Get file list.
-            # Clear variables.
-            self.arimudata["allfiles"] = []
-            self.arimudata["subjs"] = []
-            self.arimudata["toget"] = []
-            self.arimudata["got"] = []
-            self.arimudata["notgot"] = []
-            self.arimudata["currfilename"] = ''
-            self.arimudata["currfiledata"] = []
-            self.arimudata["filestodelete"] = None
-            # Get files
-            self.arimuwrkr.file_list.connect(self._handle_arimuwrkr_filelist_response)
-            self.arimuwrkr.get_filelist()
-            self.display_text("> Gettting list of files.")
-
-            # update UI
-            self.update_ui()
-
-    def _subjs_and_files(self):
-        for _s, _sf in self.arimudata['subjfiles'].items():
-            for _f in _sf:
-                yield _s, _f
-
-    def _get_data_files(self, filedetails, subj):
-        # Display subject details
-        self.display_text(f"> Subject: {subj} (To get: {len(filedetails['toget'])}).",
-                          text_type=DockStnReports.NEW)
-        time.sleep(0.1)
-        # Go through all files and get them.
-        _inx = 0
-        self._readingcurrfile = False
-        while True:
-            # Check if the current file is still being read.
-            if self._readingcurrfile:
-                time.sleep(0.01)
-                continue
-            # Get the next file.
-            _f = filedetails['toget'][_inx]
-            self.display_text(f"> Getting {_f}.", text_type=DockStnReports.NEW)
-
-    def closeEvent(self, event):
-        self.close_signal.emit()
-
-
-if __name__ == "__main__":
-    app = QtWidgets.QApplication(sys.argv)
-    mywin = ArimuDataReader()
-    # ImageUpdate()
-    mywin.show()
+"""Arimu Data Reader module for reading data from Arimu device(s).
+
+Author: Sivakumar Balasubramanian
+Date: 01 October 2022
+email: siva82kb@gmail.com
+"""
+
+import sys
+from datetime import datetime as dt
+from datetime import timedelta as tdelta
+import enum
+from pathlib import Path
+import asyncio
+import os
+import threading
+import time
+
+# from PyQt5.QtGui import QTextCursor
+from PyQt5 import (
+    QtWidgets,)
+from PyQt5.QtCore import (
+    pyqtSignal,
+    Qt,
+    QTimer,)
+# from PyQt5.QtWidgets import (
+#     QInputDialog,
+# )
+from arimuworker import ArimuDocWorkerPool
+from arimudiscovery import ArimuDiscovery
+from arimuhotplug import ATTACH, DETACH, port_watcher, same_port
+
+# import qtjedi
+
+from arimu_dreader_ui import Ui_ArimuDataReader
+# import _arimuworker
+from asyncarimu import ArimuAdditionalFlags
+from asyncarimu import (ArimuAdditionalFlags,)
+from arimudownload import ArimuDownloader, DeviceProgress, is_data_file
+from arimumanifest import ArimuManifest
+from arimuretry import LatencyWatchdog
+from arimuschedule import NEWEST_FIRST, DownloadScheduler
+from misc import PartFileWriter
+
+import logging
+import logging.config
+log = logging.getLogger(__name__)
+
+
+class ArmuRecorderStates(enum.Enum):
+    Start = 0
+    FindingSensors = 1
+    SensorsNotFound = 2
+    SensorsNotSelected = 3
+    WAITINGTOSTART = 4
+    WaitingToRecordTask = 5
+    RecordingTask = 6
+    ALLDONE = 7
+
+
+class DockStnReports(enum.Enum):
+    NEW = 0
+    APPEND = 1
+    OVERWRITE = 2
+    
+    def __str__(self):
+        return self.name
+
+
+class ArimuDataReaderStates(enum.Enum):
+    WAITINGTOSTART = 0
+    CONNECTTODEVICE = 1
+    GETFILELIST = 2
+    READINGFILESSTART = 3
+    READINGFILESLOGGING = 4
+    DELETINGFILES = 5
+    ALLDONE = 6
+
+
+class ArimuDataReader(QtWidgets.QMainWindow, Ui_ArimuDataReader):
+    """Main window of the ARIMU Data Reader.
+    """
+    # Time (seconds) without a packet of the file being read after which
+    # the watchdog gives up on it, till the time between the packets is
+    # known; then the watchdog adapts to it (see LatencyWatchdog).
+    WATCHDOG_TIMEOUT = 5.0
+    # When the downloaded files are synced to the disk (see PartFileWriter).
+    FILE_FSYNC = PartFileWriter.FSYNC_ON_COMMIT
+    # Number of devices read at the same time when more than one is
+    # selected. 1 reads them one after the other.
+    PARALLEL_DOWNLOADS = 4
+    # Age of the files to delete from the devices.
+    DELETE_AFTER = tdelta(days=7)
+    # Order the files are got in, if the subjects take turns, and the time
+    # (seconds) a watch is expected to stay docked, or None (see
+    # DownloadScheduler).
+    DOWNLOAD_POLICY = NEWEST_FIRST
+    FAIR_SUBJECTS = True
+    DOCK_DEADLINE = None
+    close_signal = pyqtSignal()
+    # ARIMUs found by the discovery thread.
+    comports_found = pyqtSignal(list)
+    # (event, port) of the ports attached and detached.
+    port_event = pyqtSignal(str, str)
+    # Progress, and the final progress, of the parallel download.
+    download_progress = pyqtSignal(dict)
+    download_done = pyqtSignal(dict)
+
+    def __init__(self, *args, **kwargs) -> None:
+        """View initializer."""
+        super(ArimuDataReader, self).__init__(*args, **kwargs)
+        self.setupUi(self)
+
+        # Fix size.
+        self.setFixedSize(self.geometry().width(),
+                          self.geometry().height())
+
+        # Set up console variables
+        self._max_lines = 24
+        self._console_text = []
+        self.display_text("ARIMU Data Reader")
+        self.display_text("-----------------")
+        self.display_text("Please selecte ARIMUs to read data from.")
+        
+        # Status text
+        self._statustext = ''
+        self._datarate = 0
+
+        # Search COM ports with ARIMUs connected.
+        self._comports = []
+        self._comportinx = 0
+        self._connected = False
+        self._discovery = ArimuDiscovery()
+        self.comports_found.connect(self._handle_comports_found)
+        self.update_list_of_comports()
+
+        # Data reader statemachine.
+        self._state : ArimuDataReaderStates = ArimuDataReaderStates.WAITINGTOSTART
+        self._setup_statehandlrs()
+
+        # ARIMU workers to get the data. The workers are kept connected
+        # across all the stages (download, delete and time set).
+        self.arimuwrkr = None
+        self._wrkrpool = ArimuDocWorkerPool()
+        # Selected ports whose watch has been removed, and whose time is not
+        # to be set.
+        self._removed = set()
+        self.outdir = "subjectdata"
+        # Files already downloaded to the output directory.
+        self._manifest = ArimuManifest(self.outdir)
+        self.arimudata = {"allfiles": [],
+                          "subjs": [],
+                          "toget": self._download_scheduler(),
+                          "got": [],
+                          "notgot": [],
+                          "listdone": False,
+                          "currfilename": '',
+                          "currfile": None,
+                          "filestodelete": None}
+
+        # ARIMU individual file reading flag.
+        self._readingcurrfile = False
+
+        # Attach callbacks
+        self.list_comports.itemSelectionChanged.connect(self._callback_com_item_changed)
+        self.btn_refresh_comports.clicked.connect(self._callback_refresh_comports)
+        self.btn_start_data_reading.clicked.connect(self._callback_start_reading)
+
+        # Populate the list of ARIMU devices.
+        self._datetimer = QTimer()
+        self._datetimer.timeout.connect(self._callback_datetimer)
+        self._datetimer.start(1000)
+        # A Timer that is activated when the data reading is in progress.
+        self._watchdog = LatencyWatchdog(ArimuDataReader.WATCHDOG_TIMEOUT)
+        self._data_read_progress_timer = QTimer()
+        self._data_read_progress_timer.timeout.connect(self._callback_data_read_progress_timer)
+        # A Timer for setting time on the watches.
+        self._time_setter_timer = QTimer()
+        self._time_setter_timer.timeout.connect(self._callback_time_setter_timer)
+        
+        # Parallel download reports.
+        self.download_progress.connect(self._handle_download_progress)
+        self.download_done.connect(self._handle_download_done)
+
+        # Follow the watches being docked and removed.
+        self.port_event.connect(self._handle_port_event)
+        self._port_callback = self.port_event.emit
+        port_watcher().subscribe(self._port_callback)
+
+        # Update UI
+        self.update_ui()
+
+    def update_list_of_comports(self):
+        # Clear the current list.
+        self.list_comports.clear()
+        # Look for the ARIMUs in the background; the connected ones are not
+        # probed again.
+        _skip = [_p for _p in self._comports if _p in self._wrkrpool]
+        threading.Thread(
+            target=lambda: self.comports_found.emit(
+                self._discovery.discover_sync(skip=_skip)
+            ),
+            daemon=True
+        ).start()
+
+    def _handle_comports_found(self, devices):
+        self.list_comports.clear()
+        for _dev in devices:
+            _item = QtWidgets.QListWidgetItem(f"{_dev.port}  {_dev.devname}")
+            _item.setData(Qt.UserRole, _dev.port)
+            self.list_comports.addItem(_item)
+        self.update_ui()
+
+    def _handle_port_event(self, event, port):
+        """A port was attached or detached."""
+        if event == ATTACH:
+            self._removed -= {_p for _p in self._removed if same_port(_p, port)}
+        if event == DETACH:
+            self._removed |= {_p for _p in self._comports if same_port(_p, port)}
+            # The device being read was removed.
+            _active = (self.arimuwrkr is not None
+                       and same_port(self.arimuwrkr.comport, port)
+                       and self._state != ArimuDataReaderStates.ALLDONE)
+            if _active:
+                self._abort_device()
+            # Drop the connection of a device that was removed.
+            for _p in self._comports:
+                if same_port(_p, port) and _p in self._wrkrpool:
+                    self._wrkrpool.discard(_p)
+            if _active:
+                # Move on to the next device.
+                self.arimuwrkr = None
+                self._state = ArimuDataReaderStates.ALLDONE
+                self._state_handlers[self._state]()
+        # The list can only change before the reading has started.
+        if len(self._comports) == 0:
+            self.update_list_of_comports()
+
+    def display_text(self, text, text_type=DockStnReports.NEW):
+        if text_type == DockStnReports.NEW:
+            self._console_text.append(text)
+            if len(self._console_text) > self._max_lines:
+                self._console_text.pop(0)
+        elif text_type == DockStnReports.APPEND:
+            self._console_text[-1] = self._console_text[-1] + text
+        else:
+            self._console_text[-1] = text
+
+        # Update the console text.
+        self.lbl_console.setText("\n".join(self._console_text))
+
+    def status_text(self, text, text_type=DockStnReports.NEW):
+        if text_type == DockStnReports.NEW:
+            self._statustext = text
+        else:
+            self._statustext += text
+
+        # Update the console text.
+        self.lbl_status.setText(self._statustext)
+
+    def update_ui(self):
+        print(self._comports)
+        # Enable refrsh button.
+        self.btn_refresh_comports.setEnabled(len(self._comports) == 0)
+
+        # Enable start data reading buttons.
+        self.btn_start_data_reading.setEnabled(
+            self.list_comports.count() > 0 and
+            len(self.list_comports.selectedItems()) > 0
+        )
+        
+        # If device is connected, then disable the list of COM ports.
+        if self._state != ArimuDataReaderStates.WAITINGTOSTART:
+            self.list_comports.setEnabled(False)
+            self.btn_refresh_comports.setEnabled(False)
+            self.btn_start_data_reading.setEnabled(False)
+
+    def _callback_refresh_comports(self):
+        self.update_list_of_comports()
+        self.update_ui()
+
+    def _callback_com_item_changed(self):
+        self.update_ui()
+
+    def _callback_datetimer(self):
+        self.lbl_datetime.setText(dt.now().strftime("%A, %d. %B %Y %I:%M:%S%p"))
+        # Keep an eye on the connected devices.
+        self._wrkrpool.check_health()
+        self._wrkrpool.evict_idle()
+
+    def _callback_data_read_progress_timer(self):
+        """Runs only when the data reading is in progress."""
+        if self._state == ArimuDataReaderStates.READINGFILESLOGGING:
+            # Check the watchdog.
+            if self._readingcurrfile and self._watchdog.expired():
+                self.status_text("WD: ON | ")
+                # The watchdog has timed out. Stop the data reading.
+                self._currfile_failed(f"(no data for {self._watchdog.idle():.1f} s)")
+            else:
+                self.status_text("WD: OFF | ")
+            
+            # Update date rate
+            self.status_text(f"{self._datarate / 1024:3.1f} kBps | ", text_type=DockStnReports.APPEND)
+            self.arimudata['toget'].update_rate(self._datarate, 1.0)
+            self._datarate = 0
+            
+            # Check if current file is done.
+            if self._readingcurrfile is False:
+                # Call the file logging handler.
+                self._data_read_progress_timer.stop()
+                self._state_handlers[self._state]()
+    
+    def _callback_time_setter_timer(self):
+        """Runs when all data has been obtained. to regularly set the time on the watches.
+        """
+        if self._state == ArimuDataReaderStates.ALLDONE:
+            # Go through the different compots, connect to them and set the time.
+            _nowstr = dt.now().strftime('%d/%m/%y %H:%M:%S.%f')
+            self.display_text(f"> Setting time to {_nowstr} on ",
+                              text_type=DockStnReports.OVERWRITE)
+            for _com in self._comports:
+                # The worker is opened again if it was dropped.
+                if _com in self._removed:
+                    continue
+                self._wrkrpool.get(_com).set_time()
+                self.display_text(f"{_com} ", text_type=DockStnReports.APPEND)
+
+    def _callback_start_reading(self):
+        # Get the list of COM ports.
+        self._comports = [_it.data(Qt.UserRole)
+                          for _it in self.list_comports.selectedItems()]
+        self._removed = set()
+
+        # Read the devices in parallel.
+        if (len(self._comports) > 1
+            and ArimuDataReader.PARALLEL_DOWNLOADS > 1):
+            self._start_parallel_reading()
+            self.update_ui()
+            return
+
+        # State the state machine for reading data.
+        self._state = ArimuDataReaderStates.WAITINGTOSTART
+        self._state_handlers[self._state]()
+        self.update_ui()
+
+    def _start_parallel_reading(self):
+        """Reads all the selected devices at the same time, in a thread of
+        its own, and sets their time after that."""
+        self._state = ArimuDataReaderStates.READINGFILESLOGGING
+        self.display_text(f"> Reading {len(self._comports)} devices, "
+                          + f"{ArimuDataReader.PARALLEL_DOWNLOADS} at a time.")
+        self.display_text("")
+        _downloader = ArimuDownloader(
+            self.outdir,
+            max_concurrent=ArimuDataReader.PARALLEL_DOWNLOADS,
+            delete_older_than=ArimuDataReader.DELETE_AFTER.total_seconds(),
+            inform=lambda d: self.download_progress.emit(d.progress()),
+            fsync=ArimuDataReader.FILE_FSYNC,
+            policy=ArimuDataReader.DOWNLOAD_POLICY,
+            fair=ArimuDataReader.FAIR_SUBJECTS,
+            deadline=ArimuDataReader.DOCK_DEADLINE
+        )
+        threading.Thread(target=self._run_parallel_reading,
+                         args=(_downloader, list(self._comports)),
+                         daemon=True).start()
+
+    def _run_parallel_reading(self, downloader, ports):
+        """Runs the parallel read in its own thread. Its end is always
+        reported with download_done, so that the time is set even when the
+        read fails; the devices not read to the end are then failed."""
+        try:
+            _progress = asyncio.run(downloader.run(ports))
+        except Exception as e:
+            log.exception("Parallel reading of %s failed.", ports)
+            for _port in ports:
+                _prog = downloader.devices.setdefault(_port,
+                                                      DeviceProgress(_port))
+                if _prog.finished is None and _prog.error is None:
+                    _prog.error = e
+            _progress = downloader.progress()
+            _progress["error"] = repr(e)
+        self.download_done.emit(_progress)
+
+    def _handle_download_progress(self, progress):
+        _str = " ".join((f"> Got {progress['files_got']}/{progress['files_total']} files",
+                         f"[{progress['active']} devices active,",
+                         f"{progress['failed']} failed]"))
+        self.display_text(_str, text_type=DockStnReports.OVERWRITE)
+        self.status_text(f"{progress['kBps']:3.1f} kBps | ")
+
+    def _handle_download_done(self, progress):
+        self._handle_download_progress(progress)
+        if "error" in progress:
+            self.display_text(f"> Reading failed! {progress['error']}")
+        for _port, _dev in progress["per_device"].items():
+            _str = " ".join((f"> {_port} {_dev['devname']}:",
+                             f"{_dev['files_got']}/{_dev['files_total']} files,",
+                             f"{_dev['files_deleted']} deleted"))
+            if _dev["error"] is not None:
+                _str += f" Failed! {_dev['error']}"
+            elif not _dev["list_complete"]:
+                _str += " Incomplete list of files!"
+            self.display_text(_str)
+        # Set the time on the devices.
+        self._comportinx = len(self._comports) - 1
+        self._state = ArimuDataReaderStates.ALLDONE
+        self._state_handlers[self._state]()
+
+    def _setup_statehandlrs(self):
+        self._state_handlers = {
+            ArimuDataReaderStates.WAITINGTOSTART: self._handle_waiting_to_start,
+            ArimuDataReaderStates.CONNECTTODEVICE: self._handle_connect_to_device,
+            ArimuDataReaderStates.READINGFILESSTART: self._handle_reading_files_start,
+            ArimuDataReaderStates.READINGFILESLOGGING: self._handle_start_logging_files,
+            ArimuDataReaderStates.DELETINGFILES: self._handle_deleting_files,
+            ArimuDataReaderStates.ALLDONE: self._handle_all_done,
+        }
+
+    def _handle_arimuwrkr_connect_response(self, devname):
+        self._discovery.remember(self._comports[self._comportinx], devname)
+        self._state = ArimuDataReaderStates.CONNECTTODEVICE
+        self._state_handlers[self._state](devname)
+
+    def _handle_arimuwrkr_filelist_response(self, filelist):
+        # The names come a packet at a time. In the LISTED order, the first
+        # file to get is asked for as soon as it is known.
+        # The file asked for comes after the list; the link is alive.
+        self._watchdog.start()
+        if len(filelist) > 0:
+            # 1. Keep the files with 'data' in their name and with the '.bin'
+            # extension.
+            _names = [_f for _f in filelist[0] if is_data_file(_f)]
+            self.arimudata['allfiles'] += _names
+
+            # 2. Create the directories of the new subjects.
+            for _f in _names:
+                _s = _f.split('_', maxsplit=1)[0]
+                if _s not in self.arimudata['subjs']:
+                    self.arimudata['subjs'].append(_s)
+                    Path(os.sep.join((self.outdir, _s))).mkdir(parents=True, exist_ok=True)
+
+            # 3. Files not downloaded before.
+            _new = self._manifest.diff(_names)
+            self.arimudata['toget'].add_many(_new)
+            if not self.arimudata['toget'].incremental:
+                # The files are ordered when the whole list is known.
+                _new = []
+            if self._state != ArimuDataReaderStates.READINGFILESLOGGING:
+                self.display_text(f"> Gettting list of files. [{len(self.arimudata['allfiles']):3d}]",
+                                  text_type=DockStnReports.OVERWRITE)
+                if len(_new) > 0:
+                    self._state = ArimuDataReaderStates.READINGFILESSTART
+                    self._state_handlers[self._state]()
+            elif len(_new) > 0 and self._readingcurrfile is False:
+                # Waiting for more files to get.
+                self._state_handlers[self._state]()
+            return
+
+        # Empty list of files. That marks the end of the response.
+        self.arimudata['listdone'] = True
+        # Check if there are files from the device.
+        if len(self.arimudata['allfiles']) == 0:
+            self.display_text("> No files to be read.", text_type=DockStnReports.NEW)
+            # Change state to start getting files for the different subjects.
+            self._state = ArimuDataReaderStates.ALLDONE
+            self._state_handlers[self._state]()
+            return
+        self.display_text(f"> Subjects found: {', '.join(self.arimudata['subjs'])}",
+                          text_type=DockStnReports.NEW)
+        if self._state != ArimuDataReaderStates.READINGFILESLOGGING:
+            # There was nothing new to get.
+            self._state = ArimuDataReaderStates.READINGFILESSTART
+            self._state_handlers[self._state]()
+        elif self._readingcurrfile is False:
+            self._state_handlers[self._state]()
+
+    def _handle_arimuwrkr_filedata_response(self, filedata):
+        # Check if its the file header
+        self._watchdog.packet()
+        if self.arimudata['currfile'] is None:
+            # Not reading a file, e.g. a late packet of a failed file.
+            return
+        if filedata[0] == ArimuAdditionalFlags.NOFILE:
+            # The current file was not found. Skip the current file.
+            _str = f"> Getting {self.arimudata['currfilename']} ... Not found!"
+            self.display_text(_str, text_type=DockStnReports.OVERWRITE)
+            self._abort_currfile()
+            self.arimudata['notgot'].append(self.arimudata['currfilename'])
+            self._readingcurrfile = False
+        elif filedata[0] == ArimuAdditionalFlags.FILEHEADER:
+            # Header of the current file, with its size.
+            self.arimudata['currfile'].expected_size = filedata[1]
+        elif filedata[0] == ArimuAdditionalFlags.FILECONTENT:
+            # Content of the current file: [FILECONTENT, progress, data].
+            # The frame is written straight from the receive buffer to the
+            # part file.
+            self.arimudata['currfile'].write(filedata[2])
+            _str = " ".join((f"> Getting {self.arimudata['currfilename']}",
+                            f"({100 * filedata[1] / 255:3.1f}%)",
+                            f"[{len(self.arimudata['toget']):3d} files left]"))
+            self.display_text(_str, text_type=DockStnReports.OVERWRITE)
+            # Numnber of bytes obtained.
+            self._datarate += len(filedata[2])
+            # Check if this is the last packet.
+            if filedata[1] == 255:
+                # All data obtained. Give the file its final name, if it has
+                # the size given in the header.
+                _file = self.arimudata['currfile']
+                self.arimudata['currfile'] = None
+                if _file.commit():
+                    _str = f"> Getting {self.arimudata['currfilename']} ... Done!"
+                    # Move read file to "got".
+                    self.arimudata['got'].append(self.arimudata['currfilename'])
+                    self.arimudata['toget'].done(self.arimudata['currfilename'],
+                                                 _file.size)
+                    self._manifest.add(
+                        self.arimudata['currfilename'],
+                        self.arimuwrkr.devname,
+                        self.arimudata['currfilename'].split('_', maxsplit=1)[0],
+                        _file.size,
+                        _file.checksum
+                    )
+                    self.display_text(_str, text_type=DockStnReports.OVERWRITE)
+                else:
+                    self._currfile_failed(f"({_file.size} of {_file.expected_size} bytes)")
+                # Clear reading file flag.
+                self._readingcurrfile = False
+
+    def _currfile_failed(self, reason):
+        """Drops the file being read, and queues it to be read again after a
+        backoff, if it has retries left."""
+        _name = self.arimudata['currfilename']
+        self._abort_currfile()
+        if self.arimudata['toget'].failed(_name):
+            _str = f"> Getting {_name} ... Failed! {reason} Will retry."
+        else:
+            _str = f"> Getting {_name} ... Failed! {reason}"
+            self.arimudata['notgot'].append(_name)
+        self.display_text(_str, text_type=DockStnReports.OVERWRITE)
+        self._readingcurrfile = False
+
+    def _abort_device(self):
+        """Stops reading the device being read, e.g. when it is removed. The
+        file being read is not got."""
+        self._data_read_progress_timer.stop()
+        if self._readingcurrfile:
+            self._abort_currfile()
+            self.arimudata['notgot'].append(self.arimudata['currfilename'])
+            self._readingcurrfile = False
+        self.display_text(" ".join((f"> {self.arimuwrkr.comport} removed!",
+                                    f"Got {len(self.arimudata['got'])} files,",
+                                    f"{len(self.arimudata['toget'])} left.")),
+                          text_type=DockStnReports.NEW)
+
+    def _abort_currfile(self):
+        """Drops the part file of the file being read, if any."""
+        if self.arimudata['currfile'] is not None:
+            self.arimudata['currfile'].abort()
+            self.arimudata['currfile'] = None
+
+    def _handle_arimuwrkr_filedelete_response(self):
+        # Check if all files are done.
+        if len(self.arimudata['filestodelete']) == 0:
+            self.display_text("Done deleting old files!", text_type=DockStnReports.NEW)
+            return
+
+        # More files to delete.
+        self._state_handlers[self._state]()
+
+    def _handle_all_done(self):
+        """All done with reading files.
+        """
+        # The current device stays connected in the pool for setting its
+        # time later.
+        # Clear all other variables.
+        self.arimudata["allfiles"] = []
+        self.arimudata["subjs"] = []
+        self.arimudata["toget"] = self._download_scheduler()
+        self.arimudata["got"] = []
+        self.arimudata["notgot"] = []
+        self.arimudata["listdone"] = False
+        self.arimudata["currfilename"] = ''
+        self._abort_currfile()
+        self.arimudata["filestodelete"] = None
+
+        # Get to the next comport.
+        self._comportinx += 1
+        # Check if all comports have been handled.
+        if self._comportinx >= len(self._comports) :
+            self.display_text("> Done with all devices!")
+            #
+            # Set time till the devices are removed, on the connections
+            # used for reading the data, or on new ones after a parallel read.
+            for _com in self._comports:
+                if _com in self._removed:
+                    continue
+                self._wrkrpool.get(_com).set_time()
+            self.display_text(f"> Setting time to {dt.now().strftime('%d/%m/%y %H:%M:%S.%f')}", text_type=DockStnReports.NEW)
+            # Start time for regular time setting
+            self._time_setter_timer.start(1000)
+            return
+
+        # More devices left.
+        self._state = ArimuDataReaderStates.WAITINGTOSTART
+        self._state_handlers[self._state]()
+
+    def _handle_deleting_files(self):
+        """Deleting old files on the device.
+        """
+        # Check if this is the first call to the function.
+        if self.arimudata['filestodelete'] is None:
+            self.display_text("> Looking for files to delete ... ", text_type=DockStnReports.NEW)
+            _today = dt.now()
+            _filedates = [(_f, dt.fromtimestamp(int(_f.split('_')[-1].split('.')[0])))
+                        for _f in self.arimudata['allfiles']]
+            self.arimudata['filestodelete'] = [_fd[0] for _fd in _filedates
+                                            if (_today - _fd[1]) > ArimuDataReader.DELETE_AFTER]
+            self._connect_signal(self.arimuwrkr.file_delete,
+                                 self._handle_arimuwrkr_filedelete_response)
+            self.display_text(f"found {len(self.arimudata['filestodelete'])}.", text_type=DockStnReports.APPEND)
+
+        # Check if there are more files to be deleted.
+        if len(self.arimudata['filestodelete']) == 0:
+            self.display_text("> Done deleting old files!", text_type=DockStnReports.NEW)
+            # Change state to all done.
+            self._state = ArimuDataReaderStates.ALLDONE
+            self._state_handlers[self._state]()
+            return
+        
+        # There are files to delete.
+        _nextfile = self.arimudata['filestodelete'].pop(0)
+        self.arimuwrkr.delete_file(_nextfile)
+
+    def _handle_start_logging_files(self):
+        """Start logging data ready from the device.
+        """
+        # Get the next file, in the order of the download policy.
+        _filename = self.arimudata['toget'].pop()
+
+        # Check if there are still files to get.
+        if _filename is None:
+            if not self.arimudata['listdone']:
+                # More of the list is to come.
+                return
+            if self.arimudata['toget'].retry_wait() is not None:
+                # Files to read again when their backoff is over.
+                self._data_read_progress_timer.start(1000)
+                return
+            self.display_text("> Got all files!", text_type=DockStnReports.NEW)
+
+            # Change state to deleting files.
+            self._state = ArimuDataReaderStates.DELETINGFILES
+            self._state_handlers[self._state]()
+            return
+        
+        # Get file from the device.
+        self.display_text(f"> Getting {_filename}", text_type=DockStnReports.NEW)
+        self.arimudata['currfilename'] = _filename
+        # The file is written to a part file as it arrives.
+        self._abort_currfile()
+        _s = _filename.split('_', maxsplit=1)[0]
+        self.arimudata['currfile'] = PartFileWriter(
+            os.sep.join((self.outdir, _s, _filename)),
+            fsync=ArimuDataReader.FILE_FSYNC
+        )
+        self._readingcurrfile = True
+        # Connect file data handler if it is not already connected.
+        self._connect_signal(self.arimuwrkr.file_data,
+                             self._handle_arimuwrkr_filedata_response)
+        self.arimuwrkr.get_file_data(_filename)
+        self._watchdog.start()
+
+        # Start the data reading progress timer.
+        self._data_read_progress_timer.start(1000)
+
+    def _handle_reading_files_start(self):
+        """Start reading files on the device. The list of files to get is
+        filled in as the list of files on the device arrives.
+        """
+        # Change state to start logging files.
+        self._state = ArimuDataReaderStates.READINGFILESLOGGING
+        self._state_handlers[self._state]()
+
+    def _handle_waiting_to_start(self, *args):
+        """Check if there are any devices from which data is to be read.
+        """
+        if self._comportinx == len(self._comports):
+            self._state = ArimuDataReaderStates.WAITINGTOSTART
+            return
+        # There are devices from which data is to be read.
+        # Get the Arimu worker for this device.
+        _connected = self._comports[self._comportinx] in self._wrkrpool
+        self.arimuwrkr = self._wrkrpool.get(self._comports[self._comportinx])
+        self.display_text(f"> Connecting to {self._comports[self._comportinx]}.")
+        if _connected and self.arimuwrkr.devname != "":
+            # Already connected and verified.
+            self._handle_arimuwrkr_connect_response(self.arimuwrkr.devname)
+            return
+        self._connect_signal(self.arimuwrkr.connect_response,
+                             self._handle_arimuwrkr_connect_response)
+
+    def _handle_connect_to_device(self, *args):
+        # Check if the device is an ARIMU device.
+        if "ARIMU" in args[0]:
+            self.display_text(f" Device is {args[0]}.", text_type=DockStnReports.APPEND)
+            # Get file list.
+            # Clear variables.
+            self.arimudata["allfiles"] = []
+            self.arimudata["subjs"] = []
+            self.arimudata["toget"] = self._download_scheduler()
+            self._watchdog = LatencyWatchdog(ArimuDataReader.WATCHDOG_TIMEOUT)
+            self.arimudata["got"] = []
+            self.arimudata["notgot"] = []
+            self.arimudata["listdone"] = False
+            self.arimudata["currfilename"] = ''
+            self._abort_currfile()
+            self.arimudata["filestodelete"] = None
+            # Get files
+            self._connect_signal(self.arimuwrkr.file_list,
+                                 self._handle_arimuwrkr_filelist_response)
+            self.arimuwrkr.get_filelist()
+            self.display_text("> Gettting list of files.")
+
+            # update UI
+            self.update_ui()
+
+    def _download_scheduler(self):
+        """Returns the queue of the files to get from a device."""
+        return DownloadScheduler(ArimuDataReader.DOWNLOAD_POLICY,
+                                 ArimuDataReader.FAIR_SUBJECTS,
+                                 ArimuDataReader.DOCK_DEADLINE)
+
+    def _connect_signal(self, signal, slot):
+        """Connects the signal of a worker to the slot only, as the workers
+        are reused across devices and stages."""
+        try:
+            signal.disconnect()
+        except TypeError:
+            pass
+        signal.connect(slot)
+
+    def _subjs_and_files(self):
+        for _s, _sf in self.arimudata['subjfiles'].items():
+            for _f in _sf:
+                yield _s, _f
+
+    def _get_data_files(self, filedetails, subj):
+        # Display subject details
+        self.display_text(f"> Subject: {subj} (To get: {len(filedetails['toget'])}).",
+                          text_type=DockStnReports.NEW)
+        time.sleep(0.1)
+        # Go through all files and get them.
+        _inx = 0
+        self._readingcurrfile = False
+        while True:
+            # Check if the current file is still being read.
+            if self._readingcurrfile:
+                time.sleep(0.01)
+                continue
+            # Get the next file.
+            _f = filedetails['toget'][_inx]
+            self.display_text(f"> Getting {_f}.", text_type=DockStnReports.NEW)
+
+    def closeEvent(self, event):
+        port_watcher().unsubscribe(self._port_callback)
+        self._wrkrpool.close()
+        self._manifest.close()
+        self.close_signal.emit()
+
+
+if __name__ == "__main__":
+    app = QtWidgets.QApplication(sys.argv)
+    mywin = ArimuDataReader()
+    # ImageUpdate()
+    mywin.show()
     sys.exit(app.exec_())
\ No newline at end of file
@@ -0,0 +1,165 @@
+"""Module for finding the ARIMU devices connected to the computer.
+
+Only the serial ports of the USB-serial chip of the ARIMU boards (by VID:PID)
+are considered, and they are all probed at once with a PING; the ports that
+answer with an ARIMU name are the ARIMUs. The name of each device found is
+cached by the USB serial number of its port (or the USB location, for chips
+without one), so that a watch that is plugged back in is recognised without
+opening its port. The cache is only a guess for the list: a program that
+opens a port tells the discovery the name it got with remember().
+
+    discovery = ArimuDiscovery()
+    for dev in discovery.discover_sync():
+        print(dev.port, dev.devname)
+
+Author: Sivakumar Balasubramanian
+Date: 17 October 2026
+Email: siva82kb@gmail.com
+"""
+
+import asyncio
+import functools
+import json
+import os
+import sys
+
+from serial.tools.list_ports import comports
+
+from asyncarimu import ArimuAsync
+
+# (VID, PID) of the USB-serial chips of the ARIMU boards: WCH CH340.
+ARIMU_USB_IDS = ((0x1A86, 0x7523),)
+
+
+class ArimuPortInfo(object):
+    """An ARIMU found on a port. 'cached' is True when the name was taken
+    from the cache instead of asking the device."""
+    __slots__ = ("port", "devname", "usbkey", "cached")
+
+    def __init__(self, port, devname, usbkey=None, cached=False) -> None:
+        self.port = port
+        self.devname = devname
+        self.usbkey = usbkey
+        self.cached = cached
+
+    def __repr__(self):
+        return (f"ArimuPortInfo({self.port}, {self.devname}"
+                + f"{', cached' if self.cached else ''})")
+
+
+def usb_key(portinfo):
+    """Returns the key a port is cached by: its USB serial number, or its
+    USB location if the chip has no serial number."""
+    if portinfo.serial_number:
+        return f"sn:{portinfo.serial_number}"
+    if portinfo.location:
+        return f"loc:{portinfo.location}"
+    return None
+
+
+class ArimuDiscovery(object):
+    """Finds the ARIMUs on the serial ports (see the module docstring)."""
+    # Longest time (seconds) to wait for a probed device to answer. The
+    # boards reset when their port is opened.
+    PROBE_TIMEOUT = ArimuAsync.RESET_PERIOD + 0.5
+
+    def __init__(self, usb_ids=ARIMU_USB_IDS, probe_timeout=PROBE_TIMEOUT,
+                 cache_file=None) -> None:
+        self.usb_ids = set(usb_ids)
+        self.probe_timeout = probe_timeout
+        # Device names by USB key, optionally kept in a JSON file.
+        self.cache_file = cache_file
+        self.cache = {}
+        if cache_file is not None and os.path.exists(cache_file):
+            with open(cache_file, "r") as fh:
+                self.cache = json.load(fh)
+
+    def candidates(self):
+        """Returns the port infos of the ports with an ARIMU USB-serial
+        chip."""
+        return [_p for _p in comports() if (_p.vid, _p.pid) in self.usb_ids]
+
+    async def discover(self, extra_ports=(), skip=()):
+        """Returns the ArimuPortInfo of the ARIMUs found, sorted by port.
+        Ports in the cache are not probed. 'extra_ports' are probed as well
+        (e.g. URLs of simulated devices), and the ports in 'skip' (e.g. ports
+        that are already open) are not probed."""
+        _found = []
+        _toprobe = []
+        for _p in self.candidates():
+            _key = usb_key(_p)
+            if _key in self.cache:
+                _found.append(ArimuPortInfo(_p.device, self.cache[_key],
+                                            _key, cached=True))
+            elif _p.device not in skip:
+                _toprobe.append((_p.device, _key))
+        _toprobe += [(_p, None) for _p in extra_ports if _p not in skip]
+        _names = await asyncio.gather(
+            *[self.probe(_p) for _p, _ in _toprobe]
+        )
+        for (_p, _key), _name in zip(_toprobe, _names):
+            if _name is None:
+                continue
+            _found.append(ArimuPortInfo(_p, _name, _key))
+            if _key is not None:
+                self.cache[_key] = _name
+        self._save_cache()
+        return sorted(_found, key=lambda d: d.port)
+
+    def discover_sync(self, extra_ports=(), skip=()):
+        """discover() for callers without an event loop, e.g. a thread of a
+        Qt program."""
+        return asyncio.run(self.discover(extra_ports, skip))
+
+    async def probe(self, port):
+        """Returns the name of the ARIMU on the port, or None if the port
+        could not be opened or did not answer like an ARIMU."""
+        _loop = asyncio.get_running_loop()
+        try:
+            _arimu = await _loop.run_in_executor(
+                None, functools.partial(ArimuAsync, port, reset_wait=False)
+            )
+        except Exception:
+            return None
+        try:
+            _resp = await _arimu.wait_ready(self.probe_timeout)
+        finally:
+            _arimu.close()
+        if _resp is None or "ARIMU" not in _resp[3]:
+            return None
+        return _resp[3]
+
+    def remember(self, port, devname):
+        """Keeps the cache of a port in step with the name its device gave
+        when it was opened: a location is shared by every watch plugged
+        into it. A port that did not answer like an ARIMU is dropped."""
+        if not devname or "ARIMU" not in devname:
+            self.forget(port)
+            return
+        _keys = [usb_key(_p) for _p in comports() if _p.device == port]
+        _keys = [_k for _k in _keys
+                 if _k is not None and self.cache.get(_k) != devname]
+        for _key in _keys:
+            self.cache[_key] = devname
+        if _keys:
+            self._save_cache()
+
+    def forget(self, port):
+        """Drops the cached name of a port, e.g. after a different device
+        answered on it."""
+        for _p in comports():
+            if _p.device == port:
+                self.cache.pop(usb_key(_p), None)
+        self._save_cache()
+
+    def _save_cache(self):
+        if self.cache_file is None:
+            return
+        with open(self.cache_file, "w") as fh:
+            json.dump(self.cache, fh, indent=4)
+
+
+if __name__ == "__main__":
+    # python arimudiscovery.py [extra ports ...]
+    for _dev in ArimuDiscovery().discover_sync(sys.argv[1:]):
+        sys.stdout.write(f"{_dev.port:<20} {_dev.devname}\n")
@@ -0,0 +1,297 @@
+"""Module for downloading the data files of a number of ARIMUs in parallel.
+
+Every watch has its own USB-serial link, so ArimuDownloader reads the
+devices at the same time, one task per port, with at most 'max_concurrent'
+devices at once. The files of each device that are not in the manifest are
+downloaded through part files, in the order of a DownloadScheduler policy,
+and recorded in the manifest. A file that fails is tried again after a
+backoff. A device that
+fails does not stop the others; its error is kept in its progress.
+Progress and throughput are aggregated over all the devices:
+
+    downloader = ArimuDownloader("subjectdata", max_concurrent=4)
+    progress = asyncio.run(downloader.run(["COM15", "COM16", "COM19"]))
+
+Author: Sivakumar Balasubramanian
+Date: 17 October 2026
+Email: siva82kb@gmail.com
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+from arimumanifest import ArimuManifest
+from arimupool import ArimuPool
+from arimuprotocol import ArimuAdditionalFlags
+from arimuretry import LatencyWatchdog
+from arimuschedule import DownloadScheduler, file_epoch, file_subject
+from misc import PartFileWriter
+
+
+def is_data_file(name):
+    """Returns if the file on ARIMU is a data file."""
+    return "data" in name and name.endswith(".bin")
+
+
+class DeviceProgress(object):
+    """Download progress of a device. 'list_complete' is False when the
+    list of files broke off, so that only the files listed were got."""
+    __slots__ = ("port", "devname", "files_total", "files_got",
+                 "files_failed", "files_retried", "files_deleted", "bytes",
+                 "current", "list_complete", "started", "finished", "error")
+
+    def __init__(self, port) -> None:
+        self.port = port
+        self.devname = ""
+        self.files_total = 0
+        self.files_got = 0
+        self.files_failed = 0
+        self.files_retried = 0
+        self.files_deleted = 0
+        self.bytes = 0
+        # Name of the file being downloaded.
+        self.current = ""
+        self.list_complete = False
+        self.started = None
+        self.finished = None
+        self.error = None
+
+    def as_dict(self):
+        _res = {_f: getattr(self, _f) for _f in DeviceProgress.__slots__}
+        _res["error"] = None if self.error is None else repr(self.error)
+        return _res
+
+
+class ArimuDownloader(object):
+    """Downloads the new files of a number of ARIMUs in parallel (see the
+    module docstring)."""
+    # Number of devices read at the same time.
+    MAX_CONCURRENT = 4
+    # Shortest time (seconds) between two progress reports.
+    INFORM_PERIOD = 0.5
+    LISTFILES_TIMEOUT = 5.0
+    # Longest wait for a packet of a file, till the time between the packets
+    # is known.
+    GETFILEDATA_TIMEOUT = 5.0
+
+    def __init__(self, outdir, max_concurrent=MAX_CONCURRENT, pool=None,
+                 manifest=None, delete_older_than=None, inform=None,
+                 fsync=PartFileWriter.FSYNC_ON_COMMIT,
+                 policy=DownloadScheduler.POLICY, fair=False,
+                 deadline=None) -> None:
+        self.outdir = outdir
+        self.max_concurrent = max_concurrent
+        self._own_pool = pool is None
+        self.pool = ArimuPool() if pool is None else pool
+        self._own_manifest = manifest is None
+        self.manifest = ArimuManifest(outdir) if manifest is None else manifest
+        # Age (seconds) of the downloaded files to delete from the devices,
+        # or None to not delete any.
+        self.delete_older_than = delete_older_than
+        # Called with the downloader as the download progresses.
+        self.inform = inform
+        self.fsync = fsync
+        # Order of the files of each device, and the time (seconds) the
+        # devices are expected to stay docked (see DownloadScheduler).
+        self.policy = policy
+        self.fair = fair
+        self.deadline = deadline
+        self.devices = {}
+        self._started = None
+        self._last_inform = 0.0
+
+    def progress(self):
+        """Returns the progress of all the devices and their totals."""
+        _devs = list(self.devices.values())
+        _secs = 0.0 if self._started is None else time.monotonic() - self._started
+        _bytes = sum(_d.bytes for _d in _devs)
+        return {
+            "devices": len(_devs),
+            "active": sum(_d.started is not None and _d.finished is None
+                          for _d in _devs),
+            "failed": sum(_d.error is not None for _d in _devs),
+            "files_total": sum(_d.files_total for _d in _devs),
+            "files_got": sum(_d.files_got for _d in _devs),
+            "files_failed": sum(_d.files_failed for _d in _devs),
+            "files_retried": sum(_d.files_retried for _d in _devs),
+            "lists_incomplete": sum(_d.finished is not None
+                                    and _d.error is None
+                                    and not _d.list_complete for _d in _devs),
+            "bytes": _bytes,
+            "seconds": _secs,
+            "kBps": _bytes / 1024 / _secs if _secs > 0 else 0.0,
+            "per_device": {_d.port: _d.as_dict() for _d in _devs},
+        }
+
+    async def run(self, ports):
+        """Downloads the files of all the devices, and returns the final
+        progress. The connections and the manifest are closed at the end,
+        unless they were given."""
+        try:
+            await self.download(ports)
+        finally:
+            if self._own_pool:
+                self.pool.close()
+            if self._own_manifest:
+                self.manifest.close()
+        return self.progress()
+
+    async def download(self, ports):
+        """Downloads the files of all the devices, at most 'max_concurrent'
+        at a time. Returns {port: DeviceProgress}."""
+        self._started = time.monotonic()
+        self.devices = {_p: DeviceProgress(_p) for _p in ports}
+        _sem = asyncio.Semaphore(self.max_concurrent)
+
+        async def _one(port):
+            async with _sem:
+                _prog = self.devices[port]
+                _prog.started = time.monotonic()
+                try:
+                    await self.download_device(port, _prog)
+                except Exception as e:
+                    _prog.error = e
+                finally:
+                    _prog.current = ""
+                    _prog.finished = time.monotonic()
+                    self._inform(force=True)
+
+        await asyncio.gather(*[_one(_p) for _p in ports])
+        return self.devices
+
+    async def download_device(self, port, prog):
+        """Downloads the new files of one device. The files are scheduled
+        as their names arrive; in the LISTED order, the first one is asked
+        for while the rest of the list is still coming."""
+        async with self.pool.connection(port) as _arimu:
+            prog.devname = self.pool.devname(port)
+            if (await _arimu.startdockstncomm())[0] is None:
+                raise TimeoutError("No response to STARTDOCKSTNCOMM.")
+            _names = []
+            _toget = DownloadScheduler(self.policy, self.fair, self.deadline)
+            _more = asyncio.Event()
+            # Gives up on a file when the device is silent for longer than
+            # the time between its packets suggests.
+            _watchdog = LatencyWatchdog(ArimuDownloader.GETFILEDATA_TIMEOUT)
+
+            async def _list():
+                try:
+                    async for _resp in _arimu.listfiles(
+                            timeout=ArimuDownloader.LISTFILES_TIMEOUT):
+                        if _resp[0] is None:
+                            # The list broke off; the files listed are got.
+                            return
+                        _new = [_n for _n in _resp[3] if is_data_file(_n)]
+                        _names.extend(_new)
+                        _new = self.manifest.diff(_new)
+                        prog.files_total += len(_new)
+                        _toget.add_many(_new)
+                        _more.set()
+                    prog.list_complete = True
+                finally:
+                    _more.set()
+
+            _lister = asyncio.ensure_future(_list())
+            try:
+                while True:
+                    _name = (_toget.pop()
+                             if _toget.incremental or _lister.done() else None)
+                    if _name is None:
+                        _wait = _toget.retry_wait()
+                        if _lister.done() and _wait is None:
+                            break
+                        # Wait for more of the list, or for a file to retry.
+                        _more.clear()
+                        try:
+                            await asyncio.wait_for(_more.wait(), _wait)
+                        except asyncio.TimeoutError:
+                            pass
+                        continue
+                    _got = await self._download_file(_arimu, prog, _name,
+                                                     _toget, _watchdog)
+                    if _got:
+                        prog.files_got += 1
+                    elif _got is not None and _toget.failed(_name):
+                        prog.files_retried += 1
+                    else:
+                        prog.files_failed += 1
+            finally:
+                if not _lister.done():
+                    _lister.cancel()
+            # Any error of the listing, other than an incomplete list.
+            await _lister
+            self._inform(force=True)
+            if self.delete_older_than is not None:
+                await self._delete_old_files(_arimu, prog, _names)
+
+    async def _download_file(self, arimu, prog, name, scheduler, watchdog):
+        """Downloads a file to outdir/subject/name. Returns if the whole
+        file was got, or None if the device does not have the file."""
+        prog.current = name
+        _subj = file_subject(name)
+        _start = time.monotonic()
+        os.makedirs(os.path.join(self.outdir, _subj), exist_ok=True)
+        with PartFileWriter(os.path.join(self.outdir, _subj, name),
+                            fsync=self.fsync) as _file:
+            async for _, _, _, _pl in arimu.getfiledata(name,
+                                                        watchdog=watchdog):
+                if _pl is None:
+                    return False
+                if _pl[0] == ArimuAdditionalFlags.NOFILE:
+                    return None
+                if _pl[0] == ArimuAdditionalFlags.FILEHEADER:
+                    _file.expected_size = _pl[1]
+                elif _pl[0] == ArimuAdditionalFlags.FILECONTENT:
+                    _file.write(_pl[2])
+                    prog.bytes += len(_pl[2])
+                    self._inform()
+            if not _file.commit():
+                return False
+        scheduler.update_rate(_file.size, time.monotonic() - _start)
+        scheduler.done(name, _file.size)
+        self.manifest.add(name, prog.devname, _subj, _file.size,
+                          _file.checksum)
+        return True
+
+    async def _delete_old_files(self, arimu, prog, names):
+        """Deletes the downloaded files older than 'delete_older_than' from
+        the device."""
+        _now = time.time()
+        for _name in names:
+            _epoch = file_epoch(_name)
+            if (_epoch is None or _now - _epoch <= self.delete_older_than
+                or _name not in self.manifest):
+                continue
+            _resp = await arimu.deletefile(_name)
+            if _resp[3] == ArimuAdditionalFlags.FILEDELETED:
+                prog.files_deleted += 1
+
+    def _inform(self, force=False):
+        if self.inform is None:
+            return
+        _now = time.monotonic()
+        if force or _now - self._last_inform >= ArimuDownloader.INFORM_PERIOD:
+            self._last_inform = _now
+            self.inform(self)
+
+
+if __name__ == "__main__":
+    # python arimudownload.py outdir port [port ...]
+    def _report(downloader):
+        _p = downloader.progress()
+        sys.stdout.write(f"\r{_p['files_got']}/{_p['files_total']} files "
+                         + f"{_p['bytes'] / 1024:9.1f} kB "
+                         + f"{_p['kBps']:7.1f} kBps "
+                         + f"[{_p['active']} active, {_p['failed']} failed]")
+        sys.stdout.flush()
+
+    _progress = asyncio.run(
+        ArimuDownloader(sys.argv[1], inform=_report).run(sys.argv[2:])
+    )
+    sys.stdout.write("\n")
+    for _port, _dev in _progress["per_device"].items():
+        sys.stdout.write(f"{_port:<20} {_dev['devname']:<16} "
+                         + f"{_dev['files_got']}/{_dev['files_total']} "
+                         + f"{_dev['error'] or ''}\n")
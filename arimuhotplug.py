@@ -0,0 +1,221 @@
+"""Module for watching serial ports being attached and detached.
+
+On Linux, PortWatcher is woken by inotify events on /dev, so a docked watch
+is seen as soon as its device node is created; elsewhere (or when inotify is
+not available) the list of ports is polled. Subscribers are called with
+(event, port) from the watcher thread, where the event is ATTACH or DETACH,
+and coroutines can await a port with wait():
+
+    watcher = port_watcher()
+    await watcher.wait("/dev/ttyUSB0")
+
+Author: Sivakumar Balasubramanian
+Date: 17 October 2026
+Email: siva82kb@gmail.com
+"""
+
+import asyncio
+import fnmatch
+import glob
+import os
+import select
+import struct
+import sys
+import threading
+
+from serial.tools.list_ports import comports
+
+try:
+    import ctypes
+    import ctypes.util
+    _libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    _libc.inotify_init1
+    _libc.inotify_add_watch
+except Exception:
+    # Not Linux, or no inotify: the ports are polled.
+    _libc = None
+
+ATTACH = "attach"
+DETACH = "detach"
+
+# inotify flags and event header (wd, mask, cookie, len).
+_IN_ATTRIB = 0x004
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_EVENT = struct.Struct("iIII")
+
+
+def same_port(port1, port2):
+    """Returns if two port names refer to the same port, e.g. "ttyUSB0" and
+    "/dev/ttyUSB0"."""
+    return (port1 == port2
+            or os.path.basename(port1) == os.path.basename(port2))
+
+
+def _inotify_open(path):
+    """Returns a non-blocking inotify descriptor watching 'path', or None."""
+    if _libc is None or not os.path.isdir(path):
+        return None
+    _fd = _libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    if _fd < 0:
+        return None
+    _mask = _IN_CREATE | _IN_DELETE | _IN_ATTRIB | _IN_MOVED_FROM | _IN_MOVED_TO
+    if _libc.inotify_add_watch(_fd, path.encode(), _mask) < 0:
+        os.close(_fd)
+        return None
+    return _fd
+
+
+class PortWatcher(threading.Thread):
+    """Thread reporting the serial ports that are attached and detached (see
+    the module docstring)."""
+    # Time (seconds) between scans when polling.
+    POLL_PERIOD = 1.0
+    DEV_DIR = "/dev"
+    # Device nodes of USB serial ports.
+    DEV_PATTERNS = ("ttyUSB*", "ttyACM*")
+
+    def __init__(self, poll_period=POLL_PERIOD, use_inotify=True) -> None:
+        super().__init__(name="PortWatcher", daemon=True)
+        self.poll_period = poll_period
+        self._callbacks = []
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._fd = (_inotify_open(PortWatcher.DEV_DIR)
+                    if use_inotify else None)
+        # Wakes the thread up from select() when stopping.
+        self._wakeup = os.pipe() if self._fd is not None else None
+        self.mode = "poll" if self._fd is None else "inotify"
+        self._ports = set(self.scan())
+
+    @property
+    def ports(self):
+        with self._lock:
+            return sorted(self._ports)
+
+    def has_port(self, port):
+        return any(same_port(port, _p) for _p in self.ports)
+
+    def scan(self):
+        """Returns the serial ports there are now. The device nodes are
+        listed where there are any, which is much quicker than enumerating
+        the ports."""
+        if sys.platform.startswith("linux") and os.path.isdir(PortWatcher.DEV_DIR):
+            return [_p for _pat in PortWatcher.DEV_PATTERNS
+                    for _p in glob.glob(os.path.join(PortWatcher.DEV_DIR, _pat))]
+        return [_p.device for _p in comports()]
+
+    def subscribe(self, callback):
+        """Calls 'callback(event, port)' for every port attached or
+        detached. The callback runs on the watcher thread."""
+        with self._lock:
+            self._callbacks.append(callback)
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    async def wait(self, port, attached=True, timeout=None):
+        """Waits till the port is attached (or detached). Raises
+        asyncio.TimeoutError after 'timeout' seconds."""
+        _loop = asyncio.get_running_loop()
+        _fut = _loop.create_future()
+
+        def _done():
+            if not _fut.done():
+                _fut.set_result(None)
+
+        def _callback(event, dev):
+            if same_port(dev, port) and (event == ATTACH) == attached:
+                _loop.call_soon_threadsafe(_done)
+
+        # Subscribe first, so that a change right after the check is not
+        # missed.
+        self.subscribe(_callback)
+        try:
+            if self.has_port(port) != attached:
+                await asyncio.wait_for(_fut, timeout)
+        finally:
+            self.unsubscribe(_callback)
+
+    def run(self):
+        while not self._stopped.is_set():
+            if self._fd is None:
+                self._stopped.wait(self.poll_period)
+            elif not self._wait_inotify():
+                continue
+            self.rescan()
+
+    def rescan(self):
+        """Scans the ports, and informs the subscribers of the changes."""
+        _now = set(self.scan())
+        with self._lock:
+            _attached = sorted(_now - self._ports)
+            _detached = sorted(self._ports - _now)
+            self._ports = _now
+            _callbacks = list(self._callbacks)
+        for _event, _ports in ((DETACH, _detached), (ATTACH, _attached)):
+            for _p in _ports:
+                for _cb in _callbacks:
+                    _cb(_event, _p)
+
+    def stop(self):
+        self._stopped.set()
+        if self._wakeup is not None:
+            os.write(self._wakeup[1], b"\0")
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join()
+        if self._fd is not None:
+            os.close(self._fd)
+            os.close(self._wakeup[0])
+            os.close(self._wakeup[1])
+            self._fd = None
+
+    def _wait_inotify(self):
+        """Blocks till there are inotify events, and returns if any of them
+        is about a serial port's device node."""
+        _ready, _, _ = select.select([self._fd, self._wakeup[0]], [], [])
+        if self._fd not in _ready:
+            return False
+        try:
+            _buf = os.read(self._fd, 4096)
+        except BlockingIOError:
+            return False
+        _ofst = 0
+        _relevant = False
+        while _ofst + _IN_EVENT.size <= len(_buf):
+            _, _, _, _n = _IN_EVENT.unpack_from(_buf, _ofst)
+            _ofst += _IN_EVENT.size
+            _name = _buf[_ofst:_ofst + _n].rstrip(b"\0").decode(errors="replace")
+            _ofst += _n
+            if any(fnmatch.fnmatch(_name, _pat)
+                   for _pat in PortWatcher.DEV_PATTERNS):
+                _relevant = True
+        return _relevant
+
+
+_watcher = None
+_watcher_lock = threading.Lock()
+
+
+def port_watcher():
+    """Returns the running PortWatcher shared by the whole program."""
+    global _watcher
+    with _watcher_lock:
+        if _watcher is None:
+            _watcher = PortWatcher()
+            _watcher.start()
+        return _watcher
+
+
+if __name__ == "__main__":
+    _w = port_watcher()
+    sys.stdout.write(f"Watching ports ({_w.mode}): {', '.join(_w.ports)}\n")
+    _w.subscribe(lambda event, port: sys.stdout.write(f"{event:<8} {port}\n"))
+    try:
+        _w.join()
+    except KeyboardInterrupt:
+        _w.stop()
@@ -0,0 +1,174 @@
+"""Module implementing the manifest of the files downloaded from ARIMUs.
+
+The manifest is an SQLite database in the output directory with one row per
+downloaded file: its name, device, subject, size, checksum (CRC32) and the
+time it was downloaded. Looking up a file is an index lookup, and finding
+the files of a device listing that still have to be downloaded is a single
+query, however many files have been downloaded before.
+
+    manifest = ArimuManifest("subjectdata")
+    toget = manifest.diff(device_file_names)
+    manifest.add(name, devname, subject, size, checksum)
+
+Workers that download to the same output directory share its manifest with
+shared_manifest(outdir).
+
+Author: Sivakumar Balasubramanian
+Date: 17 October 2026
+Email: siva82kb@gmail.com
+"""
+
+import os
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+
+_shared = {}
+_shared_lock = threading.Lock()
+
+
+class ArimuManifest(object):
+    """Manifest of the files downloaded to an output directory (see the
+    module docstring)."""
+    FILENAME = "manifest.sqlite3"
+    # Extension of the data files.
+    DATA_EXT = ".bin"
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS files (
+            name TEXT PRIMARY KEY,
+            device TEXT,
+            subject TEXT,
+            size INTEGER,
+            checksum TEXT,
+            downloaded REAL
+        );
+        CREATE INDEX IF NOT EXISTS files_subject ON files (subject);
+    """
+    FIELDS = ("name", "device", "subject", "size", "checksum", "downloaded")
+
+    def __init__(self, outdir, filename=FILENAME) -> None:
+        self.outdir = outdir
+        os.makedirs(outdir, exist_ok=True)
+        self.path = os.path.join(outdir, filename)
+        _new = not os.path.exists(self.path)
+        self._db = sqlite3.connect(self.path, timeout=10.0,
+                                   check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(ArimuManifest.SCHEMA)
+        if _new:
+            # Files downloaded before there was a manifest.
+            self.import_dir()
+
+    def __contains__(self, name):
+        return self._db.execute("SELECT 1 FROM files WHERE name = ?",
+                                (name,)).fetchone() is not None
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def get(self, name):
+        """Returns the record (dict) of the file, or None."""
+        _row = self._db.execute(
+            f"SELECT {', '.join(ArimuManifest.FIELDS)} FROM files WHERE name = ?",
+            (name,)
+        ).fetchone()
+        return None if _row is None else dict(zip(ArimuManifest.FIELDS, _row))
+
+    def add(self, name, device, subject, size, checksum=None, downloaded=None):
+        """Records a downloaded file, replacing an earlier record of it."""
+        self.add_many([(name, device, subject, size, checksum,
+                        time.time() if downloaded is None else downloaded)])
+
+    def add_many(self, records):
+        """Records a number of (name, device, subject, size, checksum,
+        downloaded) in one transaction."""
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)",
+                records
+            )
+
+    def remove(self, name):
+        with self._db:
+            self._db.execute("DELETE FROM files WHERE name = ?", (name,))
+
+    def names(self, subject=None, device=None):
+        """Names of the files downloaded, optionally of a subject or a
+        device only."""
+        _query, _args = "SELECT name FROM files WHERE 1", []
+        if subject is not None:
+            _query += " AND subject = ?"
+            _args.append(subject)
+        if device is not None:
+            _query += " AND device = ?"
+            _args.append(device)
+        return [_r[0] for _r in self._db.execute(_query, _args)]
+
+    def diff(self, listing):
+        """Returns the names in the device listing that have not been
+        downloaded, in the order of the listing."""
+        _listing = list(listing)
+        with self._db:
+            self._db.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS listing "
+                + "(pos INTEGER PRIMARY KEY, name TEXT)"
+            )
+            self._db.execute("DELETE FROM listing")
+            self._db.executemany("INSERT INTO listing (name) VALUES (?)",
+                                 ((_n,) for _n in _listing))
+            _new = [_r[0] for _r in self._db.execute(
+                "SELECT listing.name FROM listing "
+                + "LEFT JOIN files ON files.name = listing.name "
+                + "WHERE files.name IS NULL ORDER BY listing.pos"
+            )]
+            self._db.execute("DELETE FROM listing")
+        return _new
+
+    def import_dir(self):
+        """Records the data files in the output directory, and in the
+        directories below it, that are not in the manifest. Their subject is
+        the start of their name, as for the files downloaded, e.g. subj for
+        subj_data_1700000000.bin, and their checksum is left out."""
+        _records = []
+        for _dir, _, _files in os.walk(self.outdir):
+            for _f in _files:
+                if not _f.endswith(ArimuManifest.DATA_EXT) or _f in self:
+                    continue
+                _st = os.stat(os.path.join(_dir, _f))
+                _records.append((_f, None, _f.split("_", maxsplit=1)[0],
+                                 _st.st_size, None, _st.st_mtime))
+        self.add_many(_records)
+        return len(_records)
+
+    def close(self):
+        self._db.close()
+
+
+def shared_manifest(outdir):
+    """Returns the manifest of the output directory shared by all its
+    users in the program. It stays open till the program ends."""
+    _key = os.path.abspath(outdir)
+    with _shared_lock:
+        if _key not in _shared:
+            _shared[_key] = ArimuManifest(outdir)
+        return _shared[_key]
+
+
+def file_checksum(filename, bufsize=1 << 20):
+    """Returns the CRC32 (hex) of a file, as recorded in the manifest."""
+    _crc = 0
+    with open(filename, "rb") as fh:
+        while True:
+            _data = fh.read(bufsize)
+            if len(_data) == 0:
+                break
+            _crc = zlib.crc32(_data, _crc)
+    return f"{_crc:08x}"
+
+
+if __name__ == "__main__":
+    # python arimumanifest.py outdir
+    _manifest = ArimuManifest(sys.argv[1])
+    sys.stdout.write(f"{len(_manifest)} files in {_manifest.path}\n")
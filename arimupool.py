@@ -0,0 +1,192 @@
+"""Module implementing a pool of ARIMU connections, one per port.
+
+A connection is opened once, verified with a PING, and then handed out to
+every stage that needs the device (listing, downloading, deleting, setting
+the time), instead of each stage opening the port again and waiting for the
+board to reset. A port is never opened twice: callers that ask for the same
+port at the same time wait for the one open.
+
+A connection that has been idle for a while is pinged before it is handed
+out, and reopened if the device does not answer. Connections that nobody
+has used for 'idle_timeout' seconds are closed by evict_idle().
+
+    pool = ArimuPool()
+    async with pool.connection("COM15") as arimu:
+        await arimu.gettime()
+
+Author: Sivakumar Balasubramanian
+Date: 17 October 2026
+Email: siva82kb@gmail.com
+"""
+
+import asyncio
+import contextlib
+import functools
+import time
+
+from asyncarimu import ArimuAsync
+
+
+class PooledConnection(object):
+    """An open ArimuAsync and its bookkeeping in the pool."""
+    __slots__ = ("port", "arimu", "devname", "users", "last_used",
+                 "last_checked", "last_frames")
+
+    def __init__(self, port, arimu, devname) -> None:
+        self.port = port
+        self.arimu = arimu
+        self.devname = devname
+        # Number of callers holding the connection.
+        self.users = 0
+        self.last_used = time.monotonic()
+        # Time of the last proof of life, and the frames received till then.
+        self.last_checked = self.last_used
+        self.last_frames = arimu.stats.frames_decoded
+
+
+class ArimuPool(object):
+    """Open, verified ARIMU connections keyed by port (see the module
+    docstring)."""
+    # Time (seconds) after which a connection nobody uses is closed.
+    IDLE_TIMEOUT = 60.0
+    # Time (seconds) without traffic after which a connection is pinged
+    # before it is handed out.
+    HEALTH_CHECK_PERIOD = 5.0
+    HEALTH_CHECK_TIMEOUT = 0.5
+    # Longest time (seconds) to wait for a newly opened device to answer.
+    READY_TIMEOUT = 3.0
+
+    def __init__(self, baudrate=115200, idle_timeout=IDLE_TIMEOUT,
+                 health_check_period=HEALTH_CHECK_PERIOD,
+                 ready_timeout=READY_TIMEOUT) -> None:
+        self.baudrate = baudrate
+        self.idle_timeout = idle_timeout
+        self.health_check_period = health_check_period
+        self.ready_timeout = ready_timeout
+        self._conns = {}
+        # One lock per port, held while the port is being opened or checked.
+        self._locks = {}
+        self.stats = {"opened": 0,
+                      "reused": 0,
+                      "open_failures": 0,
+                      "health_checks": 0,
+                      "health_failures": 0,
+                      "evicted": 0}
+
+    def __contains__(self, port):
+        return port in self._conns
+
+    @property
+    def ports(self):
+        return list(self._conns.keys())
+
+    def devname(self, port):
+        """Name the device on the port answered the PING with."""
+        return self._conns[port].devname
+
+    async def acquire(self, port):
+        """Returns the open ArimuAsync of the port, opening it if needed.
+        Raises ConnectionError if no ARIMU answers on the port. Every
+        acquire() must be followed by a release()."""
+        _lock = self._locks.setdefault(port, asyncio.Lock())
+        async with _lock:
+            _conn = self._conns.get(port)
+            if _conn is not None and not await self._healthy(_conn):
+                self.discard(port)
+                _conn = None
+            if _conn is None:
+                _conn = await self._open(port)
+                self._conns[port] = _conn
+            else:
+                self.stats["reused"] += 1
+            _conn.users += 1
+            _conn.last_used = time.monotonic()
+            return _conn.arimu
+
+    def release(self, port):
+        """Hands the connection of the port back to the pool."""
+        _conn = self._conns.get(port)
+        if _conn is None:
+            return
+        _conn.users = max(0, _conn.users - 1)
+        _conn.last_used = time.monotonic()
+
+    @contextlib.asynccontextmanager
+    async def connection(self, port):
+        """acquire() and release() the connection of the port."""
+        _arimu = await self.acquire(port)
+        try:
+            yield _arimu
+        finally:
+            self.release(port)
+
+    def discard(self, port):
+        """Closes the connection of the port, e.g. after the device stopped
+        answering or was undocked."""
+        _conn = self._conns.pop(port, None)
+        if _conn is not None:
+            _conn.arimu.close()
+
+    def evict_idle(self):
+        """Closes the connections nobody has used for 'idle_timeout'
+        seconds. Returns their ports."""
+        _now = time.monotonic()
+        _idle = [_p for _p, _c in self._conns.items()
+                 if _c.users == 0 and _now - _c.last_used > self.idle_timeout]
+        for _p in _idle:
+            self.discard(_p)
+        self.stats["evicted"] += len(_idle)
+        return _idle
+
+    async def run_evictor(self, period=1.0):
+        """Calls evict_idle() every 'period' seconds, till cancelled."""
+        while True:
+            await asyncio.sleep(period)
+            self.evict_idle()
+
+    def close(self):
+        for _p in list(self._conns.keys()):
+            self.discard(_p)
+
+    async def _open(self, port):
+        """Opens the port, and waits till an ARIMU answers on it."""
+        _loop = asyncio.get_running_loop()
+        try:
+            _arimu = await _loop.run_in_executor(
+                None,
+                functools.partial(ArimuAsync, port, self.baudrate,
+                                  reset_wait=False)
+            )
+        except Exception as e:
+            self.stats["open_failures"] += 1
+            raise ConnectionError(f"Could not open {port}: {e}") from e
+        _resp = await _arimu.wait_ready(self.ready_timeout)
+        if _resp is None or "ARIMU" not in _resp[3]:
+            _arimu.close()
+            self.stats["open_failures"] += 1
+            raise ConnectionError(f"No ARIMU answered on {port}.")
+        self.stats["opened"] += 1
+        return PooledConnection(port, _arimu, _resp[3])
+
+    async def _healthy(self, conn):
+        """Returns if the device of the connection is still answering. Frames
+        received since the last check are proof enough; otherwise an idle
+        connection is pinged."""
+        if conn.arimu.lost is not None:
+            return False
+        _now = time.monotonic()
+        _frames = conn.arimu.stats.frames_decoded
+        if _frames != conn.last_frames or conn.users > 0:
+            conn.last_frames = _frames
+            conn.last_checked = _now
+            return True
+        if _now - conn.last_checked < self.health_check_period:
+            return True
+        self.stats["health_checks"] += 1
+        _resp = await conn.arimu.ping(timeout=ArimuPool.HEALTH_CHECK_TIMEOUT)
+        if _resp[0] is None:
+            self.stats["health_failures"] += 1
+            return False
+        conn.last_frames = conn.arimu.stats.frames_decoded
+        conn.last_checked = time.monotonic()
+        return True
@@ -0,0 +1,372 @@
+"""Module declaring the ARIMU protocol: the commands, states and flags, and
+the layout of the arguments and the response data of every command.
+
+A JEDI payload sent to ARIMU is [cmd, args...], and a payload received from
+ARIMU is [cmd, state, error, data...]. COMMANDS has the request and response
+codec of each command, which encode the arguments and decode the data with
+precompiled structs, straight from the received memoryview:
+
+    payload = encode_request(ArimuCommands.SETTIME, dt.now())
+    cmd, state, err, (currt, micros) = decode_response(payload)
+
+Author: Sivakumar Balasubramanian
+Date: 17 October 2026
+Email: siva82kb@gmail.com
+"""
+
+import struct
+from datetime import datetime as dt
+
+try:
+    import numpy as np
+except ImportError:
+    # Only needed for decoding time responses in bulk.
+    np = None
+
+# ARIMU Errors
+Error_Types1 = ["ImuIntFail",
+                "SdNoCont",
+                "RtcNoSet",
+                "DatFlNoCrt",
+                "DatFlNoRdl",
+                "DatFlNoFnd"]
+
+
+# ARIMU Commands
+class ArimuCommands(object):
+    STATUS = 0
+    PING = 1
+    LISTFILES = 2
+    GETFILEDATA = 3
+    DELETEFILE = 4
+    GETMICROS = 5
+    SETTIME = 6
+    GETTIME = 7
+    STARTSTREAM = 8
+    STOPSTREAM = 9
+    SETSUBJECT = 10
+    GETSUBJECT = 11
+    STARTEXPT = 12
+    STOPEXPT = 13
+    STARTDOCKSTNCOMM = 14
+    STOPDOCKSTNCOMM = 15
+    DOCKSTNPING = 16
+    STARTNORMAL = 17
+    STOPNORMAL = 18
+    SETTONONE = 19
+    CURRENTFILENAME = 128
+
+    @staticmethod
+    def command_name(val):
+        _cmd = COMMANDS.get(val)
+        return "" if _cmd is None else _cmd.name
+
+
+# Other constants
+class ArimuAdditionalFlags(object):
+    NOFILE = 0
+    FILESEARCHING = 1
+    FILEHEADER = 2
+    FILECONTENT = 3
+    FILEDELETED = 4
+    FILENOTDELETED = 5
+
+    @staticmethod
+    def flag_name(val):
+        addl_flag_text = ["NOFILE",
+                          "FILESEARCHING",
+                          "FILEHEADER",
+                          "FILECONTENT",
+                          "FILEDELETED",
+                          "FILENOTDELETED",]
+        return addl_flag_text[val]
+
+
+# ARIMU States.
+class ArimuStates(object):
+    NONE = 0
+    BADERROR = 1
+    NORMAL = 2
+    EXPERIMENT = 3
+    DOCKSTNCOMM = 4
+    STREAMING = 5
+
+    @staticmethod
+    def state_name(val):
+        state_text = ["NONE",
+                      "BADERROR",
+                      "NORMAL",
+                      "EXPERIMENT",
+                      "DOCKSTNCOMM",
+                      "STREAMING",]
+        return state_text[val] if val > 0 else ""
+
+
+def get_number_bits(num):
+    return  [int(x) for x in '{:08b}'.format(num)]
+
+
+# IMU record of the data files and of the STARTSTREAM packets: epoch, micros,
+# ax, ay, az, gx, gy, gz.
+IMU_RECORD = struct.Struct("<2L6h")
+
+
+def decode_imu_records(data):
+    """Returns the list of IMU records (tuples) in the given data. A
+    trailing partial record is ignored."""
+    _n = len(data) - len(data) % IMU_RECORD.size
+    return list(IMU_RECORD.iter_unpack(memoryview(data)[:_n]))
+
+
+class Codec(object):
+    """Arguments or data with no layout of their own. Arguments are sent as
+    they are given, and the data is returned as received. 'size' is the
+    least number of bytes of data that can be decoded."""
+    size = 0
+
+    def encode(self, data=b""):
+        return bytes(data)
+
+    def decode(self, data):
+        return data
+
+
+class TextCodec(Codec):
+    """ASCII text, zero-terminated in the arguments."""
+
+    def encode(self, text):
+        return text.encode("ascii") + b"\0"
+
+    def decode(self, data):
+        return bytes(data).decode()
+
+
+class StructCodec(Codec):
+    """Fixed layout given by a struct format. A layout with a single field
+    decodes to the value of the field, and others to a tuple."""
+
+    def __init__(self, fmt) -> None:
+        self.struct = struct.Struct(fmt)
+        self.size = self.struct.size
+        self._single = len(self.struct.unpack(bytes(self.struct.size))) == 1
+
+    def encode(self, *values):
+        return self.struct.pack(*values)
+
+    def decode(self, data):
+        _vals = self.struct.unpack_from(data)
+        return _vals[0] if self._single else _vals
+
+
+class TimeCodec(StructCodec):
+    """Time set on ARIMU: yy, mm, dd, HH, MM, SS and centiseconds."""
+
+    def __init__(self) -> None:
+        super().__init__("<7L")
+
+    def encode(self, dtvalue):
+        return self.struct.pack(dtvalue.year % 100, dtvalue.month,
+                                dtvalue.day, dtvalue.hour, dtvalue.minute,
+                                dtvalue.second, dtvalue.microsecond // 10000)
+
+
+class DeviceTimeCodec(StructCodec):
+    """Time of ARIMU's clock (as in TimeCodec) followed by its micros. Decodes
+    to (datetime, micros)."""
+
+    def __init__(self) -> None:
+        super().__init__("<8L")
+
+    def decode(self, data):
+        _yy, _mm, _dd, _HH, _MM, _SS, _cs, _micros = self.struct.unpack_from(data)
+        return (dt(2000 + _yy, _mm, _dd, _HH, _MM, _SS, _cs * 10000), _micros)
+
+    def decode_many(self, data):
+        """Decodes a number of time responses at once, given either as one
+        buffer of back to back responses, or as a list of them. Returns the
+        times (numpy datetime64[us]) and the micros (numpy uint32) arrays."""
+        if np is None:
+            raise ImportError("numpy is needed to decode time responses in bulk.")
+        _size = self.struct.size
+        if not isinstance(data, (bytes, bytearray, memoryview)):
+            data = b"".join(bytes(_d[:_size]) for _d in data)
+        _n = len(data) // _size
+        _v = np.frombuffer(data, dtype="<u4", count=8 * _n).reshape(_n, 8)
+        _v = _v.astype(np.int64)
+        # Months since 1970, then days, then the time of the day.
+        _t = ((_v[:, 0] + 30) * 12 + _v[:, 1] - 1).astype("datetime64[M]")
+        _t = (_t.astype("datetime64[D]")
+              + (_v[:, 2] - 1).astype("timedelta64[D]")).astype("datetime64[us]")
+        _t += ((_v[:, 3] * 3600 + _v[:, 4] * 60 + _v[:, 5]) * 1000000
+               + _v[:, 6] * 10000).astype("timedelta64[us]")
+        return _t, _v[:, 7].astype(np.uint32)
+
+
+class FlagCodec(Codec):
+    """A single ArimuAdditionalFlags byte."""
+    size = 1
+
+    def decode(self, data):
+        return data[0]
+
+
+class FileDataCodec(Codec):
+    """GETFILEDATA packets. Decodes to (NOFILE,), (FILEHEADER, size) or
+    (FILECONTENT, progress, data), where the progress is 255 on the last
+    packet of the file, and the data is a view of the received packet. A
+    header or content packet cut too short decodes to None."""
+    FILE_SIZE = struct.Struct("<L")
+    size = 1
+
+    def decode(self, data):
+        _flag = data[0]
+        if _flag == ArimuAdditionalFlags.FILEHEADER:
+            if len(data) < 1 + FileDataCodec.FILE_SIZE.size:
+                return None
+            return (_flag, FileDataCodec.FILE_SIZE.unpack_from(data, 1)[0])
+        if _flag == ArimuAdditionalFlags.FILECONTENT:
+            if len(data) < 2:
+                return None
+            return (_flag, data[1], data[2:])
+        return (_flag,)
+
+
+class FileListCodec(Codec):
+    """LISTFILES packets. The list of file names comes in chunks; the first
+    starts with '[' and the last ends with ']'. A name can be split across
+    two chunks, so the chunks are decoded to (text, first, last), where the
+    text is without the brackets, and the names are got with a
+    FileListParser."""
+
+    def decode(self, data):
+        _str = bytes(data).decode()
+        _first = _str.startswith("[")
+        _last = _str.endswith("]")
+        return (_str[1 if _first else 0:len(_str) - 1 if _last else None],
+                _first, _last)
+
+
+class FileListParser(object):
+    """Incremental parser of a LISTFILES response. feed() takes each decoded
+    chunk (see FileListCodec) as it arrives and returns the file names it
+    completes, so the names can be used before the rest of the list comes.
+    A name split across two chunks is returned whole with the second."""
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self):
+        # Start of a name whose end is in the next chunk.
+        self._partial = ""
+        # Number of names returned, and if the end of the list was got.
+        self.count = 0
+        self.done = False
+
+    def feed(self, chunk):
+        _text, _first, _last = chunk
+        if _first:
+            self.reset()
+        _names = (self._partial + _text).split(",")
+        # Till the end of the list, the last piece is the start of the next
+        # name ('' when the chunk ends with a comma).
+        self._partial = "" if _last else _names.pop()
+        self.done = _last
+        _names = [_n for _n in _names if len(_n) > 0]
+        self.count += len(_names)
+        return _names
+
+
+class ImuSampleCodec(Codec):
+    """STARTSTREAM packets. Decodes to an IMU_RECORD tuple, or None for the
+    response to the command, which has no record."""
+
+    def decode(self, data):
+        if len(data) < IMU_RECORD.size:
+            return None
+        return IMU_RECORD.unpack_from(data)
+
+
+NODATA = Codec()
+TEXT = TextCodec()
+MICROS = StructCodec("<L")
+SETTIME_ARGS = TimeCodec()
+DEVICE_TIME = DeviceTimeCodec()
+FILE_FLAG = FlagCodec()
+FILE_DATA = FileDataCodec()
+FILE_LIST = FileListCodec()
+IMU_SAMPLE = ImuSampleCodec()
+
+
+def decode_device_times(data):
+    """Returns the times and the micros of a number of recorded SETTIME or
+    GETTIME responses as numpy arrays, for clock drift analysis."""
+    return DEVICE_TIME.decode_many(data)
+
+
+class Command(object):
+    """Declaration of a command: its arguments and the data of its
+    response. A command that is not 'idempotent' must not be sent again
+    when its response is lost, as it may already have taken effect."""
+    __slots__ = ("cmd", "name", "request", "response", "idempotent")
+
+    def __init__(self, cmd, name, request=NODATA, response=NODATA,
+                 idempotent=True) -> None:
+        self.cmd = cmd
+        self.name = name
+        self.request = request
+        self.response = response
+        self.idempotent = idempotent
+
+
+COMMANDS = {_c.cmd: _c for _c in (
+    Command(ArimuCommands.STATUS, "STATUS"),
+    Command(ArimuCommands.PING, "PING", response=TEXT),
+    Command(ArimuCommands.LISTFILES, "LISTFILES", response=FILE_LIST),
+    Command(ArimuCommands.GETFILEDATA, "GETFILEDATA", request=TEXT,
+            response=FILE_DATA),
+    Command(ArimuCommands.DELETEFILE, "DELETEFILE", request=TEXT,
+            response=FILE_FLAG, idempotent=False),
+    Command(ArimuCommands.GETMICROS, "GETMICROS", response=MICROS),
+    Command(ArimuCommands.SETTIME, "SETTIME", request=SETTIME_ARGS,
+            response=DEVICE_TIME),
+    Command(ArimuCommands.GETTIME, "GETTIME", response=DEVICE_TIME),
+    Command(ArimuCommands.STARTSTREAM, "STARTSTREAM", response=IMU_SAMPLE),
+    Command(ArimuCommands.STOPSTREAM, "STOPSTREAM"),
+    Command(ArimuCommands.SETSUBJECT, "SETSUBJECT", request=TEXT,
+            response=TEXT),
+    Command(ArimuCommands.GETSUBJECT, "GETSUBJECT", response=TEXT),
+    Command(ArimuCommands.STARTEXPT, "STARTEXPT"),
+    Command(ArimuCommands.STOPEXPT, "STOPEXPT"),
+    Command(ArimuCommands.STARTDOCKSTNCOMM, "STARTDOCKSTNCOMM"),
+    Command(ArimuCommands.STOPDOCKSTNCOMM, "STOPDOCKSTNCOMM"),
+    # Keeps the docking station mode alive, and is not answered.
+    Command(ArimuCommands.DOCKSTNPING, "DOCKSTNPING"),
+    Command(ArimuCommands.STARTNORMAL, "STARTNORMAL"),
+    Command(ArimuCommands.STOPNORMAL, "STOPNORMAL"),
+    Command(ArimuCommands.SETTONONE, "SETTONONE"),
+    Command(ArimuCommands.CURRENTFILENAME, "CURRENTFILENAME", response=TEXT),
+)}
+
+
+def encode_request(cmd, *args):
+    """Returns the payload of the command 'cmd' with the given arguments."""
+    if len(args) == 0:
+        return bytes((cmd,))
+    return bytes((cmd,)) + COMMANDS[cmd].request.encode(*args)
+
+
+def decode_response(payload):
+    """Returns (cmd, state, error, data) of a payload from ARIMU, with the
+    data decoded by the response codec of the command. The data of unknown
+    commands is returned as received, and data too short for the codec of
+    the command is None. Raises ValueError for a payload without the
+    command, state and error."""
+    if len(payload) < 3:
+        raise ValueError(f"ARIMU payload of {len(payload)} bytes is too short.")
+    _cmd = COMMANDS.get(payload[0])
+    _data = payload[3:]
+    if _cmd is None:
+        return (payload[0], payload[1], payload[2], _data)
+    return (payload[0], payload[1], payload[2],
+            None if len(_data) < _cmd.response.size
+            else _cmd.response.decode(_data))
@@ -0,0 +1,260 @@
+"""Module implementing the retrying of ARIMU commands.
+
+ArimuExecutor sends a command until an acceptable response arrives, with a
+timeout per attempt and an exponential backoff with jitter between the
+attempts. Commands that are not idempotent (see arimuprotocol.COMMANDS) are
+not sent again unless it is verified that the last attempt had no effect. A
+circuit breaker stops sending commands to a port that has stopped
+answering, and lets a single attempt through once in a while to find out if
+it is back. LatencyWatchdog gives up on a transfer of many packets, e.g. a
+file, when the link has been silent for longer than the time between its
+packets suggests.
+
+    executor = ArimuExecutor(arimu)
+    resp = await executor.command(ArimuCommands.PING,
+                                  accept=lambda r: "ARIMU" in r[3])
+
+Author: Sivakumar Balasubramanian
+Date: 17 October 2026
+Email: siva82kb@gmail.com
+"""
+
+import asyncio
+import collections
+import random
+import statistics
+import time
+
+import serial
+
+from arimuprotocol import ArimuCommands, COMMANDS
+
+
+class RetryPolicy(object):
+    """How a command is retried: the number of attempts, the timeout
+    (seconds) of each attempt, and the backoff (seconds) between attempts,
+    which doubles after each attempt up to 'max_backoff'. Each backoff is
+    shortened by a random fraction up to 'jitter', so that devices that
+    failed together do not retry together."""
+
+    def __init__(self, attempts=5, timeout=0.5, backoff=0.05, max_backoff=2.0,
+                 jitter=0.5) -> None:
+        self.attempts = attempts
+        self.timeout = timeout
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+
+    def delay(self, attempt, rnd=random):
+        """Returns the backoff after the given attempt (0 is the first)."""
+        _d = min(self.max_backoff, self.backoff * 2 ** attempt)
+        return _d * (1 - self.jitter * rnd.random())
+
+
+class CircuitBreaker(object):
+    """Opens after 'threshold' failed attempts in a row, and then rejects
+    all attempts for 'reset_period' seconds. After that one attempt is let
+    through (half-open): the breaker closes if it succeeds, and opens again
+    if it fails."""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, threshold=8, reset_period=5.0) -> None:
+        self.threshold = threshold
+        self.reset_period = reset_period
+        self.opened_count = 0
+        self.reset()
+
+    def reset(self):
+        self._state = CircuitBreaker.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+
+    @property
+    def state(self):
+        if (self._state == CircuitBreaker.OPEN
+            and time.monotonic() - self._opened_at >= self.reset_period):
+            self._state = CircuitBreaker.HALF_OPEN
+        return self._state
+
+    def allow(self):
+        """Returns if an attempt can be made."""
+        return self.state != CircuitBreaker.OPEN
+
+    def success(self):
+        self._state = CircuitBreaker.CLOSED
+        self._failures = 0
+
+    def failure(self):
+        self._failures += 1
+        if (self._state == CircuitBreaker.HALF_OPEN
+            or self._failures >= self.threshold):
+            if self._state != CircuitBreaker.OPEN:
+                self.opened_count += 1
+            self._state = CircuitBreaker.OPEN
+            self._opened_at = time.monotonic()
+
+
+class LatencyWatchdog(object):
+    """Watchdog of a transfer of many packets, e.g. a file. Its timeout
+    adapts to the time observed between the packets, as TCP's retransmission
+    timeout does: the smoothed time plus 'k' times its mean deviation,
+    between 'min_timeout' and 'max_timeout'. Till a packet is seen, the
+    timeout is 'initial'."""
+    ALPHA = 0.125
+    BETA = 0.25
+
+    def __init__(self, initial=5.0, min_timeout=2.0, max_timeout=30.0,
+                 k=4) -> None:
+        self.initial = initial
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.k = k
+        self.srtt = None
+        self.rttvar = None
+        self._last = time.monotonic()
+
+    @property
+    def timeout(self):
+        if self.srtt is None:
+            return self.initial
+        return min(self.max_timeout,
+                   max(self.min_timeout, self.srtt + self.k * self.rttvar))
+
+    def start(self):
+        """Starts waiting for a packet, e.g. after a request, without
+        taking the time till now as a sample."""
+        self._last = time.monotonic()
+
+    def packet(self):
+        """Records the arrival of a packet."""
+        _now = time.monotonic()
+        _t = _now - self._last
+        self._last = _now
+        if self.srtt is None:
+            self.srtt, self.rttvar = _t, _t / 2
+        else:
+            self.rttvar += LatencyWatchdog.BETA * (abs(self.srtt - _t)
+                                                   - self.rttvar)
+            self.srtt += LatencyWatchdog.ALPHA * (_t - self.srtt)
+
+    def idle(self):
+        """Returns the time (seconds) since the last packet."""
+        return time.monotonic() - self._last
+
+    def expired(self):
+        return self.idle() > self.timeout
+
+
+class CommandStats(object):
+    """Retry and latency counters of a command. The latencies are those of
+    the successful calls, including their retries."""
+    FIELDS = ("calls",
+              "successes",
+              "failures",
+              "rejected",
+              "attempts",
+              "retries")
+    # Number of latencies kept for the percentiles.
+    LATENCY_N = 1000
+
+    def __init__(self) -> None:
+        for _f in CommandStats.FIELDS:
+            setattr(self, _f, 0)
+        self.latencies = collections.deque(maxlen=CommandStats.LATENCY_N)
+
+    def as_dict(self):
+        _res = {_f: getattr(self, _f) for _f in CommandStats.FIELDS}
+        if len(self.latencies) > 0:
+            _lat = sorted(self.latencies)
+            _res["latency_ms"] = {
+                "mean": 1e3 * statistics.mean(_lat),
+                "p50": 1e3 * _lat[len(_lat) // 2],
+                "p99": 1e3 * _lat[min(len(_lat) - 1, int(0.99 * len(_lat)))],
+                "max": 1e3 * _lat[-1],
+            }
+        return _res
+
+
+class ArimuExecutor(object):
+    """Runs the commands of an ArimuAsync with retries (see the module
+    docstring)."""
+    # Policy of the commands not in POLICIES.
+    DEFAULT_POLICY = RetryPolicy()
+    POLICIES = {
+        ArimuCommands.GETTIME: RetryPolicy(timeout=1.0),
+        ArimuCommands.SETTIME: RetryPolicy(timeout=1.0),
+        ArimuCommands.LISTFILES: RetryPolicy(timeout=5.0, backoff=0.2),
+    }
+
+    def __init__(self, arimu, policies=None, breaker=None, seed=None) -> None:
+        self.arimu = arimu
+        self.policies = dict(ArimuExecutor.POLICIES)
+        self.policies.update(policies or {})
+        self.breaker = CircuitBreaker() if breaker is None else breaker
+        self.stats = {}
+        self._rnd = random.Random(seed)
+
+    def policy(self, cmd):
+        return self.policies.get(cmd, ArimuExecutor.DEFAULT_POLICY)
+
+    async def command(self, cmd, *args, accept=None, verify=None):
+        """Sends the command 'cmd' with the given arguments until 'accept'
+        returns True for its response (by default, until any response
+        arrives). Returns the response, or None if all attempts failed.
+        See run() for 'verify'."""
+        _policy = self.policy(cmd)
+        return await self.run(
+            COMMANDS[cmd].name,
+            lambda: self.arimu.command(cmd, *args, timeout=_policy.timeout),
+            accept=accept,
+            policy=_policy,
+            idempotent=COMMANDS[cmd].idempotent,
+            verify=verify,
+        )
+
+    async def run(self, name, func, accept=None, policy=None, idempotent=True,
+                  verify=None):
+        """Awaits 'func()' until 'accept' returns True for its result, and
+        returns the result, or None if all attempts failed. An operation
+        that is not idempotent is attempted again only if 'verify()' is
+        given and returns True, i.e. the last attempt had no effect."""
+        _accept = _responded if accept is None else accept
+        _policy = ArimuExecutor.DEFAULT_POLICY if policy is None else policy
+        _stats = self.stats.setdefault(name, CommandStats())
+        _stats.calls += 1
+        _strt = time.monotonic()
+        for i in range(_policy.attempts):
+            if i > 0:
+                if not idempotent and (verify is None or not await verify()):
+                    break
+                _stats.retries += 1
+                await asyncio.sleep(_policy.delay(i - 1, self._rnd))
+            if not self.breaker.allow():
+                _stats.rejected += 1
+                break
+            _stats.attempts += 1
+            try:
+                _res = await func()
+            except (serial.serialutil.SerialException, OSError):
+                _res = None
+            if _res is not None and _accept(_res):
+                self.breaker.success()
+                _stats.successes += 1
+                _stats.latencies.append(time.monotonic() - _strt)
+                return _res
+            self.breaker.failure()
+        _stats.failures += 1
+        return None
+
+    def as_dict(self):
+        """Returns the retry and latency statistics of all the commands."""
+        return {"breaker": self.breaker.state,
+                "breaker_opened": self.breaker.opened_count,
+                "commands": {_n: _s.as_dict() for _n, _s in self.stats.items()}}
+
+
+def _responded(resp):
+    """Accepts any response that arrived."""
+    return resp[0] is not None
@@ -0,0 +1,309 @@
+"""Module for ordering the files to download from an ARIMU.
+
+When a watch is docked only briefly, the files that matter most should be
+got first. DownloadScheduler keeps the files still to get and hands them out
+by a policy:
+
+    LISTED          In the order the device listed them.
+    NEWEST_FIRST    Newest first, by the epoch in the file name. Files
+                    whose name has no epoch come last, as listed.
+    SMALLEST_FIRST  Smallest first. The list of files has no sizes, so a
+                    file's size is estimated from the time it covers (the gap
+                    to the next file of its subject) and the bytes per second
+                    of recording measured on the files got.
+
+With 'fair', the subjects take turns, each in the order of the policy. With
+a 'deadline' (seconds from now, e.g. how long a watch stays docked), the
+files that cannot be got in the time left at the measured transfer rate are
+left to the end, so that the time is not spent on a file that cannot finish.
+A file that fails is queued again after a backoff, a few times at most and
+within a retry budget for all the files (see failed()).
+
+    scheduler = DownloadScheduler(NEWEST_FIRST, fair=True, deadline=600)
+    scheduler.add_many(new_files)
+    while True:
+        name = scheduler.pop()
+        if name is None:
+            break
+        ...
+        scheduler.update_rate(nbytes, seconds)
+        scheduler.done(name, size)  # or scheduler.failed(name)
+
+Author: Sivakumar Balasubramanian
+Date: 17 October 2026
+Email: siva82kb@gmail.com
+"""
+
+import bisect
+import collections
+import heapq
+import itertools
+import sys
+import time
+
+from arimuprotocol import IMU_RECORD
+from arimuretry import RetryPolicy
+
+LISTED = "listed"
+NEWEST_FIRST = "newest"
+SMALLEST_FIRST = "smallest"
+POLICIES = (LISTED, NEWEST_FIRST, SMALLEST_FIRST)
+
+
+def file_subject(name):
+    """Returns the subject of a data file, e.g. subj_data_1700000000.bin."""
+    return name.split("_", maxsplit=1)[0]
+
+
+def file_epoch(name):
+    """Returns the epoch in the name of a data file, e.g.
+    subj_data_1700000000.bin, or None when the name has no epoch."""
+    try:
+        return int(name.split("_")[-1].split(".")[0])
+    except ValueError:
+        return None
+
+
+class DownloadScheduler(object):
+    """Queue of the files to download from a device, ordered by a policy
+    (see the module docstring). Files can be added while files are being
+    got, e.g. as the list of files arrives."""
+    POLICY = NEWEST_FIRST
+    # Transfer rate (kB/s) assumed till one is measured: a 115200 baud link.
+    DEFAULT_KBPS = 11.0
+    # Weight of a new measurement of the rates.
+    RATE_ALPHA = 0.3
+    # Bytes a file takes per second of recording, till it is measured: IMU
+    # records at 100 Hz.
+    BYTES_PER_SECOND = IMU_RECORD.size * 100
+    # Time (seconds) a file is taken to cover when nothing is known.
+    FILE_SECONDS = 3600
+    # Attempts to get a file, and the backoff before each retry.
+    RETRY_POLICY = RetryPolicy(attempts=3, backoff=2.0, max_backoff=30.0,
+                               jitter=0.25)
+    # Number of retries of all the files, so that a link that keeps failing
+    # does not keep the files coming back.
+    RETRY_BUDGET = 20
+
+    def __init__(self, policy=POLICY, fair=False, deadline=None,
+                 kBps=DEFAULT_KBPS, retry=RETRY_POLICY,
+                 retry_budget=RETRY_BUDGET) -> None:
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown download policy {policy}.")
+        self.policy = policy
+        self.fair = fair
+        # End of the time (monotonic) to get the files in, or None.
+        self.deadline = (None if deadline is None
+                         else time.monotonic() + deadline)
+        self.kBps = kBps
+        self.bytes_per_second = DownloadScheduler.BYTES_PER_SECOND
+        self._seq = itertools.count()
+        # Heap of (key, seq, name) of each subject, or of all the files
+        # when not 'fair'. An entry is stale when its key is not the key of
+        # the file in _keys.
+        self._heaps = {}
+        self._turns = collections.deque()
+        self._keys = {}
+        # Files left to the end, as they do not fit before the deadline.
+        self._late = collections.deque()
+        # Sorted epochs, and names by epoch, of all the files of each
+        # subject, for the time each file covers.
+        self._epochs = collections.defaultdict(list)
+        self._names = collections.defaultdict(dict)
+        self._sizes = {}
+        # The epochs are only needed to order or to estimate the files.
+        self._use_epochs = policy != LISTED or deadline is not None
+        self.retry = retry
+        self.retry_budget = retry_budget
+        # Failures of each file, and the heap of (due, seq, name) of the
+        # files to retry.
+        self.failures = {}
+        self._retries = []
+
+    def __len__(self):
+        return len(self._keys) + len(self._late) + len(self._retries)
+
+    def __contains__(self, name):
+        return (name in self._keys or name in self._late
+                or any(_r[2] == name for _r in self._retries))
+
+    @property
+    def incremental(self):
+        """If the files can be got as they are listed. The orders other than
+        LISTED need the whole list, as the device lists the oldest first."""
+        return self.policy == LISTED
+
+    def add(self, name, size=None):
+        """Adds a data file to get. 'size' is its size, when known."""
+        if size is not None:
+            self._sizes[name] = size
+        if name in self:
+            return
+        _subj = file_subject(name)
+        _epoch = file_epoch(name) if self._use_epochs else None
+        if _epoch is not None and _epoch not in self._names[_subj]:
+            bisect.insort(self._epochs[_subj], _epoch)
+            self._names[_subj][_epoch] = name
+            if self.policy == SMALLEST_FIRST:
+                # The file before this one now has a known end, and the
+                # estimate of the last file has changed.
+                _epochs = self._epochs[_subj]
+                _i = bisect.bisect_left(_epochs, _epoch)
+                for _e in {_epochs[_i - 1] if _i > 0 else _epoch, _epochs[-1]}:
+                    if self._names[_subj][_e] in self._keys:
+                        self._push(self._names[_subj][_e])
+        self._push(name)
+
+    def add_many(self, names):
+        for _n in names:
+            self.add(_n)
+
+    def pop(self):
+        """Returns the next file to get, or None when there is none. The
+        files that do not fit before the deadline come last, and the files
+        to retry come back when their backoff is over."""
+        _now = time.monotonic()
+        while len(self._retries) > 0 and self._retries[0][0] <= _now:
+            self._push(heapq.heappop(self._retries)[2])
+        while len(self._turns) > 0:
+            _bucket = self._turns.popleft()
+            _name = self._pop_fitting(_bucket)
+            if len(self._heaps[_bucket]) > 0:
+                self._turns.append(_bucket)
+            else:
+                del self._heaps[_bucket]
+            if _name is not None:
+                return _name
+        return self._late.popleft() if len(self._late) > 0 else None
+
+    def remove(self, name):
+        """Drops a file that is no longer to be got."""
+        if self._keys.pop(name, None) is None and name in self._late:
+            self._late.remove(name)
+        self._retries = [_r for _r in self._retries if _r[2] != name]
+        heapq.heapify(self._retries)
+
+    def failed(self, name):
+        """Records a failure to get the file, and queues it again after a
+        backoff if it has attempts left and the retry budget is not used
+        up. Returns if the file will be tried again."""
+        _n = self.failures.get(name, 0) + 1
+        self.failures[name] = _n
+        if _n >= self.retry.attempts or self.retry_budget <= 0:
+            return False
+        self.retry_budget -= 1
+        heapq.heappush(self._retries, (time.monotonic() + self.retry.delay(_n - 1),
+                                       next(self._seq), name))
+        return True
+
+    def retry_wait(self):
+        """Returns the time (seconds) till the next file to retry is due, or
+        None when there is no file to retry."""
+        if len(self._retries) == 0:
+            return None
+        return max(0.0, self._retries[0][0] - time.monotonic())
+
+    def update_rate(self, nbytes, seconds):
+        """Updates the transfer rate with 'nbytes' got in 'seconds'."""
+        if seconds <= 0 or nbytes <= 0:
+            return
+        self.kBps += DownloadScheduler.RATE_ALPHA * (nbytes / 1024 / seconds
+                                                     - self.kBps)
+
+    def done(self, name, size):
+        """Records the size of a file got, which gives the bytes per second
+        of recording when the time the file covers is known."""
+        self._sizes[name] = size
+        _secs = self._covered(name)
+        if _secs is not None and _secs > 0:
+            self.bytes_per_second += DownloadScheduler.RATE_ALPHA * (
+                size / _secs - self.bytes_per_second
+            )
+
+    def time_left(self):
+        """Returns the time (seconds) left till the deadline, or None."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def estimate_size(self, name):
+        """Returns the size (bytes) of the file, or its estimate."""
+        if name in self._sizes:
+            return self._sizes[name]
+        _secs = self._covered(name)
+        if _secs is None:
+            _secs = self._typical_seconds(file_subject(name))
+        return _secs * self.bytes_per_second
+
+    def estimate_seconds(self, name):
+        """Returns the estimated time (seconds) to get the file."""
+        return self.estimate_size(name) / 1024 / self.kBps
+
+    def fits(self, name):
+        """Returns if the file can be got before the deadline."""
+        _left = self.time_left()
+        return _left is None or self.estimate_seconds(name) <= _left
+
+    def _covered(self, name):
+        """Returns the time (seconds) from the file to the next file of its
+        subject, or None for the last file of the subject or a file with no
+        epoch."""
+        _epoch = file_epoch(name) if self._use_epochs else None
+        if _epoch is None:
+            return None
+        _epochs = self._epochs[file_subject(name)]
+        _i = bisect.bisect_right(_epochs, _epoch)
+        return _epochs[_i] - _epochs[_i - 1] if _i < len(_epochs) else None
+
+    def _typical_seconds(self, subj):
+        """Returns the mean time (seconds) the files of the subject cover."""
+        _epochs = self._epochs[subj]
+        if len(_epochs) < 2:
+            return DownloadScheduler.FILE_SECONDS
+        return (_epochs[-1] - _epochs[0]) / (len(_epochs) - 1)
+
+    def _key(self, name):
+        if self.policy == NEWEST_FIRST:
+            # The files with no epoch last, in the order they were added.
+            _epoch = file_epoch(name)
+            return float("inf") if _epoch is None else -_epoch
+        if self.policy == SMALLEST_FIRST:
+            return self.estimate_size(name)
+        return 0
+
+    def _push(self, name):
+        _bucket = file_subject(name) if self.fair else ""
+        if _bucket not in self._heaps:
+            self._heaps[_bucket] = []
+            self._turns.append(_bucket)
+        _key = self._key(name)
+        self._keys[name] = _key
+        heapq.heappush(self._heaps[_bucket], (_key, next(self._seq), name))
+
+    def _pop_fitting(self, bucket):
+        """Returns the first file of the bucket that fits before the
+        deadline, leaving the ones before it to the end."""
+        _heap = self._heaps[bucket]
+        while len(_heap) > 0:
+            _key, _, _name = heapq.heappop(_heap)
+            if self._keys.get(_name) != _key:
+                continue
+            del self._keys[_name]
+            if self.fits(_name):
+                return _name
+            self._late.append(_name)
+        return None
+
+
+if __name__ == "__main__":
+    # python arimuschedule.py policy [--fair] name [name ...]
+    _args = sys.argv[1:]
+    _fair = "--fair" in _args
+    _args = [_a for _a in _args if _a != "--fair"]
+    _scheduler = DownloadScheduler(_args[0], fair=_fair)
+    _scheduler.add_many(_args[1:])
+    while True:
+        _name = _scheduler.pop()
+        if _name is None:
+            break
+        sys.stdout.write(f"{_name:<32} {_scheduler.estimate_size(_name):10.0f} B\n")
@@ -0,0 +1,171 @@
+"""Module implementing a session with a number of ARIMU devices on one event
+loop.
+
+ArimuSession takes an ArimuAsync for each port from an ArimuPool, and fans
+a command out to all the devices at once, so that a bank of docked watches
+takes the time of one round trip and not one round trip per watch. Each device gets its own
+result, and a device that fails or times out does not hold up or fail the
+others.
+
+    async with ArimuSession(["COM15", "COM16", "COM19"]) as session:
+        for port, res in (await session.gettime_all()).items():
+            print(port, res.value if res.ok else res.error)
+
+Author: Sivakumar Balasubramanian
+Date: 17 October 2026
+Email: siva82kb@gmail.com
+"""
+
+import asyncio
+import time
+
+from arimupool import ArimuPool
+
+
+class DeviceResult(object):
+    """Result of an operation on one device: the value returned, or the
+    error raised, and the time (seconds) it took."""
+    __slots__ = ("port", "value", "error", "seconds")
+
+    def __init__(self, port, value=None, error=None, seconds=0.0) -> None:
+        self.port = port
+        self.value = value
+        self.error = error
+        self.seconds = seconds
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        _res = f"value={self.value!r}" if self.ok else f"error={self.error!r}"
+        return f"DeviceResult({self.port}, {_res}, {self.seconds:.4f}s)"
+
+
+class ArimuSession(object):
+    """A set of ARIMU connections driven from one event loop."""
+    # Default time (seconds) an operation on a device may take.
+    TIMEOUT = 2.0
+
+    def __init__(self, ports, baudrate=115200, timeout=TIMEOUT,
+                 pool=None) -> None:
+        self.ports = list(ports)
+        self.timeout = timeout
+        # Connections are taken from the given pool, so that they outlive
+        # the session, or else from a pool of the session's own.
+        self._own_pool = pool is None
+        self.pool = ArimuPool(baudrate) if pool is None else pool
+        # Open devices, and the errors of the ones that could not be opened.
+        self.devices = {}
+        self.open_errors = {}
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close()
+
+    async def open(self):
+        """Opens all the ports at once, through the pool, so that ports the
+        pool already has open are not opened again. Returns the errors of
+        the ports that could not be opened."""
+        _ports = [_p for _p in self.ports if _p not in self.devices]
+        _res = await asyncio.gather(
+            *[self.pool.acquire(_p) for _p in _ports],
+            return_exceptions=True
+        )
+        _cancelled = None
+        for _p, _r in zip(_ports, _res):
+            if isinstance(_r, asyncio.CancelledError):
+                _cancelled = _r
+            elif isinstance(_r, Exception):
+                self.open_errors[_p] = _r
+            else:
+                self.devices[_p] = _r
+                self.open_errors.pop(_p, None)
+        # A cancelled open is not an error of the port. The devices that
+        # were opened are kept, for close() to hand back.
+        if _cancelled is not None:
+            raise _cancelled
+        return self.open_errors
+
+    def close(self):
+        """Hands the connections back to the pool, and closes them if the
+        pool is the session's own."""
+        for _p in self.devices:
+            self.pool.release(_p)
+        self.devices = {}
+        if self._own_pool:
+            self.pool.close()
+
+    async def fanout(self, func, timeout=None, ports=None):
+        """Awaits 'func(arimu)' on all the open devices (or on the given
+        ports) at once. Returns {port: DeviceResult}."""
+        _timeout = self.timeout if timeout is None else timeout
+        _ports = [_p for _p in (self.ports if ports is None else ports)
+                  if _p in self.devices]
+        _res = await asyncio.gather(
+            *[self._run(_p, func, _timeout) for _p in _ports]
+        )
+        return dict(zip(_ports, _res))
+
+    async def _run(self, port, func, timeout):
+        _strt = time.perf_counter()
+        try:
+            _val = await asyncio.wait_for(func(self.devices[port]), timeout)
+            return DeviceResult(port, value=_val,
+                                seconds=time.perf_counter() - _strt)
+        except asyncio.CancelledError:
+            # An Exception before Python 3.8; the call is cancelled, not
+            # failed on this device.
+            raise
+        except Exception as e:
+            return DeviceResult(port, error=e,
+                                seconds=time.perf_counter() - _strt)
+
+    async def command_all(self, name, *args, timeout=None, **kwargs):
+        """Calls the ArimuAsync command 'name' (e.g. "ping") on all the
+        devices. A device that does not respond gets a TimeoutError."""
+        async def _cmd(arimu):
+            _resp = await getattr(arimu, name)(*args, **kwargs)
+            if _resp[0] is None:
+                raise TimeoutError(f"No response to {name}.")
+            return _resp
+        return await self.fanout(_cmd, timeout)
+
+    async def ping_all(self, timeout=None):
+        """Device names of all the devices."""
+        return await self.fanout(lambda a: _value(a.ping()), timeout)
+
+    async def gettime_all(self, timeout=None):
+        """(time, micros) of all the devices."""
+        return await self.fanout(lambda a: _value(a.gettime()), timeout)
+
+    async def settime_all(self, dtvalue=None, timeout=None):
+        """Sets the time of all the devices to 'dtvalue', or to the current
+        time when each device is sent the command when None. Returns the
+        (time, micros) of the devices."""
+        return await self.fanout(
+            lambda a: _value(a.settime(dtvalue=dtvalue)), timeout
+        )
+
+    async def listfiles_all(self, timeout=None):
+        """Names of the files on all the devices."""
+        async def _list(arimu):
+            _names = []
+            async for _r in arimu.listfiles():
+                if _r[0] is None:
+                    raise TimeoutError("Incomplete list of files.")
+                _names += _r[3]
+            return _names
+        return await self.fanout(_list, timeout)
+
+
+async def _value(coro):
+    """Returns the data of a command's response, or raises TimeoutError if
+    there was no response."""
+    _resp = await coro
+    if _resp[0] is None:
+        raise TimeoutError("No response.")
+    return _resp[3]
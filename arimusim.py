@@ -0,0 +1,361 @@
+"""Module implementing a simulated ARIMU device for testing and load testing
+the hub without the watches.
+
+The simulator answers all the ArimuCommands the way the firmware does,
+follows the ArimuStates state model, and serves a set of data files. It runs
+on any device end from jeditransport (pty://, tcp://host:port, mem://name),
+and the link can be made slow and flaky with a link rate, latency, jitter,
+byte corruption and disconnects.
+
+    sim = ArimuSimulator("pty://", name="ARIMU_SIM01")
+    sim.start()
+    arimu = ArimuAsync(sim.host_url)
+
+Author: Sivakumar Balasubramanian
+Date: 17 October 2026
+Email: siva82kb@gmail.com
+"""
+
+import random
+import struct
+import sys
+import threading
+import time
+from datetime import datetime as dt
+from datetime import timedelta as tdel
+
+import serial
+
+from arimuprotocol import (ArimuAdditionalFlags,
+                           ArimuCommands,
+                           ArimuStates,
+                           FileDataCodec,
+                           IMU_RECORD,
+                           MICROS,
+                           SETTIME_ARGS)
+from jediframe import JediDecoder, encode_frame
+from jeditransport import open_device
+
+
+def make_imu_file(epoch, nrecords, rate=100, seed=0):
+    """Returns the contents of a data file with 'nrecords' IMU records
+    sampled at 'rate' Hz starting at the time 'epoch'."""
+    _rnd = random.Random(seed)
+    _out = bytearray()
+    for i in range(nrecords):
+        _us = i * 1000000 // rate
+        _out += IMU_RECORD.pack(epoch + _us // 1000000, _us & 0xffffffff,
+                                *[_rnd.randint(-2048, 2047) for _ in range(6)])
+    return bytes(_out)
+
+
+def make_files(subject="subj", nfiles=5, nrecords=(500, 3000),
+               start=1700000000, seed=0):
+    """Returns a dict of data files (name: contents) of a subject, with the
+    number of records of each file drawn from the range 'nrecords'."""
+    _rnd = random.Random(seed)
+    _files = {}
+    _epoch = start
+    for i in range(nfiles):
+        _n = _rnd.randint(*nrecords)
+        _files[f"{subject}_data_{_epoch}.bin"] = make_imu_file(_epoch, _n,
+                                                               seed=seed + i)
+        _epoch += _n // 100 + _rnd.randint(60, 3600)
+    return _files
+
+
+class ArimuSimulator(threading.Thread):
+    """A simulated ARIMU device.
+
+    Link impairments (all off by default):
+        link_rate       Bytes per second sent to the hub (None is unlimited).
+        latency         Delay (seconds) before each response.
+        jitter          Random extra delay (seconds), up to this value.
+        corrupt_rate    Probability of corrupting each byte sent.
+        disconnect_rate Probability per second of dropping the link.
+        reconnect_delay Time (seconds) the link stays down.
+    """
+    # Largest number of file data bytes in a FILECONTENT frame.
+    FILECONTENT_SIZE = 249
+    # Largest LISTFILES chunk.
+    LISTFILES_SIZE = 240
+    # Rate (Hz) of the STARTSTREAM records.
+    STREAM_RATE = 100
+    # Read timeout (seconds) of the command loop.
+    READ_TIMEOUT = 0.01
+
+    def __init__(self, url="pty://", name="ARIMU_SIM", subject="subj",
+                 files=None, link_rate=None, latency=0.0, jitter=0.0,
+                 corrupt_rate=0.0, disconnect_rate=0.0, reconnect_delay=1.0,
+                 seed=None) -> None:
+        super().__init__(daemon=True)
+        self.url = url
+        self.devname = name
+        self.subject = subject
+        self.files = make_files(subject) if files is None else dict(files)
+        self.link_rate = link_rate
+        self.latency = latency
+        self.jitter = jitter
+        self.corrupt_rate = corrupt_rate
+        self.disconnect_rate = disconnect_rate
+        self.reconnect_delay = reconnect_delay
+        self._rnd = random.Random(seed)
+        # Device state.
+        self.state = ArimuStates.NONE
+        self.err = 0
+        self.currfile = ""
+        self._clock_offset = 0.0
+        self._boot = time.monotonic()
+        self._expt_start = None
+        self._next_record = None
+        # Book keeping.
+        self.commands = {}
+        self.bytes_sent = 0
+        self.disconnects = 0
+        self._stop_event = threading.Event()
+        self._cmd_handlers = self._handlers()
+        self._port = open_device(url, timeout=ArimuSimulator.READ_TIMEOUT)
+
+    @property
+    def host_url(self):
+        """URL the hub opens to talk to this device."""
+        return self._port.host_url
+
+    def stop(self):
+        self._stop_event.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join()
+        self._port.close()
+
+    def run(self):
+        _decoder = JediDecoder()
+        _last = time.monotonic()
+        while not self._stop_event.is_set():
+            try:
+                _data = self._port.read(max(1, self._port.in_waiting))
+            except serial.serialutil.SerialException:
+                # The hub closed its end of the link.
+                _data = b""
+                time.sleep(ArimuSimulator.READ_TIMEOUT)
+            for _pl in _decoder.feed(_data):
+                if len(_pl) > 0:
+                    self._handle(_pl[0], bytes(_pl[1:]))
+            _now = time.monotonic()
+            if self.state == ArimuStates.STREAMING:
+                self._stream(_now)
+            if (self.disconnect_rate > 0
+                    and self._rnd.random() < self.disconnect_rate * (_now - _last)):
+                self._disconnect()
+                _decoder.reset()
+            _last = _now
+
+    def now(self):
+        """Current time of the device's clock."""
+        return dt.now() + tdel(seconds=self._clock_offset)
+
+    def micros(self):
+        """Microseconds since the device was started."""
+        return int((time.monotonic() - self._boot) * 1e6) & 0xffffffff
+
+    def _send(self, cmd, data=b""):
+        """Sends a response frame to the hub over the simulated link."""
+        _frame = encode_frame(bytes([cmd, self.state, self.err]) + data)
+        if self.corrupt_rate > 0:
+            _frame = bytearray(_frame)
+            for i in range(len(_frame)):
+                if self._rnd.random() < self.corrupt_rate:
+                    _frame[i] ^= 1 << self._rnd.randrange(8)
+            _frame = bytes(_frame)
+        if self.link_rate:
+            time.sleep(len(_frame) / self.link_rate)
+        try:
+            self._port.write(_frame)
+        except serial.serialutil.SerialException:
+            return
+        self.bytes_sent += len(_frame)
+
+    def _disconnect(self):
+        """Drops the link for 'reconnect_delay' seconds."""
+        self.disconnects += 1
+        if hasattr(self._port, "drop"):
+            self._port.drop()
+            self._stop_event.wait(self.reconnect_delay)
+            return
+        self._port.close()
+        self._stop_event.wait(self.reconnect_delay)
+        self._port = open_device(self.url, timeout=ArimuSimulator.READ_TIMEOUT)
+
+    def _handle(self, cmd, args):
+        """Handles a command from the hub."""
+        self.commands[cmd] = self.commands.get(cmd, 0) + 1
+        if cmd == ArimuCommands.DOCKSTNPING:
+            # Keeps the docking station mode alive, and is not answered.
+            return
+        _handler = self._cmd_handlers.get(cmd)
+        if _handler is None:
+            return
+        if self.latency > 0 or self.jitter > 0:
+            time.sleep(self.latency + self._rnd.uniform(0, self.jitter))
+        _handler(cmd, args)
+
+    def _handlers(self):
+        return {
+            ArimuCommands.STATUS: self._reply,
+            ArimuCommands.PING: self._reply_name,
+            ArimuCommands.LISTFILES: self._reply_listfiles,
+            ArimuCommands.GETFILEDATA: self._reply_getfiledata,
+            ArimuCommands.DELETEFILE: self._reply_deletefile,
+            ArimuCommands.GETMICROS: self._reply_micros,
+            ArimuCommands.SETTIME: self._reply_settime,
+            ArimuCommands.GETTIME: self._reply_time,
+            ArimuCommands.STARTSTREAM: self._change_state(ArimuStates.STREAMING),
+            ArimuCommands.STOPSTREAM: self._change_state(ArimuStates.NONE),
+            ArimuCommands.SETSUBJECT: self._reply_setsubject,
+            ArimuCommands.GETSUBJECT: self._reply_subject,
+            ArimuCommands.STARTEXPT: self._change_state(ArimuStates.EXPERIMENT),
+            ArimuCommands.STOPEXPT: self._change_state(ArimuStates.NONE),
+            ArimuCommands.STARTDOCKSTNCOMM: self._change_state(ArimuStates.DOCKSTNCOMM),
+            ArimuCommands.STOPDOCKSTNCOMM: self._change_state(ArimuStates.NONE),
+            ArimuCommands.STARTNORMAL: self._change_state(ArimuStates.NORMAL),
+            ArimuCommands.STOPNORMAL: self._change_state(ArimuStates.NONE),
+            ArimuCommands.SETTONONE: self._change_state(ArimuStates.NONE),
+            ArimuCommands.CURRENTFILENAME: self._reply_currfile,
+        }
+
+    def _reply(self, cmd, args):
+        self._send(cmd)
+
+    def _reply_name(self, cmd, args):
+        self._send(cmd, self.devname.encode())
+
+    def _reply_subject(self, cmd, args):
+        self._send(cmd, self.subject.encode())
+
+    def _reply_currfile(self, cmd, args):
+        self._send(cmd, self.currfile.encode())
+
+    def _reply_setsubject(self, cmd, args):
+        self.subject = args.split(b"\0")[0].decode()
+        self._send(cmd, self.subject.encode())
+
+    def _reply_micros(self, cmd, args):
+        self._send(cmd, MICROS.encode(self.micros()))
+
+    def _reply_time(self, cmd, args):
+        _t = self.now()
+        self._send(cmd, SETTIME_ARGS.encode(_t) + MICROS.encode(self.micros()))
+
+    def _reply_settime(self, cmd, args):
+        try:
+            _yy, _mm, _dd, _HH, _MM, _SS, _cs = SETTIME_ARGS.decode(args)
+            _t = dt(2000 + _yy, _mm, _dd, _HH, _MM, _SS, _cs * 10000)
+            self._clock_offset = (_t - dt.now()).total_seconds()
+        except (struct.error, ValueError):
+            # Bad time. The clock is left as it is.
+            pass
+        self._reply_time(cmd, args)
+
+    def _change_state(self, newstate):
+        """Returns a handler for a command that changes the state."""
+        def _handler(cmd, args):
+            self._enter_state(newstate)
+            self._send(cmd)
+        return _handler
+
+    def _enter_state(self, newstate):
+        # Leaving the experiment closes its data file.
+        if self.state == ArimuStates.EXPERIMENT and newstate != ArimuStates.EXPERIMENT:
+            _dur = time.monotonic() - self._expt_start
+            _epoch = int(time.time() - _dur)
+            self.files[self.currfile] = make_imu_file(
+                _epoch, int(_dur * ArimuSimulator.STREAM_RATE)
+            )
+            self.currfile = ""
+        if newstate == ArimuStates.EXPERIMENT and self.state != ArimuStates.EXPERIMENT:
+            self._expt_start = time.monotonic()
+            self.currfile = f"{self.subject}_data_{int(time.time())}.bin"
+        if newstate == ArimuStates.STREAMING:
+            self._next_record = time.monotonic()
+        self.state = newstate
+
+    def _stream(self, now):
+        """Sends the STARTSTREAM records that are due."""
+        while self._next_record <= now:
+            _us = self.micros()
+            self._send(ArimuCommands.STARTSTREAM,
+                       IMU_RECORD.pack(int(time.time()), _us,
+                                       *[self._rnd.randint(-2048, 2047)
+                                         for _ in range(6)]))
+            self._next_record += 1.0 / ArimuSimulator.STREAM_RATE
+
+    def _reply_listfiles(self, cmd, args):
+        if self.state != ArimuStates.DOCKSTNCOMM:
+            self._send(cmd)
+            return
+        # The list is sent in chunks of whole file names. The first chunk
+        # starts with '[', the last ends with ']' and the others with ','.
+        _names = list(self.files.keys())
+        _chunk = "["
+        for i, _n in enumerate(_names):
+            _item = _n + ("]" if i == len(_names) - 1 else ",")
+            if len(_chunk) + len(_item) > ArimuSimulator.LISTFILES_SIZE:
+                self._send(cmd, _chunk.encode())
+                _chunk = ""
+            _chunk += _item
+        if len(_names) == 0:
+            _chunk += "]"
+        self._send(cmd, _chunk.encode())
+
+    def _reply_getfiledata(self, cmd, args):
+        _name = args.split(b"\0")[0].decode()
+        if self.state != ArimuStates.DOCKSTNCOMM or _name not in self.files:
+            self._send(cmd, bytes([ArimuAdditionalFlags.NOFILE]))
+            return
+        _data = self.files[_name]
+        _size = len(_data)
+        self._send(cmd, bytes([ArimuAdditionalFlags.FILEHEADER])
+                   + FileDataCodec.FILE_SIZE.pack(_size))
+        _step = ArimuSimulator.FILECONTENT_SIZE
+        for i in range(0, max(_size, 1), _step):
+            _last = i + _step >= _size
+            _prg = 255 if _last else min(254, (i + _step) * 255 // _size)
+            self._send(cmd, bytes([ArimuAdditionalFlags.FILECONTENT, _prg])
+                       + _data[i:i + _step])
+
+    def _reply_deletefile(self, cmd, args):
+        _name = args.split(b"\0")[0].decode()
+        if self.state == ArimuStates.DOCKSTNCOMM and _name in self.files:
+            del self.files[_name]
+            self._send(cmd, bytes([ArimuAdditionalFlags.FILEDELETED]))
+        else:
+            self._send(cmd, bytes([ArimuAdditionalFlags.FILENOTDELETED]))
+
+
+def start_simulators(n, url="pty://", **kwargs):
+    """Starts 'n' simulated devices, and returns them. For mem:// URLs each
+    device gets its own link, named after the given URL and its number."""
+    _sims = []
+    for i in range(n):
+        _url = f"{url}{i:02d}" if url.startswith("mem://") else url
+        _sim = ArimuSimulator(_url, name=f"ARIMU_SIM{i:02d}",
+                              subject=f"subj{i:02d}",
+                              files=make_files(f"subj{i:02d}", seed=i),
+                              seed=i, **kwargs)
+        _sim.start()
+        _sims.append(_sim)
+    return _sims
+
+
+if __name__ == "__main__":
+    _n = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    _url = sys.argv[2] if len(sys.argv) > 2 else "pty://"
+    sims = start_simulators(_n, _url)
+    for _sim in sims:
+        sys.stdout.write(f"{_sim.devname}: {_sim.host_url}\n")
+    sys.stdout.flush()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        for _sim in sims:
+            _sim.stop()
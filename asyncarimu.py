@@ -1,479 +1,555 @@
-# Module implementing asynchronous communication with ARIMU using
-# the JEDI protocol.
-#
-# Author: Sivakumar Balasubramanian
-# Date: 20 July 2022
-# Email: siva82kb@gmail.com
-
-
-import serial
-import enum
-import sys
-import time
-import struct
-from datetime import datetime as dt
-import asyncio
-from serial.tools.list_ports import comports
-
-_DEBUG = False
-
-# Jedi parsing states
-class JediParsingStates(enum.Enum):
-    LookingForHeader = 0
-    FoundHeader1 = 1
-    FoundHeader2 = 2
-    ReadingPayload = 3
-    CheckCheckSum = 4
-    FoundFullPacket = 5
-
-# ARIMU Errors
-Error_Types1 = ["ImuIntFail",
-                "SdNoCont",
-                "RtcNoSet",
-                "DatFlNoCrt",
-                "DatFlNoRdl",
-                "DatFlNoFnd"]
-
-# ARIMU Commands
-class ArimuCommands(object):
-    STATUS = 0
-    PING = 1
-    LISTFILES = 2
-    GETFILEDATA = 3
-    DELETEFILE = 4
-    GETMICROS = 5
-    SETTIME = 6
-    GETTIME = 7
-    STARTSTREAM = 8
-    STOPSTREAM = 9
-    SETSUBJECT = 10
-    GETSUBJECT = 11
-    STARTEXPT = 12
-    STOPEXPT = 13
-    STARTDOCKSTNCOMM = 14
-    STOPDOCKSTNCOMM = 15
-    DOCKSTNPING = 16
-    STARTNORMAL = 17
-    STOPNORMAL = 18
-    SETTONONE = 19
-    CURRENTFILENAME = 128
-
-# Other constants
-class ArimuAdditionalFlags(object):
-    NOFILE = 0
-    FILESEARCHING = 1
-    FILEHEADER = 2
-    FILECONTENT = 3
-    FILEDELETED = 4
-    FILENOTDELETED = 5
-    
-    @staticmethod
-    def flag_name(val):
-        addl_flag_text = ["NOFILE",
-                          "FILESEARCHING",
-                          "FILEHEADER",
-                          "FILECONTENT",
-                          "FILEDELETED",
-                          "FILENOTDELETED",]
-        return addl_flag_text[val]
-
-# ARIMU States.
-class ArimuStates(object):
-    NONE = 0
-    BADERROR = 1
-    NORMAL = 2
-    EXPERIMENT = 3
-    DOCKSTNCOMM = 4
-    STREAMING = 5
-    
-    @staticmethod
-    def state_name(val):
-        state_text = ["NONE",
-                      "BADERROR",
-                      "NORMAL",
-                      "EXPERIMENT",
-                      "DOCKSTNCOMM",
-                      "STREAMING",]
-        return state_text[val] if val > 0 else ""
-
-
-def get_number_bits(num):
-    return  [int(x) for x in '{:08b}'.format(num)]
-
-
-# Asynchronous ARIMU Class
-class ArimuAsync(object):
-    
-    def __init__(self, comport, baudrate=115200):
-        self.comport = comport
-        self.baurdate = baudrate
-        self.cmd_delay = 0.1
-        self._client = serial.Serial(comport, baudrate)
-        time.sleep(2)
-        
-    def close(self):
-        self._client.close()
-
-    async def status(self, timeout=0.5):
-        """STATUS and await response."""
-        # Write the PING message.
-        self.send_jedi_message([ArimuCommands.STATUS])
-        await asyncio.sleep(self.cmd_delay)
-        _resp = await self.read_jedi_packet(ArimuCommands.STATUS,
-                                            timeout)
-        if _resp is None:
-            return (None, None, None, None)
-        else:
-            return (_resp[0], _resp[1], _resp[2], _resp[3:])
-    
-    async def ping(self, timeout=0.5):
-        """PING and await response."""
-        # Write the PING message.
-        self.send_jedi_message([ArimuCommands.PING])
-        await asyncio.sleep(self.cmd_delay)
-        _resp = await self.read_jedi_packet(ArimuCommands.PING,
-                                            timeout)
-        if _resp is None:
-            return (None, None, None, None)
-        else:
-            return (_resp[0], _resp[1], _resp[2], _resp[3:])
-
-    async def dockstnping(self, timeout=0.5):
-        """DOCKSTNPING."""
-        # Write the PING message.
-        self.send_jedi_message([ArimuCommands.DOCKSTNPING])
-        await asyncio.sleep(self.cmd_delay)
-        return (None, None, None, None)
-    
-    async def startdockstncomm(self, timeout=0.5):
-        """STARTDOCKSTNCOMM and await response."""
-        # Write the PING message.
-        self.send_jedi_message([ArimuCommands.STARTDOCKSTNCOMM])
-        await asyncio.sleep(self.cmd_delay)
-        _resp = await self.read_jedi_packet(ArimuCommands.STARTDOCKSTNCOMM,
-                                            timeout)
-        if _resp is None:
-            return (None, None, None, None)
-        else:
-            return (_resp[0], _resp[1], _resp[2], _resp[3:])
-    
-    async def stopdockstncomm(self, timeout=0.5):
-        """STOPDOCKSTNCOMM and await response."""
-        # Write the PING message.
-        self.send_jedi_message([ArimuCommands.STOPDOCKSTNCOMM])
-        await asyncio.sleep(self.cmd_delay)
-        _resp = await self.read_jedi_packet(ArimuCommands.STOPDOCKSTNCOMM,
-                                            timeout)
-        if _resp is None:
-            return (None, None, None, None)
-        else:
-            return (_resp[0], _resp[1], _resp[2], _resp[3:])
-    
-    async def startnormal(self, timeout=0.5):
-        """STARTNORMAL and await response."""
-        # Write the PING message.
-        self.send_jedi_message([ArimuCommands.STARTNORMAL])
-        await asyncio.sleep(self.cmd_delay)
-        _resp = await self.read_jedi_packet(ArimuCommands.STARTNORMAL,
-                                            timeout)
-        if _resp is None:
-            return (None, None, None, None)
-        else:
-            return (_resp[0], _resp[1], _resp[2], _resp[3:])
-    
-    async def stopnormal(self, timeout=0.5):
-        """STOPNORMAL and await response."""
-        # Write the PING message.
-        self.send_jedi_message([ArimuCommands.STOPNORMAL])
-        await asyncio.sleep(self.cmd_delay)
-        _resp = await self.read_jedi_packet(ArimuCommands.STOPNORMAL,
-                                            timeout)
-        if _resp is None:
-            return (None, None, None, None)
-        else:
-            return (_resp[0], _resp[1], _resp[2], _resp[3:])
-    
-    async def startexpt(self, timeout=0.5):
-        """STARTEXPT and await response."""
-        # Write the PING message.
-        self.send_jedi_message([ArimuCommands.STARTEXPT])
-        await asyncio.sleep(self.cmd_delay)
-        _resp = await self.read_jedi_packet(ArimuCommands.STARTEXPT,
-                                            timeout)
-        if _resp is None:
-            return (None, None, None, None)
-        else:
-            return (_resp[0], _resp[1], _resp[2], _resp[3:])
-    
-    async def stopexpt(self, timeout=0.5):
-        """STOPEXPT and await response."""
-        # Write the PING message.
-        self.send_jedi_message([ArimuCommands.STOPEXPT])
-        await asyncio.sleep(self.cmd_delay)
-        _resp = await self.read_jedi_packet(ArimuCommands.STOPEXPT,
-                                            timeout)
-        if _resp is None:
-            return (None, None, None, None)
-        else:
-            return (_resp[0], _resp[1], _resp[2], _resp[3:])
-    
-    async def startstream(self, timeout=0.5):
-        """STARTSTREAM and await response."""
-        # Write the PING message.
-        self.send_jedi_message([ArimuCommands.STARTSTREAM])
-        await asyncio.sleep(self.cmd_delay)
-        _resp = await self.read_jedi_packet(ArimuCommands.STARTSTREAM,
-                                            timeout)
-        if _resp is None:
-            return (None, None, None, None)
-        else:
-            return (_resp[0], _resp[1], _resp[2], _resp[3:])
-    
-    async def stopstream(self, timeout=0.5):
-        """STOPSTREAM and await response."""
-        # Write the PING message.
-        self.send_jedi_message([ArimuCommands.STOPSTREAM])
-        await asyncio.sleep(self.cmd_delay)
-        _resp = await self.read_jedi_packet(ArimuCommands.STOPSTREAM,
-                                            timeout)
-        if _resp is None:
-            return (None, None, None, None)
-        else:
-            return (_resp[0], _resp[1], _resp[2], _resp[3:])
-    
-    async def settonone(self, timeout=0.5):
-        """SETTONONE and await response."""
-        # Write the SETTONONE message.
-        self.send_jedi_message([ArimuCommands.SETTONONE])
-        await asyncio.sleep(self.cmd_delay)
-        _resp = await self.read_jedi_packet(ArimuCommands.SETTONONE,
-                                            timeout)
-        if _resp is None:
-            return (None, None, None, None)
-        else:
-            return (_resp[0], _resp[1], _resp[2], _resp[3:])
-
-    async def setsubject(self, subjname, timeout=0.5):
-        """SETSUBJECT and await respose."""
-        self.send_jedi_message(bytearray([ArimuCommands.SETSUBJECT])
-                               + bytearray(subjname, "ascii")
-                               + bytearray([0]))
-        await asyncio.sleep(self.cmd_delay)
-        _resp = await self.read_jedi_packet(ArimuCommands.SETSUBJECT,
-                                            timeout)
-        if _resp is None:
-            return (None, None, None, None)
-        else:
-            return (_resp[0], _resp[1], _resp[2], _resp[3:])
-    
-    async def getsubject(self, timeout=0.5):
-        """GETSUBJECT and await respose."""
-        self.send_jedi_message([ArimuCommands.GETSUBJECT])
-        await asyncio.sleep(self.cmd_delay)
-        _resp = await self.read_jedi_packet(ArimuCommands.GETSUBJECT,
-                                            timeout)
-        if _resp is None:
-            return (None, None, None, None)
-        else:
-            return (_resp[0], _resp[1], _resp[2], _resp[3:])
-    
-    async def settime(self, timeout=0.5):
-        """SETTIME using the current time and await response."""
-        return await self.settime(dt.now(), timeout)
-    
-    async def settime(self, dtvalue, timeout=0.5):
-        """SETTIME using the given timee 'dtvalue' and await response."""
-        _dtvals = (struct.pack("<L", dtvalue.year % 100)
-                   + struct.pack("<L", dtvalue.month)
-                   + struct.pack("<L", dtvalue.day)
-                   + struct.pack("<L", dtvalue.hour)
-                   + struct.pack("<L", dtvalue.minute)
-                   + struct.pack("<L", dtvalue.second)
-                   + struct.pack("<L", dtvalue.microsecond // 10000))
-        self.send_jedi_message(bytearray([ArimuCommands.SETTIME]) + _dtvals)
-        await asyncio.sleep(self.cmd_delay)
-        _resp = await self.read_jedi_packet(ArimuCommands.SETTIME,
-                                            timeout)
-        # Decode into current time and micros.
-        if _resp is None:
-            return (None, None, None, None)
-        else:
-            return (_resp[0], _resp[1], _resp[2],
-                    self._decode_setgettime_resp(_resp[3:]))
-        
-    async def gettime(self, timeout=0.5):
-        """GETTIME and await response."""
-        self.send_jedi_message([ArimuCommands.GETTIME])
-        await asyncio.sleep(self.cmd_delay)
-        _resp = await self.read_jedi_packet(ArimuCommands.GETTIME,
-                                            timeout=1.0)
-        if _resp is None:
-            return (None, None, None, None)
-        else:
-            return (_resp[0], _resp[1], _resp[2],
-                    self._decode_setgettime_resp(_resp[3:]))
-    
-    async def listfiles(self, timeout=0.5):
-        """LISTFILE and await response."""
-        self.send_jedi_message([ArimuCommands.LISTFILES])
-        await asyncio.sleep(self.cmd_delay)
-        while True:
-            _resp = await self.read_jedi_packet(ArimuCommands.LISTFILES,
-                                                timeout=timeout)
-            await asyncio.sleep(0.05)
-            # Failed to read the response.
-            if _resp is None:
-                yield (None, None, None, None)
-                break
-            # Valid response.
-            _str = bytearray(_resp[3:]).decode()
-            if len(_str) == 0:
-                yield (None, None, None, None)
-                break
-            if _str[0] == '[':
-                # Create a new list.
-                yield (_resp[0], _resp[1], _resp[2], _str[1:-1].split(","))
-            else:
-                yield (_resp[0], _resp[1], _resp[2], _str[0:-1].split(","))
-            # Check if end of list is reached.
-            if _str[-1] == ']':
-                break
-    
-    async def getfiledata(self, fname, timeout=1.0):
-        """GETFILEDATA and await response."""
-        self.send_jedi_message(bytearray([ArimuCommands.GETFILEDATA])
-                               + bytearray(fname, "ascii")
-                               + bytearray([0]))
-        await asyncio.sleep(self.cmd_delay)
-        # Read file data and yield.
-        while True:
-            _resp = await self.read_jedi_packet(ArimuCommands.GETFILEDATA,
-                                                timeout=5.0)
-            if _resp is None:
-                yield (None, None, None, None)
-                break
-            else:
-                if _resp[3] == ArimuAdditionalFlags.NOFILE:
-                    yield (_resp[0], _resp[1], _resp[2],
-                           (_resp[3],))
-                elif _resp[3] == ArimuAdditionalFlags.FILEHEADER:
-                    yield (_resp[0], _resp[1], _resp[2],
-                           (_resp[3],
-                            struct.unpack('<L', bytearray(_resp[4:8]))[0]))
-                elif _resp[3] == ArimuAdditionalFlags.FILECONTENT:
-                    if _resp[4] == 255:
-                        yield (_resp[0], _resp[1], _resp[2],
-                               (_resp[3], _resp[4], bytearray(_resp[5:])))
-                        break
-                    else:
-                        yield (_resp[0], _resp[1], _resp[2],
-                               (_resp[3], _resp[4], bytearray(_resp[5:])))
-    
-    async def deletefile(self, fname):
-        """DELETEFILE and await response."""
-        self.send_jedi_message(bytearray([ArimuCommands.DELETEFILE])
-                               + bytearray(fname, "ascii")
-                               + bytearray([0]))
-        await asyncio.sleep(self.cmd_delay)
-        _resp = await self.read_jedi_packet(ArimuCommands.DELETEFILE,
-                                            timeout=0.5)
-        if _resp is None:
-            return (None, None, None, None)
-        else:
-            return (_resp[0], _resp[1], _resp[2], _resp[3])
-        
-    def _decode_setgettime_resp(self, payload):
-        """Decodes the payload received from SETTIME and GETTIME to current
-        time and micros."""
-        # Current time data.
-        _pldbytes = [bytearray(payload[i:i+4]) for i in range(0, 28, 4)]
-        _temp = [struct.unpack('<L', _pldbytes[i])[-1]
-                 for i in range(7)]
-        _ts = (f'{_temp[0]:02d}-{_temp[1]:02d}-{_temp[2]:02d}'
-               + f'T{_temp[3]}:{_temp[4]}:{_temp[5]}.{_temp[6]}')
-        _currt = dt.strptime(_ts, '%y-%m-%dT%H:%M:%S.%f')
-        # Micros data.
-        _microst = struct.unpack('<L', bytearray(payload[28:32]))[-1]
-        return (_currt, _microst)
-
-    def send_jedi_message(self, payload):
-        """Send JEDI payload out."""
-        _outpayload = [255, 255, len(payload)+1, *payload]
-        _outpayload.append(sum(_outpayload) % 256)
-        if _DEBUG:
-            sys.stdout.write("\n Out Data: ")
-            for _el in _outpayload:
-                sys.stdout.write(f"{_el} ")
-        self._client.write(bytearray(_outpayload))
-
-    async def read_jedi_packet(self, cmd, timeout):
-        """Read a fill JEDI packet with the command 'cmd' within
-        'timeout' seconds."""
-        _strt = time.time()
-        _state = JediParsingStates.LookingForHeader
-        if _DEBUG:
-            sys.stdout.write("\n In Data: ")
-        while time.time() - _strt <= timeout:
-            # Read response.
-            if not self._client.inWaiting():
-                continue
-            # Bytes available
-            _byte = self._client.read()
-            if _DEBUG:
-                try:
-                    sys.stdout.write(f"{bytearray([_byte]).decode()}")
-                except:
-                    sys.stdout.write(f"{ord(_byte)} ")
-                sys.stdout.flush()
-            if _state == JediParsingStates.LookingForHeader:
-                if ord(_byte) == 0xff:
-                    _state = JediParsingStates.FoundHeader1
-            elif _state == JediParsingStates.FoundHeader1:
-                if ord(_byte) == 0xff:
-                    _state = JediParsingStates.FoundHeader2
-                else:
-                    _state = JediParsingStates.LookingForHeader
-            elif _state == JediParsingStates.FoundHeader2:
-                _N = ord(_byte)
-                if _N > 0:
-                    _cnt = 0
-                    _chksum = 255 + 255 + _N
-                    # sys.stdout.write(f"\n    {_N} - ")
-                    _in_payload = [ None ] * (_N - 1)
-                    _state = JediParsingStates.ReadingPayload
-                else:
-                    # Cannot be a valid packet.
-                    _state = JediParsingStates.LookingForHeader
-            elif _state == JediParsingStates.ReadingPayload:
-                # sys.stdout.write(f" {_cnt}, {len(_in_payload)} | ")
-                _in_payload[_cnt] = ord(_byte)
-                _chksum += ord(_byte)
-                _cnt += 1
-                if _cnt == _N - 1:
-                    _state = JediParsingStates.CheckCheckSum
-            elif _state == JediParsingStates.CheckCheckSum:
-                if _chksum % 256 == ord(_byte):
-                    _state = JediParsingStates.FoundFullPacket
-                    # Make sure the packet has the command we are looking for.
-                    if _in_payload[0] == cmd:
-                        # sys.stdout.write("\n")
-                        return _in_payload
-                _state = JediParsingStates.LookingForHeader
-        # print(time.time() - _strt)
-        # sys.stdout.write("\n")
-        return None
-
-
-async def test():
-    arimu = ArimuAsync("COM16", 115200)
-    await asyncio.sleep(2)
-    print(await arimu.ping())
-    print(await arimu.status())
-
-if __name__ == "__main__":
-    loop = asyncio.get_event_loop()
-    tasks = [
-        loop.create_task(test()),
-    ]
-    loop.run_until_complete(asyncio.wait(tasks))
+# Module implementing asynchronous communication with ARIMU using
+# the JEDI protocol.
+#
+# Author: Sivakumar Balasubramanian
+# Date: 20 July 2022
+# Email: siva82kb@gmail.com
+
+
+import serial
+import enum
+import sys
+import time
+from datetime import datetime as dt
+import asyncio
+import threading
+import weakref
+from serial.tools.list_ports import comports
+from jediframe import JediDecoder, JediLinkStats, JediWriter, encode_frame
+from jedidispatch import JediDispatcher
+# The protocol declarations are also available from here.
+from arimuprotocol import (ArimuAdditionalFlags,
+                           ArimuCommands,
+                           ArimuStates,
+                           Error_Types1,
+                           FileListParser,
+                           IMU_RECORD,
+                           decode_imu_records,
+                           decode_response,
+                           encode_request,
+                           get_number_bits)
+from jedimetrics import link_stats
+from jeditransport import cancel_read, open_port
+
+_DEBUG = False
+
+class JediProtocol(asyncio.Protocol):
+    """asyncio protocol that decodes the incoming JEDI frames and hands
+    the payloads over to the 'inform' function as read-only memoryviews.
+    'lost' is called with the error, or None, when the connection is lost
+    or closed."""
+
+    def __init__(self, inform, stats=None, lost=None) -> None:
+        self.transport = None
+        self._decoder = JediDecoder(stats)
+        self._inform = inform
+        self._lost = lost
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data):
+        if _DEBUG:
+            sys.stdout.write("\n In Data: ")
+            sys.stdout.write(" ".join(map(str, data)))
+            sys.stdout.flush()
+        for _payload in self._decoder.feed(data):
+            self._inform(_payload)
+
+    def connection_lost(self, exc):
+        self.transport = None
+        if self._lost is not None:
+            self._lost(exc)
+
+
+class SerialTransport(asyncio.Transport):
+    """asyncio transport for an open serial port.
+
+    The file descriptor of the port is watched by the event loop with
+    loop.add_reader. Where the loop or the port does not support that (e.g.
+    on Windows), a reader thread blocks on the port and hands the data over
+    to the loop. Writes are queued to a JediWriter, so that a slow port never
+    blocks the loop.
+    """
+    # Read timeout (seconds) of the reader thread.
+    READ_TIMEOUT = 0.1
+    # Time (seconds) close() waits for the reader thread, on the event loop.
+    CLOSE_TIMEOUT = 0.5
+
+    def __init__(self, loop, protocol, ser, stats=None) -> None:
+        super().__init__()
+        self._loop = loop
+        self._protocol = protocol
+        self._ser = ser
+        self._closing = False
+        self._fd = None
+        self._thread = None
+        self.stats = JediLinkStats() if stats is None else stats
+        self._writer = JediWriter(ser, name=f"JediWriter-{ser.port}",
+                                  stats=self.stats)
+        try:
+            self._fd = ser.fileno()
+            self._ser.timeout = 0
+            self._loop.add_reader(self._fd, self._read_ready)
+        except (AttributeError, NotImplementedError, OSError, ValueError):
+            self._fd = None
+            self._ser.timeout = SerialTransport.READ_TIMEOUT
+            self._thread = threading.Thread(target=self._read_thread,
+                                            daemon=True)
+            self._thread.start()
+        self._loop.call_soon(self._protocol.connection_made, self)
+
+    @property
+    def serial(self):
+        return self._ser
+
+    def is_closing(self):
+        return self._closing
+
+    def get_protocol(self):
+        return self._protocol
+
+    def set_protocol(self, protocol):
+        self._protocol = protocol
+
+    def write(self, data):
+        self._writer.send(bytes(data))
+
+    def close(self):
+        if self._closing:
+            return
+        self._closing = True
+        if self._fd is not None:
+            self._loop.remove_reader(self._fd)
+        if self._thread is not None:
+            # The thread wakes up within READ_TIMEOUT, or on cancel_read(). If
+            # it does not, closing the port ends its read.
+            cancel_read(self._ser)
+            self._thread.join(SerialTransport.CLOSE_TIMEOUT)
+        self._writer.close()
+        self._ser.close()
+        self._loop.call_soon(self._protocol.connection_lost, None)
+
+    def _read_ready(self):
+        """Called by the event loop when the port has data to be read."""
+        self.stats.read_loops += 1
+        try:
+            _data = self._ser.read(max(1, self._ser.in_waiting))
+        except serial.serialutil.SerialException as e:
+            self.stats.serial_exceptions += 1
+            self._fatal_error(e)
+            return
+        if _data:
+            self._protocol.data_received(_data)
+
+    def _read_thread(self):
+        """Reader thread used when the event loop cannot watch the port."""
+        while not self._closing:
+            self.stats.read_loops += 1
+            try:
+                _data = self._ser.read(max(1, self._ser.in_waiting))
+            except serial.serialutil.SerialException as e:
+                self.stats.serial_exceptions += 1
+                if not self._closing:
+                    self._loop.call_soon_threadsafe(self._fatal_error, e)
+                return
+            if _data:
+                self._loop.call_soon_threadsafe(self._protocol.data_received,
+                                                _data)
+
+    def _fatal_error(self, exc):
+        if self._closing:
+            return
+        self._closing = True
+        if self._fd is not None:
+            self._loop.remove_reader(self._fd)
+        self._writer.close()
+        self._ser.close()
+        self._loop.call_soon(self._protocol.connection_lost, exc)
+
+
+class JediStream(object):
+    """Async iterator over the packets of a command routed by a
+    JediDispatcher, or over the packets no one else is waiting for when
+    'cmd' is None. The packets are queued from the moment the stream is
+    created, and iteration stops when no packet arrives within 'timeout'
+    seconds or the stream is closed. With 'link_idle', the timeout is of the
+    whole link being silent instead: packets of other commands, e.g. the
+    rest of a list the device answers first, keep the stream waiting."""
+
+    def __init__(self, dispatcher, cmd=None, timeout=None,
+                 link_idle=False) -> None:
+        self._dispatcher = dispatcher
+        self._cmd = cmd
+        self.timeout = timeout
+        self.link_idle = link_idle
+        self._queue = asyncio.Queue()
+        self._closed = False
+        if cmd is None:
+            self._dispatcher.add_listener(self._queue.put_nowait)
+        else:
+            self._dispatcher.subscribe(cmd, self._queue.put_nowait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        _payload = await self.get()
+        if _payload is None:
+            raise StopAsyncIteration
+        return _payload
+
+    async def get(self):
+        """Returns the next packet, or None if the stream is closed or no
+        packet arrives in time."""
+        if self._closed and self._queue.empty():
+            return None
+        while True:
+            _count = self._dispatcher.dispatched_count
+            try:
+                return await asyncio.wait_for(self._queue.get(), self.timeout)
+            except asyncio.TimeoutError:
+                if (not self.link_idle
+                    or self._dispatcher.dispatched_count == _count):
+                    return None
+
+    def close(self):
+        """Stops queuing the packets."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._cmd is None:
+            self._dispatcher.remove_listener(self._queue.put_nowait)
+        else:
+            self._dispatcher.unsubscribe(self._cmd, self._queue.put_nowait)
+
+    def abort(self):
+        """Closes the stream, and ends a get() that is waiting right away,
+        e.g. when the connection is lost."""
+        self.close()
+        self._queue.put_nowait(None)
+
+
+# Asynchronous ARIMU Class
+class ArimuAsync(object):
+    # Time (seconds) the board takes to reset when the port is opened.
+    RESET_PERIOD = 2.0
+    # Time (seconds) between the pings of wait_ready().
+    READY_PING_PERIOD = 0.1
+    
+    def __init__(self, comport, baudrate=115200, reset_wait=True):
+        self.comport = comport
+        self.baurdate = baudrate
+        # The port can be any URL handled by jeditransport.
+        self._client = open_port(comport, baudrate)
+        # Link health counters of the port.
+        self.stats = link_stats(comport)
+        # The asyncio transport is bound to the event loop on first use.
+        self._transport = None
+        # Routes the received packets to the commands waiting on them.
+        self._dispatcher = JediDispatcher()
+        # Responses and streams being waited for, which end at once when the
+        # connection is lost.
+        self._pending = set()
+        self._streams = weakref.WeakSet()
+        # Error the connection was lost with, if it was. Commands then fail
+        # at once instead of waiting for their timeout.
+        self.lost = None
+        # Without 'reset_wait', await wait_ready() before using the device.
+        if reset_wait:
+            time.sleep(ArimuAsync.RESET_PERIOD)
+        
+    @property
+    def dispatcher(self):
+        return self._dispatcher
+
+    async def wait_ready(self, timeout=RESET_PERIOD):
+        """Pings the device till it answers, i.e. it is out of reset, or
+        'timeout' seconds have passed. Returns the PING response, or None if
+        the device did not answer."""
+        _end = time.monotonic() + timeout
+        while True:
+            _left = _end - time.monotonic()
+            if _left <= 0:
+                return None
+            _resp = await self.ping(
+                timeout=min(ArimuAsync.READY_PING_PERIOD, _left)
+            )
+            if _resp[0] is not None:
+                return _resp
+
+    def close(self):
+        if self._transport is not None:
+            self._transport.close()
+        else:
+            self._client.close()
+
+    def _connect_transport(self):
+        """Binds the serial port to the running event loop."""
+        if self._transport is not None:
+            return
+        _loop = asyncio.get_event_loop()
+        self._transport = SerialTransport(_loop,
+                                          JediProtocol(self._dispatcher.dispatch,
+                                                       self.stats,
+                                                       self._connection_lost),
+                                          self._client,
+                                          self.stats)
+
+    def _connection_lost(self, exc):
+        """Fails the commands waiting for a response, and all the commands
+        after them."""
+        self.lost = (ConnectionError(f"{self.comport} was closed.")
+                     if exc is None else exc)
+        for _fut in list(self._pending):
+            if not _fut.done():
+                _fut.set_result(None)
+        for _stream in list(self._streams):
+            _stream.abort()
+
+    async def status(self, timeout=0.5):
+        """STATUS and await response."""
+        return await self.command(ArimuCommands.STATUS, timeout=timeout)
+    
+    async def ping(self, timeout=0.5):
+        """PING and await response."""
+        return await self.command(ArimuCommands.PING, timeout=timeout)
+
+    async def dockstnping(self, timeout=0.5):
+        """DOCKSTNPING."""
+        # Write the PING message.
+        self.send_jedi_message(encode_request(ArimuCommands.DOCKSTNPING))
+        return (None, None, None, None)
+    
+    async def startdockstncomm(self, timeout=0.5):
+        """STARTDOCKSTNCOMM and await response."""
+        return await self.command(ArimuCommands.STARTDOCKSTNCOMM, timeout=timeout)
+    
+    async def stopdockstncomm(self, timeout=0.5):
+        """STOPDOCKSTNCOMM and await response."""
+        return await self.command(ArimuCommands.STOPDOCKSTNCOMM, timeout=timeout)
+    
+    async def startnormal(self, timeout=0.5):
+        """STARTNORMAL and await response."""
+        return await self.command(ArimuCommands.STARTNORMAL, timeout=timeout)
+    
+    async def stopnormal(self, timeout=0.5):
+        """STOPNORMAL and await response."""
+        return await self.command(ArimuCommands.STOPNORMAL, timeout=timeout)
+    
+    async def startexpt(self, timeout=0.5):
+        """STARTEXPT and await response."""
+        return await self.command(ArimuCommands.STARTEXPT, timeout=timeout)
+    
+    async def stopexpt(self, timeout=0.5):
+        """STOPEXPT and await response."""
+        return await self.command(ArimuCommands.STOPEXPT, timeout=timeout)
+    
+    async def startstream(self, timeout=0.5):
+        """STARTSTREAM and await response."""
+        return await self.command(ArimuCommands.STARTSTREAM, timeout=timeout)
+    
+    async def stopstream(self, timeout=0.5):
+        """STOPSTREAM and await response."""
+        return await self.command(ArimuCommands.STOPSTREAM, timeout=timeout)
+    
+    async def settonone(self, timeout=0.5):
+        """SETTONONE and await response."""
+        return await self.command(ArimuCommands.SETTONONE, timeout=timeout)
+
+    async def setsubject(self, subjname, timeout=0.5):
+        """SETSUBJECT and await respose."""
+        return await self.command(ArimuCommands.SETSUBJECT, subjname,
+                                   timeout=timeout)
+    
+    async def getsubject(self, timeout=0.5):
+        """GETSUBJECT and await respose."""
+        return await self.command(ArimuCommands.GETSUBJECT, timeout=timeout)
+    
+    async def settime(self, dtvalue=None, timeout=0.5):
+        """SETTIME using the given time 'dtvalue' (the current time when
+        None) and await response with the current time and micros."""
+        if dtvalue is None:
+            dtvalue = dt.now()
+        return await self.command(ArimuCommands.SETTIME, dtvalue,
+                                   timeout=timeout)
+        
+    async def gettime(self, timeout=1.0):
+        """GETTIME and await response with the current time and micros."""
+        return await self.command(ArimuCommands.GETTIME, timeout=timeout)
+    
+    async def getmicros(self, timeout=0.5):
+        """GETMICROS and await response."""
+        return await self.command(ArimuCommands.GETMICROS, timeout=timeout)
+    
+    async def currentfilename(self, timeout=0.5):
+        """CURRENTFILENAME and await response."""
+        return await self.command(ArimuCommands.CURRENTFILENAME,
+                                   timeout=timeout)
+    
+    async def listfiles(self, timeout=0.5):
+        """LISTFILE and await response. Yields the file names completed by
+        each packet of the list, as soon as it arrives."""
+        _parser = FileListParser()
+        with self.packets(ArimuCommands.LISTFILES, timeout) as _stream:
+            self.send_jedi_message(encode_request(ArimuCommands.LISTFILES))
+            while not _parser.done:
+                _resp = await _stream.get()
+                # Failed to read the response.
+                if _resp is None or len(_resp) <= 3:
+                    yield (None, None, None, None)
+                    break
+                # Valid response.
+                _cmd, _st, _er, _chunk = decode_response(_resp)
+                yield (_cmd, _st, _er, _parser.feed(_chunk))
+    
+    async def getfiledata(self, fname, timeout=5.0, watchdog=None):
+        """GETFILEDATA and await response. Yields the decoded packets of the
+        file (see arimuprotocol.FileDataCodec). The file can be asked for
+        while the device is still sending another response, e.g. the list of
+        files, as the device answers in turn. Each packet is waited for
+        'timeout' seconds, or for the timeout of a LatencyWatchdog, which
+        adapts to the time between the packets."""
+        with self.packets(ArimuCommands.GETFILEDATA, timeout=timeout,
+                          link_idle=True) as _stream:
+            self.send_jedi_message(encode_request(ArimuCommands.GETFILEDATA,
+                                                  fname))
+            if watchdog is not None:
+                watchdog.start()
+            # Read file data and yield.
+            while True:
+                if watchdog is not None:
+                    _stream.timeout = watchdog.timeout
+                _resp = await _stream.get()
+                if _resp is None:
+                    yield (None, None, None, None)
+                    break
+                # A packet cut too short is dropped.
+                if len(_resp) < 3:
+                    continue
+                _resp = decode_response(_resp)
+                if _resp[3] is None:
+                    continue
+                if watchdog is not None:
+                    watchdog.packet()
+                yield _resp
+                # No file, or the last packet of the file.
+                if (_resp[3][0] == ArimuAdditionalFlags.NOFILE
+                    or (_resp[3][0] == ArimuAdditionalFlags.FILECONTENT
+                        and _resp[3][1] == 255)):
+                    break
+
+    async def stream(self, timeout=0.5):
+        """Yields the IMU records (IMU_RECORD tuples) in the STARTSTREAM
+        packets sent by ARIMU while it is streaming, till no packet arrives
+        within 'timeout' seconds."""
+        with self.packets(ArimuCommands.STARTSTREAM, timeout) as _stream:
+            async for _resp in _stream:
+                if len(_resp) < 3:
+                    continue
+                _resp = decode_response(_resp)
+                if _resp[3] is not None:
+                    yield _resp
+    
+    async def deletefile(self, fname, timeout=0.5):
+        """DELETEFILE and await response."""
+        return await self.command(ArimuCommands.DELETEFILE, fname,
+                                   timeout=timeout)
+
+    async def command(self, cmd, *args, timeout=0.5):
+        """Sends the command 'cmd' with the given arguments, and returns its
+        decoded response (see arimuprotocol.COMMANDS)."""
+        _resp = await self._request(encode_request(cmd, *args), timeout)
+        if _resp is None or len(_resp) < 3:
+            return (None, None, None, None)
+        return decode_response(_resp)
+
+    def send_jedi_message(self, payload):
+        """Send JEDI payload out."""
+        if self.lost is not None:
+            return
+        _outframe = encode_frame(payload)
+        if _DEBUG:
+            sys.stdout.write("\n Out Data: ")
+            sys.stdout.write(" ".join(map(str, _outframe)))
+        self._connect_transport()
+        self._transport.write(_outframe)
+
+    def packets(self, cmd=None, timeout=None, link_idle=False):
+        """Returns a JediStream of the packets of the command 'cmd', or of
+        the packets no one else is waiting for when 'cmd' is None."""
+        self._connect_transport()
+        _stream = JediStream(self._dispatcher, cmd, timeout, link_idle)
+        if self.lost is not None:
+            _stream.abort()
+        else:
+            self._streams.add(_stream)
+        return _stream
+
+    async def read_jedi_packet(self, cmd, timeout):
+        """Read a fill JEDI packet with the command 'cmd' within
+        'timeout' seconds. A packet of this command that arrived when no
+        one was waiting for it is returned right away."""
+        self._connect_transport()
+        _payload = self._dispatcher.claim(cmd)
+        if _payload is not None or self.lost is not None:
+            return _payload
+        return await self._wait_packet(self._expect(cmd), timeout)
+
+    def _expect(self, cmd):
+        """Returns a future for the next packet of the command 'cmd'."""
+        _fut = asyncio.get_event_loop().create_future()
+
+        def _resolve(payload):
+            if not _fut.done():
+                _fut.set_result(payload)
+
+        self._dispatcher.expect(cmd, _resolve)
+        self._pending.add(_fut)
+        # Stop waiting if the future is given up on.
+        _fut.add_done_callback(lambda f: self._dispatcher.cancel(cmd, _resolve))
+        _fut.add_done_callback(self._pending.discard)
+        return _fut
+
+    async def _wait_packet(self, fut, timeout):
+        """Waits for the future from _expect for 'timeout' seconds. Returns
+        None if the packet does not arrive in time."""
+        try:
+            return await asyncio.wait_for(fut, timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def _request(self, payload, timeout):
+        """Sends the given payload and returns the response to it, or None if
+        it does not arrive within 'timeout' seconds. The response is waited
+        for before the payload goes out, so that it cannot be missed, and
+        any number of other commands can be in flight at the same time."""
+        self._connect_transport()
+        if self.lost is not None:
+            return None
+        _fut = self._expect(payload[0])
+        try:
+            self.send_jedi_message(payload)
+            return await self._wait_packet(_fut, timeout)
+        finally:
+            _fut.cancel()
+
+async def test():
+    arimu = ArimuAsync("COM16", 115200)
+    await asyncio.sleep(2)
+    print(await arimu.ping())
+    print(await arimu.status())
+
+if __name__ == "__main__":
+    loop = asyncio.get_event_loop()
+    tasks = [
+        loop.create_task(test()),
+    ]
+    loop.run_until_complete(asyncio.wait(tasks))
     loop.close()
\ No newline at end of file
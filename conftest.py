@@ -0,0 +1,3 @@
+# arimus_time_sync_test.py is a script that reads the time of docked watches,
+# and not a test.
+collect_ignore = ["arimus_time_sync_test.py"]
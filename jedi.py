@@ -1,148 +1,122 @@
-# Module implementing the JEDI serial communication protocol.
-#
-# Author: Sivakumar Balasubramanian
-# Date: 12 July 2022
-# Email: siva82kb@gmail.com
-
-
-from re import S
-import serial
-import enum
-import threading
-import sys
-import time
-from serial.tools.list_ports import comports
-
-class JediParsingStates(enum.Enum):
-    LookingForHeader = 0
-    FoundHeader1 = 1
-    FoundHeader2 = 2
-    ReadingPayload = 3
-    CheckCheckSum = 4
-    FoundFullPacket = 5
-
-
-class JediComm(threading.Thread):
-    
-    def __init__(self, port, baudrate=115200, inform=None) -> None:
-        super().__init__()
-        self._port = port
-        self._baudrate = baudrate
-        self._ser = serial.Serial(port, baudrate)
-        self._state = JediParsingStates.LookingForHeader
-        self._inform = inform
-        self._in_payload = []
-        self._out_payload = []
-        
-        # Payload reading variables.
-        self._N = 0
-        self._cnt = 0
-        self._chksum = 0
-        
-        # thread related variables.
-        self._abort = False
-        self._sleeping = False
-        self.setDaemon(False)
-    
-    @property
-    def sleeping(self):
-        """ Returns if the thread is sleeping.
-        """
-        return self._sleeping
-
-    def send_message(self, outbytes):
-        _outpayload = [255, 255, len(outbytes)+1, *outbytes]
-        _outpayload.append(sum(_outpayload) % 256)
-        # Send payload.
-        self._ser.write(bytearray(_outpayload))
-
-    def run(self):
-        """
-        Thread operation.
-        """
-        self._state = JediParsingStates.LookingForHeader
-        while True:
-            # check if the currently paused
-            if self._sleeping:
-                # wait till the thread is un-paused.
-                continue
-
-            # abort?
-            if self._abort is True:
-                return
-
-            self._read_handle_data()
-
-    def sleep(self):
-        """
-        Puts the current thread in a paused state.
-        """
-        # with self.state:
-        self._sleeping = True
-
-    def wakeup(self):
-        """
-        Wake up a paused thread.
-        """
-        self._sleeping = False
-
-    def abort(self):
-        """
-        Aborts the current thread.
-        """
-        self._abort = True
-        self._ser.close()
-        if self._sleeping:
-            self.wakeup()
-
-    def _read_handle_data(self):
-        """
-        Reads and handles the received data by calling the inform function.
-        """
-        # Read full packets.
-        # if self._ser.inWaiting():
-        #     sys.stdout.write("\nNew data: ")
-        while self._ser.inWaiting():
-            _byte = self._ser.read()
-            # sys.stdout.write(f"{ord(_byte)} ")
-            if self._state == JediParsingStates.LookingForHeader:
-                if ord(_byte) == 0xff:
-                    self._state = JediParsingStates.FoundHeader1
-            elif self._state == JediParsingStates.FoundHeader1:
-                if ord(_byte) == 0xff:
-                    self._state = JediParsingStates.FoundHeader2
-                else:
-                    self._state = JediParsingStates.LookingForHeader
-            elif self._state == JediParsingStates.FoundHeader2:
-                self._N = ord(_byte)
-                self._cnt = 0
-                self._chksum = 255 + 255 + self._N
-                self._in_payload = [ None ] * (self._N - 1)
-                self._state = JediParsingStates.ReadingPayload
-            elif self._state == JediParsingStates.ReadingPayload:
-                self._in_payload[self._cnt] = ord(_byte)
-                self._chksum += ord(_byte)
-                self._cnt += 1
-                if self._cnt == self._N - 1:
-                    self._state = JediParsingStates.CheckCheckSum
-            elif self._state == JediParsingStates.CheckCheckSum:
-                if self._chksum % 256 == ord(_byte):
-                    self._state = JediParsingStates.FoundFullPacket
-                else:
-                    self._state = JediParsingStates.LookingForHeader
-            
-            # Handle full packet.
-            if self._state == JediParsingStates.FoundFullPacket:
-                self._inform(self._in_payload)
-                self._state = JediParsingStates.LookingForHeader
-
-
-
-if __name__ == '__main__':
-    def print_packet(packet):
-        print("New packet: ", packet)
-    
-    jedireader = JediComm("COM16", 115200, print_packet)
-    jedireader.start()
-    time.sleep(10)
+# Module implementing the JEDI serial communication protocol.
+#
+# Author: Sivakumar Balasubramanian
+# Date: 12 July 2022
+# Email: siva82kb@gmail.com
+
+
+from re import S
+import serial
+import enum
+import threading
+import sys
+import time
+from serial.tools.list_ports import comports
+from jediframe import JediDecoder, JediWriter, encode_frame
+from jedimetrics import link_stats
+from jeditransport import cancel_read, open_port
+
+class JediComm(threading.Thread):
+    
+    # Longest time (seconds) a read blocks on the port before the thread
+    # checks if it has been aborted.
+    READ_TIMEOUT = 0.1
+
+    def __init__(self, port, baudrate=115200, inform=None) -> None:
+        super().__init__()
+        self._port = port
+        self._baudrate = baudrate
+        # The port can be any URL handled by jeditransport.
+        self._ser = open_port(port, baudrate, timeout=JediComm.READ_TIMEOUT)
+        # Link health counters of the port.
+        self.stats = link_stats(port)
+        self._decoder = JediDecoder(self.stats)
+        self._inform = inform
+        # Outgoing frames are written from the writer's own thread.
+        self._writer = JediWriter(self._ser, name=f"JediWriter-{port}",
+                                  stats=self.stats)
+        
+        # thread related variables.
+        self._abort = False
+        # Set when the thread is awake, and cleared when it is sleeping.
+        self._awake = threading.Event()
+        self._awake.set()
+        self.setDaemon(False)
+    
+    @property
+    def sleeping(self):
+        """ Returns if the thread is sleeping.
+        """
+        return not self._awake.is_set()
+
+    def send_message(self, outbytes):
+        # Queue payload to be sent.
+        self._writer.send(encode_frame(outbytes))
+
+    def run(self):
+        """
+        Thread operation.
+        """
+        self._decoder.reset()
+        while True:
+            # wait till the thread is un-paused.
+            self._awake.wait()
+
+            # abort?
+            if self._abort is True:
+                return
+
+            self._read_handle_data()
+
+    def sleep(self):
+        """
+        Puts the current thread in a paused state.
+        """
+        self._awake.clear()
+
+    def wakeup(self):
+        """
+        Wake up a paused thread.
+        """
+        self._awake.set()
+
+    def abort(self):
+        """
+        Aborts the current thread.
+        """
+        self._abort = True
+        self.wakeup()
+        # Unblock a pending read, and let the thread finish before closing
+        # the port.
+        cancel_read(self._ser)
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join()
+        self._writer.close()
+        self._ser.close()
+
+    def _read_handle_data(self):
+        """
+        Reads and handles the received data by calling the inform function.
+        """
+        # Block till a byte arrives or the read times out, and read all the
+        # other waiting bytes in the same call.
+        self.stats.read_loops += 1
+        try:
+            _data = self._ser.read(max(1, self._ser.in_waiting))
+        except serial.serialutil.SerialException:
+            # Do not spin on a port that has gone away.
+            self.stats.serial_exceptions += 1
+            time.sleep(JediComm.READ_TIMEOUT)
+            return
+        for _payload in self._decoder.feed(_data):
+            self._inform(_payload)
+
+
+if __name__ == '__main__':
+    def print_packet(packet):
+        print("New packet: ", bytes(packet))
+    
+    jedireader = JediComm("COM16", 115200, print_packet)
+    jedireader.start()
+    time.sleep(10)
     jedireader.abort()
\ No newline at end of file
@@ -0,0 +1,257 @@
+"""Module for capturing the raw bytes of a JEDI port to a file, and replaying
+them later.
+
+A capture file starts with a header (magic and the wall clock time of the
+start of the capture), followed by one record per chunk of bytes read from
+or written to the port:
+
+    <d  seconds since the start of the capture (monotonic clock)
+    B   direction (RX: read from the device, TX: written to the device)
+    I   number of bytes
+        the bytes
+
+A capture can be fed back into the decoder and handlers with replay(), or
+opened as a port with the URL replay://<file> (see jeditransport), so that
+the hub code runs unchanged on a recorded session.
+
+Author: Sivakumar Balasubramanian
+Date: 17 October 2026
+Email: siva82kb@gmail.com
+"""
+
+import struct
+import sys
+import threading
+import time
+
+import serial
+
+from jediframe import JediDecoder, JediLinkStats
+
+CAPTURE_MAGIC = b"JEDICAP1"
+CAPTURE_HEADER = struct.Struct("<8sd")
+CAPTURE_RECORD = struct.Struct("<dBI")
+
+# Directions of the captured bytes.
+RX = 0
+TX = 1
+
+
+class CaptureWriter(object):
+    """Writes the records of a capture file. It can be used from the reader
+    and the writer threads of a port at the same time."""
+
+    def __init__(self, filename) -> None:
+        self.filename = filename
+        self._f = open(filename, "wb")
+        self._f.write(CAPTURE_HEADER.pack(CAPTURE_MAGIC, time.time()))
+        self._t0 = time.monotonic()
+        self._lock = threading.Lock()
+
+    def write(self, direction, data):
+        if len(data) == 0:
+            return
+        _t = time.monotonic() - self._t0
+        with self._lock:
+            if self._f.closed:
+                return
+            self._f.write(CAPTURE_RECORD.pack(_t, direction, len(data)))
+            self._f.write(data)
+
+    def close(self):
+        with self._lock:
+            self._f.close()
+
+
+def read_capture(filename):
+    """Yields the (time, direction, data) records of a capture file."""
+    with open(filename, "rb") as _f:
+        _magic, _ = CAPTURE_HEADER.unpack(_f.read(CAPTURE_HEADER.size))
+        if _magic != CAPTURE_MAGIC:
+            raise ValueError(f"{filename} is not a JEDI capture file.")
+        while True:
+            _hdr = _f.read(CAPTURE_RECORD.size)
+            if len(_hdr) < CAPTURE_RECORD.size:
+                # End of the file, or a record cut short by a crash.
+                return
+            _t, _dir, _n = CAPTURE_RECORD.unpack(_hdr)
+            _data = _f.read(_n)
+            if len(_data) < _n:
+                return
+            yield _t, _dir, _data
+
+
+class CapturePort(object):
+    """Wraps a port, and records all the bytes read from and written to it in
+    a capture file. Everything else, including setting attributes such as
+    the timeout, is passed on to the wrapped port."""
+    _OWN = ("_port", "capture")
+
+    def __init__(self, port, filename) -> None:
+        object.__setattr__(self, "_port", port)
+        object.__setattr__(self, "capture", CaptureWriter(filename))
+
+    def __getattr__(self, name):
+        return getattr(self._port, name)
+
+    def __setattr__(self, name, value):
+        if name in CapturePort._OWN:
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._port, name, value)
+
+    def read(self, size=1):
+        _data = self._port.read(size)
+        self.capture.write(RX, _data)
+        return _data
+
+    def write(self, data):
+        _n = self._port.write(data)
+        self.capture.write(TX, data)
+        return _n
+
+    def close(self):
+        self._port.close()
+        self.capture.close()
+
+
+class ReplayPort(object):
+    """A read-only port that returns the bytes received in a capture file.
+    With 'realtime' the bytes arrive with their recorded timing, otherwise
+    as fast as they are read. Bytes written to the port are dropped. Once
+    the capture is over, reads time out, and 'finished' is set."""
+
+    def __init__(self, filename, realtime=False, timeout=None) -> None:
+        self.port = f"replay://{filename}"
+        self.filename = filename
+        self.realtime = realtime
+        self.timeout = timeout
+        self.is_open = False
+        self.finished = threading.Event()
+        self._records = None
+        self._pending = b""
+        self._pending_t = 0.0
+        self._t0 = None
+        self._cancel = threading.Event()
+
+    def isOpen(self):
+        return self.is_open
+
+    def open(self):
+        self._records = (_r for _r in read_capture(self.filename)
+                         if _r[1] == RX)
+        self._pending = b""
+        self._t0 = None
+        self.finished.clear()
+        self.is_open = True
+
+    def close(self):
+        self.is_open = False
+        self._cancel.set()
+
+    def _next_chunk(self):
+        """Loads the next received chunk, and returns False at the end of the
+        capture."""
+        for _t, _, _data in self._records:
+            self._pending = _data
+            self._pending_t = _t
+            return True
+        self.finished.set()
+        return False
+
+    @property
+    def in_waiting(self):
+        if len(self._pending) == 0 and self.finished.is_set():
+            return 0
+        if self.realtime and self._t0 is not None:
+            if self._pending_t > time.monotonic() - self._t0:
+                return 0
+        return len(self._pending)
+
+    def inWaiting(self):
+        return self.in_waiting
+
+    def read(self, size=1):
+        if not self.is_open:
+            raise serial.serialutil.PortNotOpenError()
+        if len(self._pending) == 0 and not self._next_chunk():
+            # Nothing more to replay.
+            self._cancel.wait(self.timeout)
+            self._cancel.clear()
+            return b""
+        if self.realtime:
+            if self._t0 is None:
+                self._t0 = time.monotonic() - self._pending_t
+            _wait = self._pending_t - (time.monotonic() - self._t0)
+            if self.timeout is not None and _wait > self.timeout:
+                self._cancel.wait(self.timeout)
+                self._cancel.clear()
+                return b""
+            if _wait > 0 and self._cancel.wait(_wait):
+                self._cancel.clear()
+                return b""
+        _data = self._pending[:size]
+        self._pending = self._pending[size:]
+        return _data
+
+    def write(self, data):
+        if not self.is_open:
+            raise serial.serialutil.PortNotOpenError()
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def cancel_read(self):
+        self._cancel.set()
+
+    def reset_input_buffer(self):
+        pass
+
+
+def replay(filename, inform, realtime=False, stats=None):
+    """Feeds the bytes received in a capture file through a JEDI decoder, and
+    calls 'inform' with each payload. Returns the link counters of the
+    replay."""
+    _stats = JediLinkStats() if stats is None else stats
+    _decoder = JediDecoder(_stats)
+    _strt = time.monotonic()
+    for _t, _dir, _data in read_capture(filename):
+        if _dir != RX:
+            continue
+        if realtime:
+            _wait = _t - (time.monotonic() - _strt)
+            if _wait > 0:
+                time.sleep(_wait)
+        for _payload in _decoder.feed(_data):
+            inform(_payload)
+    return _stats
+
+
+def summary(filename):
+    """Returns the duration, the bytes in each direction and the frames of a
+    capture file."""
+    _res = {"seconds": 0.0, "rx_bytes": 0, "tx_bytes": 0,
+            "rx_chunks": 0, "tx_chunks": 0, "rx_frames": 0, "tx_frames": 0}
+    _decoders = {"rx": JediDecoder(), "tx": JediDecoder()}
+    for _t, _dir, _data in read_capture(filename):
+        _key = "rx" if _dir == RX else "tx"
+        _res[f"{_key}_bytes"] += len(_data)
+        _res[f"{_key}_chunks"] += 1
+        _res[f"{_key}_frames"] += len(_decoders[_key].feed(_data))
+        _res["seconds"] = _t
+    return _res
+
+
+if __name__ == "__main__":
+    # python jedicapture.py capture.jcap
+    _file = sys.argv[1]
+    for _k, _v in summary(_file).items():
+        sys.stdout.write(f"{_k:<20} {_v}\n")
+    _strt = time.perf_counter()
+    _stats = replay(_file, lambda payload: None)
+    _dur = time.perf_counter() - _strt
+    for _k, _v in _stats.as_dict().items():
+        sys.stdout.write(f"{_k:<20} {_v}\n")
+    sys.stdout.write(f"Replayed in {_dur:.3f}s "
+                     + f"({_stats.frames_decoded / _dur:.0f} frames/s).\n")
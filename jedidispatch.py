@@ -0,0 +1,114 @@
+"""Module for routing the packets received over JEDI to the parties waiting
+on them.
+
+The first byte of every ARIMU packet is the id of the command it is a
+response to, and the dispatcher routes the packets by this id. For each
+command there can be any number of one-shot waiters (served in the order
+they asked) and subscribers (which get every packet of that command, e.g.
+LISTFILES, GETFILEDATA and STARTSTREAM). Packets nobody is waiting for are
+handed to the listeners, counted and kept in a bounded backlog, so that
+nothing is dropped without a trace.
+
+Author: Sivakumar Balasubramanian
+Date: 17 October 2026
+Email: siva82kb@gmail.com
+"""
+
+import collections
+
+
+class JediDispatcher(object):
+    """Routes JEDI packets by command id."""
+    # Maximum number of unclaimed packets remembered.
+    UNCLAIMED_MAX_N = 256
+
+    def __init__(self) -> None:
+        self._waiters = collections.defaultdict(collections.deque)
+        self._subscribers = collections.defaultdict(list)
+        self._listeners = []
+        self._unclaimed = collections.deque(
+            maxlen=JediDispatcher.UNCLAIMED_MAX_N
+        )
+        # Book keeping.
+        self.dispatched_count = 0
+        self.unclaimed_count = 0
+        self.malformed_count = 0
+
+    @property
+    def unclaimed(self):
+        """List of the recent packets that no one was waiting for."""
+        return list(self._unclaimed)
+
+    def pending(self, cmd=None):
+        """Number of one-shot waiters for the command 'cmd', or for all
+        commands when 'cmd' is None."""
+        if cmd is not None:
+            return len(self._waiters.get(cmd, ()))
+        return sum(len(_w) for _w in self._waiters.values())
+
+    def expect(self, cmd, callback):
+        """Calls 'callback' with the next packet of the command 'cmd'."""
+        self._waiters[cmd].append(callback)
+
+    def cancel(self, cmd, callback):
+        """Removes a one-shot waiter that is no longer interested."""
+        try:
+            self._waiters[cmd].remove(callback)
+        except ValueError:
+            pass
+
+    def subscribe(self, cmd, callback):
+        """Calls 'callback' with every packet of the command 'cmd' till it
+        unsubscribes."""
+        self._subscribers[cmd].append(callback)
+
+    def unsubscribe(self, cmd, callback):
+        try:
+            self._subscribers[cmd].remove(callback)
+        except ValueError:
+            pass
+
+    def add_listener(self, callback):
+        """Calls 'callback' with every packet that no one was waiting for."""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        try:
+            self._listeners.remove(callback)
+        except ValueError:
+            pass
+
+    def claim(self, cmd):
+        """Removes and returns the oldest unclaimed packet of the command
+        'cmd', or None if there is no such packet."""
+        for _i, _payload in enumerate(self._unclaimed):
+            if _payload[0] == cmd:
+                del self._unclaimed[_i]
+                return _payload
+        return None
+
+    def dispatch(self, payload):
+        """Routes the given packet. Returns True if someone was waiting for
+        it."""
+        if len(payload) == 0:
+            self.malformed_count += 1
+            return False
+        self.dispatched_count += 1
+        _cmd = payload[0]
+        # Subscribers get all the packets of their command.
+        _subs = self._subscribers.get(_cmd)
+        if _subs:
+            for _cb in tuple(_subs):
+                _cb(payload)
+            return True
+        # One-shot waiters are served in order.
+        _waiters = self._waiters.get(_cmd)
+        if _waiters:
+            _waiters.popleft()(payload)
+            return True
+        # No one is waiting for this packet.
+        self.unclaimed_count += 1
+        self._unclaimed.append(payload)
+        for _cb in tuple(self._listeners):
+            _cb(payload)
+        return False
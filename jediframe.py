@@ -0,0 +1,210 @@
+"""Module implementing the framing of the JEDI serial communication protocol.
+
+A JEDI frame is made of a two byte header (0xFF 0xFF), a length byte N, N-1
+payload bytes and a checksum byte, which is the sum of all the preceding
+bytes of the frame modulo 256.
+
+Author: Sivakumar Balasubramanian
+Date: 17 October 2026
+Email: siva82kb@gmail.com
+"""
+
+import functools
+import queue
+import threading
+
+import serial
+
+JEDI_HEADER = b"\xff\xff"
+
+
+def encode_frame(payload):
+    """Returns the JEDI frame carrying the given payload as bytes. Frames of
+    single byte payloads (commands without arguments) are cached."""
+    if len(payload) == 1:
+        return command_frame(payload[0])
+    _N = len(payload) + 1
+    _frame = bytearray(JEDI_HEADER)
+    _frame.append(_N)
+    _frame += bytes(payload)
+    _frame.append((510 + _N + sum(_frame[3:])) & 0xff)
+    return bytes(_frame)
+
+
+@functools.lru_cache(maxsize=256)
+def command_frame(cmd):
+    """Returns the pre-encoded frame of the command 'cmd' with no
+    arguments."""
+    return bytes([0xff, 0xff, 2, cmd, (512 + cmd) & 0xff])
+
+
+class JediLinkStats(object):
+    """Counters of the health of a JEDI link. They are updated once per
+    chunk read or write, and not per byte."""
+    FIELDS = ("bytes_read",
+              "frames_decoded",
+              "checksum_failures",
+              "bytes_discarded",
+              "bad_length_frames",
+              "serial_exceptions",
+              "read_loops",
+              "bytes_written",
+              "frames_written",
+              "write_errors")
+    __slots__ = FIELDS
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self):
+        for _f in JediLinkStats.FIELDS:
+            setattr(self, _f, 0)
+
+    def as_dict(self):
+        """Returns the current values of the counters."""
+        return {_f: getattr(self, _f) for _f in JediLinkStats.FIELDS}
+
+
+class JediWriter(object):
+    """Writes JEDI frames to a port from its own thread.
+
+    send() only queues the frame, so a slow port never blocks the caller.
+    Frames queued back to back are joined and written out with one write().
+    """
+    # Largest number of bytes joined into one write.
+    MAX_WRITE_SIZE = 4096
+
+    def __init__(self, ser, name=None, stats=None) -> None:
+        self._ser = ser
+        self._queue = queue.SimpleQueue()
+        self.stats = JediLinkStats() if stats is None else stats
+        self._thread = threading.Thread(target=self._run, daemon=True,
+                                        name=name)
+        self._thread.start()
+
+    @property
+    def pending(self):
+        """Number of frames waiting to be written."""
+        return self._queue.qsize()
+
+    def send(self, frame):
+        """Queues the given frame (bytes) to be written."""
+        self._queue.put(frame)
+
+    def close(self, timeout=1.0):
+        """Writes out the frames queued so far and stops the thread."""
+        self._queue.put(None)
+        if threading.current_thread() is not self._thread:
+            self._thread.join(timeout)
+
+    def _run(self):
+        _stop = False
+        while not _stop:
+            _frame = self._queue.get()
+            if _frame is None:
+                return
+            # Join the frames that are already waiting.
+            _frames = [_frame]
+            _size = len(_frame)
+            while _size < JediWriter.MAX_WRITE_SIZE:
+                try:
+                    _frame = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if _frame is None:
+                    _stop = True
+                    break
+                _frames.append(_frame)
+                _size += len(_frame)
+            _out = b"".join(_frames)
+            try:
+                self._ser.write(_out)
+            except serial.serialutil.SerialException:
+                self.stats.write_errors += 1
+                continue
+            self.stats.frames_written += len(_frames)
+            self.stats.bytes_written += len(_out)
+
+
+class JediDecoder(object):
+    """Chunked JEDI frame decoder.
+
+    Bytes read from the port are fed in whatever chunks they arrive in, and
+    the complete frames found so far are returned. An incomplete frame at the
+    end of a chunk is held back till the rest of it arrives.
+
+    The payloads are returned as read-only memoryview slices of the received
+    chunk, so that no bytes are copied between the port and the handlers.
+    Handlers that need to hold on to a payload for long should copy it with
+    bytes(payload).
+
+    The health of the link is counted in 'stats', a JediLinkStats.
+    """
+    # Longest frame length (N) accepted.
+    MAX_FRAME_LENGTH = 255
+
+    def __init__(self, stats=None) -> None:
+        self._buf = b""
+        self.stats = JediLinkStats() if stats is None else stats
+
+    @property
+    def pending(self):
+        """Number of bytes held back waiting for the rest of a frame."""
+        return len(self._buf)
+
+    def reset(self):
+        """Drops any partially received frame."""
+        self._buf = b""
+
+    def feed(self, data):
+        """Adds the given bytes to the decoder and returns the list of
+        payloads of the full frames found."""
+        # Only the bytes held back from the last chunk are ever copied.
+        _buf = self._buf + data if self._buf else bytes(data)
+        _view = memoryview(_buf)
+        _frames = []
+        _end = len(_buf)
+        _pos = 0
+        # Number of bytes in the good frames, and of bad checksums.
+        _used = 0
+        _badsum = 0
+        _badlen = 0
+        while True:
+            # Look for the next header.
+            _hdr = _buf.find(JEDI_HEADER, _pos)
+            if _hdr < 0:
+                # A lone 0xFF at the end could be the start of a header.
+                _pos = _end - 1 if _end > _pos and _buf[-1] == 0xff else _end
+                break
+            # Wait for the length byte.
+            if _hdr + 2 >= _end:
+                _pos = _hdr
+                break
+            _N = _buf[_hdr + 2]
+            # Payload size cannot be zero.
+            if _N == 0 or _N > self.MAX_FRAME_LENGTH:
+                _badlen += 1
+                _pos = _hdr + 1
+                continue
+            # Wait for the full frame.
+            if _hdr + _N + 3 > _end:
+                _pos = _hdr
+                break
+            _pl = _view[_hdr + 3:_hdr + _N + 2]
+            if (510 + _N + sum(_pl)) & 0xff == _buf[_hdr + _N + 2]:
+                _frames.append(_pl)
+                _pos = _hdr + _N + 3
+                _used += _N + 3
+            else:
+                # Bad checksum. Resync from the byte after the header.
+                _badsum += 1
+                _pos = _hdr + 1
+        self._buf = _buf[_pos:]
+        # Update the link counters.
+        _stats = self.stats
+        _stats.bytes_read += len(data)
+        _stats.frames_decoded += len(_frames)
+        _stats.checksum_failures += _badsum
+        _stats.bad_length_frames += _badlen
+        _stats.bytes_discarded += _pos - _used
+        return _frames
@@ -0,0 +1,67 @@
+"""Module keeping the link health counters of the JEDI ports, and writing
+them periodically to a metrics file.
+
+Each port has one JediLinkStats, which lives for the whole program, so that
+the counters add up across reconnections. The metrics file has one JSON
+object per line, with the time and the counters of all the ports.
+
+Author: Sivakumar Balasubramanian
+Date: 17 October 2026
+Email: siva82kb@gmail.com
+"""
+
+import json
+import threading
+from datetime import datetime as dt
+
+from jediframe import JediLinkStats
+
+_link_stats = {}
+_link_stats_lock = threading.Lock()
+
+
+def link_stats(port):
+    """Returns the JediLinkStats of the given port."""
+    with _link_stats_lock:
+        if port not in _link_stats:
+            _link_stats[port] = JediLinkStats()
+        return _link_stats[port]
+
+
+def snapshot():
+    """Returns the current counters of all the ports."""
+    with _link_stats_lock:
+        return {_p: _s.as_dict() for _p, _s in _link_stats.items()}
+
+
+class JediMetricsWriter(threading.Thread):
+    """Appends a snapshot of the counters of all the ports to the metrics
+    file every 'period' seconds."""
+    # Default period (seconds) between snapshots.
+    PERIOD = 10.0
+
+    def __init__(self, filename, period=PERIOD) -> None:
+        super().__init__(daemon=True)
+        self.filename = filename
+        self.period = period
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.period):
+            self.write_snapshot()
+
+    def stop(self):
+        """Stops the thread after writing a last snapshot."""
+        self._stop_event.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join()
+        self.write_snapshot()
+
+    def write_snapshot(self):
+        _rec = {"time": dt.now().isoformat(),
+                "ports": snapshot()}
+        try:
+            with open(self.filename, "a") as _f:
+                _f.write(json.dumps(_rec) + "\n")
+        except OSError:
+            pass
@@ -0,0 +1,438 @@
+"""Module implementing the transports the JEDI ports can run on.
+
+A port is opened from a URL:
+
+    COM16, /dev/ttyUSB0     Serial port.
+    socket://host:port      TCP socket, e.g. a dock served with ser2net.
+    rfc2217://, loop://     Other pyserial URL handlers.
+    mem://name              In-process loopback link.
+    pty://                  Pseudo-terminal pair (device side only).
+    tcp://host:port         TCP server (device side only); the hub
+                            connects to it with socket://host:port.
+    replay://file[?realtime]
+                            Bytes received in a capture file (see
+                            jedicapture), replayed as fast as possible or
+                            with their recorded timing.
+
+All transports look like a pyserial port to the readers and writers: read(),
+write(), in_waiting, timeout, cancel_read(), close() and is_open. The hub
+opens its end of the link with open_port(), and a simulated device opens the
+other end with open_device(). The device end has the 'host_url' the hub
+should open.
+
+When a capture directory is set (set_capture_dir() or the JEDI_CAPTURE_DIR
+environment variable), all the bytes of every port opened by the hub are
+recorded to a capture file per port in that directory.
+
+Author: Sivakumar Balasubramanian
+Date: 17 October 2026
+Email: siva82kb@gmail.com
+"""
+
+import os
+import re
+import select
+import socket
+import struct
+import threading
+import time
+
+import serial
+
+from jedicapture import CapturePort, ReplayPort
+
+try:
+    import fcntl
+    import termios
+    import tty
+except ImportError:
+    # No pseudo-terminals (e.g. on Windows).
+    fcntl = termios = tty = None
+
+# URL schemes handled here.
+MEM_SCHEME = "mem://"
+PTY_SCHEME = "pty://"
+TCP_SCHEME = "tcp://"
+REPLAY_SCHEME = "replay://"
+
+# Directory the ports are captured to; None when not capturing.
+_capture_dir = os.environ.get("JEDI_CAPTURE_DIR") or None
+
+
+def set_capture_dir(path):
+    """Captures the ports opened from now on to the given directory. None
+    stops capturing."""
+    global _capture_dir
+    if path is not None:
+        os.makedirs(path, exist_ok=True)
+    _capture_dir = path
+
+
+def capture_filename(url):
+    """Returns the name of a new capture file for the port."""
+    _name = re.sub(r"[^A-Za-z0-9_.-]+", "_", url).strip("_")
+    return os.path.join(_capture_dir,
+                        f"{_name}_{time.strftime('%Y%m%d_%H%M%S')}.jcap")
+
+
+def open_port(url, baudrate=115200, timeout=None):
+    """Opens the hub end of the port with the given URL."""
+    _port = _open_port(url, baudrate, timeout)
+    if _capture_dir is not None and not url.startswith(REPLAY_SCHEME):
+        return CapturePort(_port, capture_filename(url))
+    return _port
+
+
+def _open_port(url, baudrate, timeout):
+    if url.startswith(REPLAY_SCHEME):
+        _file, _, _opts = url[len(REPLAY_SCHEME):].partition("?")
+        _port = ReplayPort(_file, realtime=(_opts == "realtime"),
+                           timeout=timeout)
+        _port.open()
+        return _port
+    if url.startswith(MEM_SCHEME):
+        _port = memory_link(url[len(MEM_SCHEME):]).host
+        _port.timeout = timeout
+        _port.open()
+        return _port
+    if url.startswith((PTY_SCHEME, TCP_SCHEME)):
+        raise ValueError(f"{url} can only be opened with open_device(); "
+                         + "open the device's 'host_url' instead.")
+    if "://" in url:
+        return serial.serial_for_url(url, baudrate=baudrate, timeout=timeout)
+    return serial.Serial(url, baudrate, timeout=timeout)
+
+
+def open_device(url="pty://", timeout=None):
+    """Opens the device end of a link, for simulated devices."""
+    if url.startswith(MEM_SCHEME):
+        _port = memory_link(url[len(MEM_SCHEME):]).device
+        _port.timeout = timeout
+        _port.open()
+        return _port
+    if url.startswith(PTY_SCHEME):
+        return PtyPort(timeout=timeout)
+    if url.startswith(TCP_SCHEME):
+        _host, _, _port = url[len(TCP_SCHEME):].rpartition(":")
+        return TcpServerPort(_host or "127.0.0.1", int(_port or 0),
+                             timeout=timeout)
+    raise ValueError(f"No device end for the port {url}.")
+
+
+def cancel_read(port):
+    """Unblocks a pending read on the port, where the port supports it."""
+    if hasattr(port, "cancel_read"):
+        port.cancel_read()
+
+
+class _ByteQueue(object):
+    """Bytes flowing in one direction of a memory link."""
+
+    def __init__(self) -> None:
+        self.buf = bytearray()
+        self.cond = threading.Condition()
+
+
+class MemoryPort(object):
+    """One end of an in-process loopback link. Bytes written to one end are
+    read from the other end, at memory speed. Like on a serial line, bytes
+    written while the other end is not open are lost, and reading raises a
+    SerialException once the other end has been closed."""
+
+    def __init__(self, name, rxq, txq) -> None:
+        self.port = name
+        self.timeout = None
+        self.is_open = False
+        self.peer = None
+        self._rxq = rxq
+        self._txq = txq
+        self._cancel = False
+        self._peer_closed = False
+
+    def isOpen(self):
+        return self.is_open
+
+    def open(self):
+        with self._rxq.cond:
+            self._rxq.buf.clear()
+            self.is_open = True
+            self._cancel = False
+        with self._txq.cond:
+            self.peer._peer_closed = False
+
+    def close(self):
+        with self._rxq.cond:
+            self.is_open = False
+            self._rxq.cond.notify_all()
+        with self._txq.cond:
+            self.peer._peer_closed = True
+            self._txq.cond.notify_all()
+
+    @property
+    def in_waiting(self):
+        return len(self._rxq.buf)
+
+    def inWaiting(self):
+        return self.in_waiting
+
+    def read(self, size=1):
+        """Reads 'size' bytes, or fewer if the timeout runs out first."""
+        _q = self._rxq
+        _deadline = (None if self.timeout is None
+                     else time.monotonic() + self.timeout)
+        with _q.cond:
+            while len(_q.buf) < size:
+                if not self.is_open:
+                    raise serial.serialutil.PortNotOpenError()
+                if self._cancel or self._peer_closed:
+                    break
+                _left = (None if _deadline is None
+                         else _deadline - time.monotonic())
+                if _left is not None and _left <= 0:
+                    break
+                _q.cond.wait(_left)
+            self._cancel = False
+            if len(_q.buf) == 0 and self._peer_closed:
+                raise serial.serialutil.SerialException(
+                    f"{self.port}: the other end is closed."
+                )
+            _data = bytes(_q.buf[:size])
+            del _q.buf[:size]
+            return _data
+
+    def write(self, data):
+        _q = self._txq
+        with _q.cond:
+            if not self.is_open:
+                raise serial.serialutil.PortNotOpenError()
+            if self.peer.is_open:
+                _q.buf += data
+                _q.cond.notify_all()
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def cancel_read(self):
+        with self._rxq.cond:
+            self._cancel = True
+            self._rxq.cond.notify_all()
+
+    def reset_input_buffer(self):
+        with self._rxq.cond:
+            self._rxq.buf.clear()
+
+
+class MemoryLink(object):
+    """A pair of connected memory ports, one for the hub and the other for
+    the device."""
+
+    def __init__(self, name) -> None:
+        _h2d = _ByteQueue()
+        _d2h = _ByteQueue()
+        self.name = name
+        self.host = MemoryPort(MEM_SCHEME + name, _d2h, _h2d)
+        self.device = MemoryPort(MEM_SCHEME + name, _h2d, _d2h)
+        self.host.peer = self.device
+        self.device.peer = self.host
+        self.device.host_url = MEM_SCHEME + name
+
+
+_memory_links = {}
+_memory_links_lock = threading.Lock()
+
+
+def memory_link(name):
+    """Returns the memory link with the given name, creating it if
+    needed."""
+    with _memory_links_lock:
+        if name not in _memory_links:
+            _memory_links[name] = MemoryLink(name)
+        return _memory_links[name]
+
+
+class PtyPort(object):
+    """The master end of a pseudo-terminal pair. The hub opens the slave end
+    ('host_url') as a serial port."""
+
+    def __init__(self, timeout=None) -> None:
+        self._master, self._slave = os.openpty()
+        # No echo or line editing of the bytes on the slave end.
+        tty.setraw(self._slave)
+        self.host_url = os.ttyname(self._slave)
+        self.port = self.host_url
+        self.timeout = timeout
+        self.is_open = True
+        self._cancel_r, self._cancel_w = os.pipe()
+
+    def isOpen(self):
+        return self.is_open
+
+    def open(self):
+        pass
+
+    def fileno(self):
+        return self._master
+
+    def close(self):
+        if not self.is_open:
+            return
+        self.cancel_read()
+        self.is_open = False
+        for _fd in (self._master, self._slave, self._cancel_r, self._cancel_w):
+            os.close(_fd)
+
+    @property
+    def in_waiting(self):
+        _n = fcntl.ioctl(self._master, termios.FIONREAD, b"\0\0\0\0")
+        return struct.unpack("I", _n)[0]
+
+    def inWaiting(self):
+        return self.in_waiting
+
+    def read(self, size=1):
+        """Reads 'size' bytes, or fewer if the timeout runs out first."""
+        if not self.is_open:
+            raise serial.serialutil.PortNotOpenError()
+        _data = bytearray()
+        _deadline = (None if self.timeout is None
+                     else time.monotonic() + self.timeout)
+        while len(_data) < size:
+            _left = (None if _deadline is None
+                     else max(0, _deadline - time.monotonic()))
+            try:
+                _ready, _, _ = select.select([self._master, self._cancel_r],
+                                             [], [], _left)
+                if self._cancel_r in _ready:
+                    os.read(self._cancel_r, 1024)
+                    break
+                if not _ready:
+                    break
+                _data += os.read(self._master, size - len(_data))
+            except (OSError, ValueError) as e:
+                # The port was closed from another thread.
+                raise serial.serialutil.SerialException(str(e))
+        return bytes(_data)
+
+    def write(self, data):
+        if not self.is_open:
+            raise serial.serialutil.PortNotOpenError()
+        _view = memoryview(data)
+        while len(_view):
+            try:
+                _n = os.write(self._master, _view)
+            except OSError as e:
+                raise serial.serialutil.SerialException(str(e))
+            _view = _view[_n:]
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def cancel_read(self):
+        if self.is_open:
+            os.write(self._cancel_w, b"x")
+
+    def reset_input_buffer(self):
+        while self.in_waiting:
+            os.read(self._master, self.in_waiting)
+
+
+class TcpServerPort(object):
+    """The device end of a TCP link. It listens on the given address and
+    serves one hub connection at a time. Bytes written while no hub is
+    connected are lost. read() returns as soon as some bytes arrive; the
+    bytes received beyond 'size' are kept for the next read, and counted by
+    in_waiting."""
+
+    def __init__(self, host="127.0.0.1", port=0, timeout=None) -> None:
+        self._srv = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        if os.name == "posix":
+            # On Windows, SO_REUSEADDR would let another socket take the port.
+            self._srv.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._srv.bind((host, port))
+        self._srv.listen()
+        _host, _port = self._srv.getsockname()[:2]
+        self.host_url = f"socket://{_host}:{_port}"
+        self.port = self.host_url
+        self.timeout = timeout
+        self.is_open = True
+        self._conn = None
+        # Bytes received but not read yet.
+        self._rxbuf = bytearray()
+
+    @property
+    def connected(self):
+        return self._conn is not None
+
+    def isOpen(self):
+        return self.is_open
+
+    def open(self):
+        pass
+
+    @property
+    def in_waiting(self):
+        return len(self._rxbuf)
+
+    def inWaiting(self):
+        return self.in_waiting
+
+    def read(self, size=1):
+        if not self.is_open:
+            raise serial.serialutil.PortNotOpenError()
+        if len(self._rxbuf) == 0:
+            self._rxbuf += self._recv()
+        _data = bytes(self._rxbuf[:size])
+        del self._rxbuf[:size]
+        return _data
+
+    def _recv(self):
+        """Waits for the bytes of the hub, and accepts a hub that connects.
+        Returns the bytes received, if any."""
+        _sock = self._conn if self._conn is not None else self._srv
+        try:
+            _ready, _, _ = select.select([_sock], [], [], self.timeout)
+            if not _ready:
+                return b""
+            if self._conn is None:
+                # A hub is connecting.
+                self._conn, _ = self._srv.accept()
+                self._conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                return b""
+            _data = self._conn.recv(4096)
+        except (OSError, ValueError) as e:
+            if not self.is_open:
+                raise serial.serialutil.SerialException(str(e))
+            _data = b""
+        if len(_data) == 0:
+            # The hub went away.
+            self.drop()
+        return _data
+
+    def write(self, data):
+        if not self.is_open:
+            raise serial.serialutil.PortNotOpenError()
+        if self._conn is not None:
+            try:
+                self._conn.sendall(data)
+            except OSError:
+                self.drop()
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drop(self):
+        """Drops the current hub connection."""
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except OSError:
+                pass
+            self._conn = None
+
+    def close(self):
+        self.is_open = False
+        self.drop()
+        self._srv.close()
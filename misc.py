@@ -1,37 +1,138 @@
-"""misc.py contains a assorted list of handy functions.
-
-Author: Sivakumar Balasubramanian
-Date: 25 July 2022
-Email: siva82kb@gmail.com
-"""
-
-import sys
-import time
-
-class ProgressBar(object):
-    """A console progress bar."""
-    
-    def __init__(self, params) -> None:
-        self.params = params
-        self._divsz = 100 / params['divs']
-        self._n = 0
-        
-    def update(self, value):
-        # Update progress bar
-        _prgrs = 100 * value / self.params["max_val"]
-        if _prgrs - (self._n + 1) * self._divsz > 0:
-            self._n += 1
-        return ("".join([chr(9608)] * self._n
-                         + [chr(32)] * (self.params['divs'] - self._n - 1)),
-                _prgrs)
-
-def shorten_str(longstr, l1, l2):
-    return longstr[:l1] + "..." + longstr[l2:]
-
-
-if __name__ == "__main__":
-    prgbar = ProgressBar(params={'divs': 40, 'max_val': 255})
-    for i in range(256):
-        _pb, _prcnt = prgbar.update(i)
-        sys.stdout.write("\r" + _pb + f"{_prcnt:5.1f}%")
+"""misc.py contains a assorted list of handy functions.
+
+Author: Sivakumar Balasubramanian
+Date: 25 July 2022
+Email: siva82kb@gmail.com
+"""
+
+import os
+import sys
+import time
+import zlib
+
+class ProgressBar(object):
+    """A console progress bar."""
+    
+    def __init__(self, params) -> None:
+        self.params = params
+        self._divsz = 100 / params['divs']
+        self._n = 0
+        
+    def update(self, value):
+        # Update progress bar
+        _prgrs = 100 * value / self.params["max_val"]
+        if _prgrs - (self._n + 1) * self._divsz > 0:
+            self._n += 1
+        return ("".join([chr(9608)] * self._n
+                         + [chr(32)] * (self.params['divs'] - self._n - 1)),
+                _prgrs)
+
+def shorten_str(longstr, l1, l2):
+    return longstr[:l1] + "..." + longstr[l2:]
+
+
+class PartFileWriter(object):
+    """Writes a file as '<filename>.part', and renames it to 'filename' only
+    once it is complete, so that a file of the final name is never partial.
+    If 'expected_size' is known (it can also be set after opening), commit()
+    fails when a different number of bytes was written.
+    
+    'fsync' is the durability policy: FSYNC_NEVER leaves the data to the OS,
+    FSYNC_ON_COMMIT syncs the file before it is renamed, and a number of
+    bytes also syncs after every that many bytes written. The CRC32 of the
+    data is kept as it is written."""
+    SUFFIX = ".part"
+    FSYNC_NEVER = None
+    FSYNC_ON_COMMIT = "commit"
+    BUFFER_SIZE = 256 * 1024
+
+    def __init__(self, filename, expected_size=None, fsync=FSYNC_ON_COMMIT,
+                 bufsize=BUFFER_SIZE) -> None:
+        self.filename = filename
+        self.partname = filename + PartFileWriter.SUFFIX
+        self.expected_size = expected_size
+        self.fsync = fsync
+        self.size = 0
+        self.crc32 = 0
+        self.committed = False
+        self._unsynced = 0
+        self._f = open(self.partname, "wb", buffering=bufsize)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if not self.committed:
+            self.abort()
+
+    @property
+    def closed(self):
+        return self._f.closed
+
+    @property
+    def checksum(self):
+        """CRC32 of the data written, in hex."""
+        return f"{self.crc32:08x}"
+
+    def write(self, data):
+        self._f.write(data)
+        self.size += len(data)
+        self.crc32 = zlib.crc32(data, self.crc32)
+        if isinstance(self.fsync, int):
+            self._unsynced += len(data)
+            if self._unsynced >= self.fsync:
+                self._sync()
+
+    def commit(self):
+        """Closes the file, and renames it to its final name if it has the
+        expected size. Returns if the file was committed; otherwise the part
+        file is removed."""
+        if self.expected_size is not None and self.size != self.expected_size:
+            self.abort()
+            return False
+        if self.fsync != PartFileWriter.FSYNC_NEVER:
+            self._sync()
+        self._f.close()
+        os.replace(self.partname, self.filename)
+        if self.fsync != PartFileWriter.FSYNC_NEVER:
+            _sync_dir(os.path.dirname(os.path.abspath(self.filename)))
+        self.committed = True
+        return True
+
+    def abort(self):
+        """Closes and removes the part file."""
+        if not self._f.closed:
+            self._f.close()
+        try:
+            os.remove(self.partname)
+        except FileNotFoundError:
+            pass
+
+    def _sync(self):
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self._unsynced = 0
+
+
+def _sync_dir(dirname):
+    """Makes a rename in the directory durable, where directories can be
+    synced."""
+    try:
+        _fd = os.open(dirname, os.O_RDONLY)
+    except OSError:
+        # e.g. Windows.
+        return
+    try:
+        os.fsync(_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(_fd)
+
+
+if __name__ == "__main__":
+    prgbar = ProgressBar(params={'divs': 40, 'max_val': 255})
+    for i in range(256):
+        _pb, _prcnt = prgbar.update(i)
+        sys.stdout.write("\r" + _pb + f"{_prcnt:5.1f}%")
         time.sleep(0.02)
\ No newline at end of file
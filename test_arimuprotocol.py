@@ -0,0 +1,92 @@
+"""Tests of the ARIMU command registry and the payload codecs."""
+
+import random
+import struct
+from datetime import datetime as dt
+
+import pytest
+
+from arimuprotocol import (COMMANDS,
+                           ArimuAdditionalFlags,
+                           ArimuCommands,
+                           FileListParser,
+                           decode_response,
+                           encode_request)
+
+
+def _response(cmd, data=b"", state=4, err=0):
+    return memoryview(bytes((cmd, state, err)) + data)
+
+
+def test_encode_request():
+    assert encode_request(ArimuCommands.PING) == b"\x01"
+    assert (encode_request(ArimuCommands.GETFILEDATA, "a_data_1.bin")
+            == b"\x03a_data_1.bin\x00")
+    _req = encode_request(ArimuCommands.SETTIME, dt(2026, 10, 17, 9, 8, 7, 60000))
+    assert _req[0] == ArimuCommands.SETTIME
+    assert struct.unpack("<7L", _req[1:]) == (26, 10, 17, 9, 8, 7, 6)
+
+
+def test_decode_device_time():
+    _data = struct.pack("<8L", 26, 10, 17, 9, 8, 7, 6, 123456)
+    _cmd, _st, _err, (_t, _micros) = decode_response(
+        _response(ArimuCommands.GETTIME, _data)
+    )
+    assert (_cmd, _st, _err) == (ArimuCommands.GETTIME, 4, 0)
+    assert _t == dt(2026, 10, 17, 9, 8, 7, 60000)
+    assert _micros == 123456
+
+
+def test_decode_text_and_flags():
+    assert decode_response(_response(ArimuCommands.PING, b"ARIMU_01"))[3] == "ARIMU_01"
+    _flag = bytes((ArimuAdditionalFlags.FILEDELETED,))
+    assert (decode_response(_response(ArimuCommands.DELETEFILE, _flag))[3]
+            == ArimuAdditionalFlags.FILEDELETED)
+    # Unknown commands keep their data as received.
+    assert bytes(decode_response(_response(200, b"xyz"))[3]) == b"xyz"
+
+
+def test_decode_file_data():
+    _get = ArimuCommands.GETFILEDATA
+    assert (decode_response(_response(_get, b"\x00"))[3]
+            == (ArimuAdditionalFlags.NOFILE,))
+    assert (decode_response(_response(_get, b"\x02" + struct.pack("<L", 4096)))[3]
+            == (ArimuAdditionalFlags.FILEHEADER, 4096))
+    _flag, _progress, _data = decode_response(_response(_get, b"\x03\xffabc"))[3]
+    assert (_flag, _progress, bytes(_data)) == (ArimuAdditionalFlags.FILECONTENT,
+                                                255, b"abc")
+
+
+def test_decode_short_data():
+    # Data shorter than the layout of the command is None.
+    assert decode_response(_response(ArimuCommands.GETTIME, b"\x01\x02"))[3] is None
+    assert decode_response(_response(ArimuCommands.DELETEFILE))[3] is None
+    assert decode_response(_response(ArimuCommands.GETFILEDATA, b"\x02\x01"))[3] is None
+    assert decode_response(_response(ArimuCommands.GETFILEDATA, b"\x03"))[3] is None
+    # A payload without the command, state and error is rejected.
+    for _payload in (b"", b"\x01", b"\x01\x04"):
+        with pytest.raises(ValueError):
+            decode_response(memoryview(_payload))
+
+
+def test_every_command_decodes_its_empty_response():
+    # A response with no data never raises, whatever the command.
+    for _cmd in COMMANDS:
+        decode_response(_response(_cmd))
+
+
+def test_file_list_any_chunking():
+    _names = [f"subj{_i % 3}_data_{1700000000 + _i}.bin" for _i in range(50)]
+    _text = "[" + ",".join(_names) + "]"
+    _rnd = random.Random(2)
+    _parser = FileListParser()
+    for _ in range(50):
+        _cuts = sorted(_rnd.sample(range(1, len(_text)), 12))
+        _got = []
+        for _a, _b in zip([0] + _cuts, _cuts + [len(_text)]):
+            _chunk = decode_response(_response(ArimuCommands.LISTFILES,
+                                               _text[_a:_b].encode()))[3]
+            _got += _parser.feed(_chunk)
+        assert _got == _names
+        assert _parser.done
+        assert _parser.count == len(_names)
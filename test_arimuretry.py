@@ -0,0 +1,166 @@
+"""Tests of the retrying of ARIMU commands, the circuit breaker and the
+latency watchdog."""
+
+import asyncio
+
+import pytest
+
+import arimuretry
+from arimuprotocol import ArimuCommands
+from arimuretry import (ArimuExecutor,
+                        CircuitBreaker,
+                        LatencyWatchdog,
+                        RetryPolicy)
+
+
+class _Clock(object):
+    """Stands for the time module of arimuretry, with a clock moved by
+    hand."""
+
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+
+class _Device(object):
+    """An ArimuAsync that answers each command with the next of the given
+    responses (None: no answer)."""
+
+    def __init__(self, *responses) -> None:
+        self.responses = list(responses)
+        self.sent = []
+
+    async def command(self, cmd, *args, timeout=None):
+        self.sent.append(cmd)
+        return self.responses.pop(0) if self.responses else None
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    _clock = _Clock()
+    monkeypatch.setattr(arimuretry, "time", _clock)
+    return _clock
+
+
+def _executor(device, attempts=4, **kwargs):
+    _policy = RetryPolicy(attempts=attempts, backoff=0.0, jitter=0)
+    return ArimuExecutor(device,
+                         policies={ArimuCommands.PING: _policy,
+                                   ArimuCommands.DELETEFILE: _policy},
+                         seed=1, **kwargs)
+
+
+def test_retry_delay():
+    _policy = RetryPolicy(backoff=0.1, max_backoff=0.3, jitter=0)
+    assert [_policy.delay(_i) for _i in range(4)] == pytest.approx(
+        [0.1, 0.2, 0.3, 0.3])
+    _policy = RetryPolicy(backoff=0.1, jitter=0.5)
+    assert all(0.05 <= _policy.delay(0) <= 0.1 for _ in range(100))
+
+
+def test_breaker_opens_after_threshold(clock):
+    _breaker = CircuitBreaker(threshold=3, reset_period=5.0)
+    for _ in range(2):
+        _breaker.failure()
+    assert _breaker.state == CircuitBreaker.CLOSED
+    _breaker.failure()
+    assert _breaker.state == CircuitBreaker.OPEN
+    assert not _breaker.allow()
+    assert _breaker.opened_count == 1
+
+
+def test_breaker_half_opens_after_reset(clock):
+    _breaker = CircuitBreaker(threshold=1, reset_period=5.0)
+    _breaker.failure()
+    clock.now += 4.9
+    assert _breaker.state == CircuitBreaker.OPEN
+    clock.now += 0.1
+    assert _breaker.state == CircuitBreaker.HALF_OPEN
+    assert _breaker.allow()
+    # The attempt let through fails: open again, for another period.
+    _breaker.failure()
+    assert _breaker.state == CircuitBreaker.OPEN
+    assert _breaker.opened_count == 2
+    clock.now += 5.0
+    _breaker.success()
+    assert _breaker.state == CircuitBreaker.CLOSED
+
+
+def test_retried_until_accepted():
+    _dev = _Device(None, (ArimuCommands.PING, 0, 0, "junk"),
+                   (ArimuCommands.PING, 0, 0, "ARIMU_01"))
+    _exec = _executor(_dev)
+    _resp = asyncio.run(_exec.command(ArimuCommands.PING,
+                                      accept=lambda r: "ARIMU" in r[3]))
+    assert _resp[3] == "ARIMU_01"
+    assert len(_dev.sent) == 3
+    _stats = _exec.as_dict()["commands"]["PING"]
+    assert (_stats["successes"], _stats["attempts"], _stats["retries"]) == (1, 3, 2)
+
+
+def test_open_breaker_rejects_commands(clock):
+    _dev = _Device()
+    _exec = _executor(_dev, attempts=4,
+                      breaker=CircuitBreaker(threshold=2, reset_period=5.0))
+    assert asyncio.run(_exec.command(ArimuCommands.PING)) is None
+    # Two attempts opened the breaker; the other two were not sent.
+    assert len(_dev.sent) == 2
+    assert _exec.stats["PING"].rejected == 1
+    assert asyncio.run(_exec.command(ArimuCommands.PING)) is None
+    assert len(_dev.sent) == 2
+    # One attempt once the reset period is over.
+    clock.now += 5.0
+    assert asyncio.run(_exec.command(ArimuCommands.PING)) is None
+    assert len(_dev.sent) == 3
+
+
+def test_non_idempotent_not_retried():
+    _dev = _Device()
+    _exec = _executor(_dev)
+    assert asyncio.run(_exec.command(ArimuCommands.DELETEFILE, "a_data_1.bin")) is None
+    assert _dev.sent == [ArimuCommands.DELETEFILE]
+    assert _exec.stats["DELETEFILE"].retries == 0
+
+
+def test_non_idempotent_retried_when_verified():
+    _dev = _Device(None, (ArimuCommands.DELETEFILE, 0, 0, 1))
+    _exec = _executor(_dev)
+    _checks = []
+
+    async def _verify():
+        _checks.append(True)
+        return True
+
+    _resp = asyncio.run(_exec.command(ArimuCommands.DELETEFILE, "a_data_1.bin",
+                                      verify=_verify))
+    assert _resp is not None
+    assert len(_dev.sent) == 2
+    assert len(_checks) == 1
+
+
+def test_watchdog_timeout_follows_latency(clock):
+    _dog = LatencyWatchdog(initial=5.0, min_timeout=0.5, max_timeout=30.0)
+    assert _dog.timeout == 5.0
+    _dog.start()
+    for _ in range(50):
+        clock.now += 0.2
+        _dog.packet()
+    # Steady packets: close to the time between them, at least the minimum.
+    assert _dog.srtt == pytest.approx(0.2)
+    assert 0.5 <= _dog.timeout < 1.0
+    clock.now += 0.4
+    assert not _dog.expired()
+    clock.now += _dog.timeout
+    assert _dog.expired()
+    # Slower packets make the timeout longer, up to the maximum.
+    _fast = _dog.timeout
+    for _ in range(50):
+        clock.now += 4.0
+        _dog.packet()
+    assert _fast < _dog.timeout <= 30.0
+    for _ in range(50):
+        clock.now += 60.0
+        _dog.packet()
+    assert _dog.timeout == 30.0
@@ -0,0 +1,143 @@
+"""Tests of the ordering of the files to download."""
+
+import time
+
+import pytest
+
+from arimuretry import RetryPolicy
+from arimuschedule import (LISTED,
+                           NEWEST_FIRST,
+                           SMALLEST_FIRST,
+                           DownloadScheduler,
+                           file_epoch,
+                           file_subject)
+
+NAMES = ["a_data_100.bin", "b_data_150.bin", "a_data_200.bin",
+         "a_data_300.bin", "b_data_400.bin"]
+
+
+def _drain(scheduler):
+    _names = []
+    while True:
+        _name = scheduler.pop()
+        if _name is None:
+            return _names
+        _names.append(_name)
+
+
+def _scheduler(*args, **kwargs):
+    _sched = DownloadScheduler(*args, **kwargs)
+    _sched.add_many(NAMES)
+    return _sched
+
+
+def test_file_names():
+    assert file_subject("a_data_100.bin") == "a"
+    assert file_epoch("a_data_100.bin") == 100
+    assert file_epoch("a_data_notes.bin") is None
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        DownloadScheduler("oldest")
+
+
+def test_listed():
+    _sched = _scheduler(LISTED)
+    assert _sched.incremental
+    assert len(_sched) == len(NAMES)
+    assert _drain(_sched) == NAMES
+    assert len(_sched) == 0
+
+
+def test_newest_first():
+    _sched = _scheduler(NEWEST_FIRST)
+    assert not _sched.incremental
+    assert _drain(_sched) == sorted(NAMES, key=file_epoch, reverse=True)
+
+
+def test_fair_subjects_take_turns():
+    _names = _drain(_scheduler(NEWEST_FIRST, fair=True))
+    assert [file_subject(_n) for _n in _names] == ["a", "b", "a", "b", "a"]
+    assert _names[:2] == ["a_data_300.bin", "b_data_400.bin"]
+
+
+def test_smallest_first():
+    _sched = DownloadScheduler(SMALLEST_FIRST)
+    _sched.add_many(NAMES)
+    # The files of 'a' cover 100 s each, and 'b_data_150' covers 250 s.
+    _names = _drain(_sched)
+    assert _names.index("b_data_150.bin") > _names.index("a_data_100.bin")
+    assert _names.index("b_data_150.bin") > _names.index("a_data_200.bin")
+    # Known sizes come before the estimates.
+    _sched = DownloadScheduler(SMALLEST_FIRST)
+    _sched.add("a_data_100.bin", size=10 ** 9)
+    _sched.add("a_data_200.bin", size=10)
+    assert _drain(_sched) == ["a_data_200.bin", "a_data_100.bin"]
+
+
+def test_names_without_epoch():
+    _sched = DownloadScheduler(NEWEST_FIRST)
+    _sched.add_many(["a_data_x.bin", "a_data_100.bin", "a_data_y.bin",
+                     "a_data_200.bin"])
+    assert _drain(_sched) == ["a_data_200.bin", "a_data_100.bin",
+                              "a_data_x.bin", "a_data_y.bin"]
+    _sched = DownloadScheduler(SMALLEST_FIRST, deadline=60)
+    _sched.add_many(["a_data_x.bin", "a_data_100.bin"])
+    assert sorted(_drain(_sched)) == ["a_data_100.bin", "a_data_x.bin"]
+
+
+def test_deadline_leaves_files_that_do_not_fit_to_the_end():
+    _sched = DownloadScheduler(LISTED, deadline=10, kBps=10)
+    _sched.add("a_data_100.bin", size=1 << 20)
+    _sched.add("a_data_200.bin", size=1 << 10)
+    assert not _sched.fits("a_data_100.bin")
+    assert _sched.fits("a_data_200.bin")
+    assert _drain(_sched) == ["a_data_200.bin", "a_data_100.bin"]
+
+
+def test_remove():
+    _sched = _scheduler(LISTED)
+    _sched.remove("a_data_200.bin")
+    assert "a_data_200.bin" not in _sched
+    assert "a_data_200.bin" not in _drain(_sched)
+
+
+def test_failed_files_retried_after_backoff():
+    _retry = RetryPolicy(attempts=3, backoff=0.05, max_backoff=0.05, jitter=0)
+    _sched = DownloadScheduler(LISTED, retry=_retry)
+    _sched.add("a_data_100.bin")
+    assert _sched.pop() == "a_data_100.bin"
+    assert _sched.failed("a_data_100.bin")
+    # Not before its backoff is over.
+    assert _sched.pop() is None
+    assert 0 < _sched.retry_wait() <= 0.05
+    time.sleep(0.06)
+    assert _sched.pop() == "a_data_100.bin"
+    assert _sched.failed("a_data_100.bin")
+    time.sleep(0.06)
+    assert _sched.pop() == "a_data_100.bin"
+    # Out of attempts.
+    assert not _sched.failed("a_data_100.bin")
+    assert _sched.retry_wait() is None
+    assert _sched.pop() is None
+
+
+def test_retry_budget():
+    _retry = RetryPolicy(attempts=5, backoff=0.0, jitter=0)
+    _sched = DownloadScheduler(LISTED, retry=_retry, retry_budget=1)
+    _sched.add_many(NAMES[:2])
+    assert _sched.failed(_sched.pop())
+    assert not _sched.failed(_sched.pop())
+
+
+def test_rates():
+    _sched = DownloadScheduler(LISTED)
+    _kBps = _sched.kBps
+    _sched.update_rate(100 * 1024, 1.0)
+    assert _sched.kBps > _kBps
+    _sched.update_rate(0, 1.0)
+    _sched.update_rate(1024, 0.0)
+    _sched.add_many(["a_data_100.bin", "a_data_200.bin"])
+    _sched.done("a_data_100.bin", 100)
+    assert _sched.estimate_size("a_data_100.bin") == 100
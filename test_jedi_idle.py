@@ -0,0 +1,18 @@
+"""Tests of the CPU used by a JEDI reader thread with nothing to read."""
+
+import os
+
+import pytest
+
+from arimubench import bench_idle_reader_cpu
+
+# CPU time (seconds) a waiting reader may use per second. A reader that
+# blocks on the port uses next to none; one that spins uses a whole core.
+MAX_CPU_PER_IDLE_SECOND = 0.05
+
+
+@pytest.mark.skipif(not hasattr(os, "openpty"),
+                    reason="needs pseudo-terminals")
+def test_idle_reader_blocks():
+    _res = bench_idle_reader_cpu(seconds=1.0)
+    assert _res["cpu_per_idle_second"] < MAX_CPU_PER_IDLE_SECOND
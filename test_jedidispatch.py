@@ -0,0 +1,86 @@
+"""Tests of the routing of JEDI packets by command id."""
+
+from jedidispatch import JediDispatcher
+
+
+def test_waiters_served_in_order():
+    _disp = JediDispatcher()
+    _got = []
+    _disp.expect(1, lambda p: _got.append(("a", p)))
+    _disp.expect(1, lambda p: _got.append(("b", p)))
+    assert _disp.pending(1) == 2
+    assert _disp.dispatch(b"\x01x")
+    assert _disp.dispatch(b"\x01y")
+    assert _got == [("a", b"\x01x"), ("b", b"\x01y")]
+    assert _disp.pending() == 0
+
+
+def test_cancelled_waiter_not_called():
+    _disp = JediDispatcher()
+    _got = []
+    _cb = _got.append
+    _disp.expect(1, _cb)
+    _disp.cancel(1, _cb)
+    _disp.cancel(1, _cb)
+    assert not _disp.dispatch(b"\x01")
+    assert _got == []
+
+
+def test_subscribers_get_every_packet():
+    _disp = JediDispatcher()
+    _sub, _once = [], []
+    _disp.subscribe(2, _sub.append)
+    _disp.expect(2, _once.append)
+    for _p in (b"\x02a", b"\x02b"):
+        _disp.dispatch(_p)
+    # The subscriber has the packets; the one-shot waiter is still waiting.
+    assert _sub == [b"\x02a", b"\x02b"]
+    assert _once == []
+    _disp.unsubscribe(2, _sub.append)
+    _disp.dispatch(b"\x02c")
+    assert _sub == [b"\x02a", b"\x02b"]
+    assert _once == [b"\x02c"]
+
+
+def test_unsubscribe_while_dispatching():
+    _disp = JediDispatcher()
+    _got = []
+
+    def _last(payload):
+        _got.append(payload)
+        _disp.unsubscribe(3, _last)
+
+    _disp.subscribe(3, _last)
+    _disp.dispatch(b"\x03a")
+    _disp.dispatch(b"\x03b")
+    assert _got == [b"\x03a"]
+
+
+def test_unclaimed_packets_kept_and_claimed():
+    _disp = JediDispatcher()
+    _heard = []
+    _disp.add_listener(_heard.append)
+    assert not _disp.dispatch(b"\x05a")
+    assert not _disp.dispatch(b"\x06b")
+    assert not _disp.dispatch(b"\x05c")
+    assert _heard == [b"\x05a", b"\x06b", b"\x05c"]
+    assert _disp.unclaimed_count == 3
+    assert _disp.claim(5) == b"\x05a"
+    assert _disp.claim(5) == b"\x05c"
+    assert _disp.claim(5) is None
+    assert _disp.unclaimed == [b"\x06b"]
+
+
+def test_unclaimed_backlog_bounded():
+    _disp = JediDispatcher()
+    for _i in range(JediDispatcher.UNCLAIMED_MAX_N + 10):
+        _disp.dispatch(bytes([9, _i % 256]))
+    assert len(_disp.unclaimed) == JediDispatcher.UNCLAIMED_MAX_N
+    assert _disp.unclaimed_count == JediDispatcher.UNCLAIMED_MAX_N + 10
+
+
+def test_empty_packet_is_malformed():
+    _disp = JediDispatcher()
+    assert not _disp.dispatch(b"")
+    assert _disp.malformed_count == 1
+    assert _disp.dispatched_count == 0
@@ -0,0 +1,78 @@
+"""Tests of the JEDI frame encoder and the chunked decoder."""
+
+import random
+
+from jediframe import JediDecoder, encode_frame
+
+PAYLOADS = [b"\x01", b"\x07\x04\x00" + bytes(range(32)), b"\xff\xff\x00\xff",
+            bytes(range(250))]
+
+
+def _decode_in_chunks(data, sizes):
+    _dec = JediDecoder()
+    _payloads = []
+    _pos = 0
+    for _n in sizes:
+        _payloads += [bytes(_p) for _p in _dec.feed(data[_pos:_pos + _n])]
+        _pos += _n
+    _payloads += [bytes(_p) for _p in _dec.feed(data[_pos:])]
+    return _dec, _payloads
+
+
+def test_encode_frame():
+    assert encode_frame(b"\x01") == b"\xff\xff\x02\x01\x01"
+    assert encode_frame(b"\x06\x10") == bytes([0xff, 0xff, 3, 6, 16,
+                                               (510 + 3 + 6 + 16) & 0xff])
+
+
+def test_decode_any_chunking():
+    _data = b"".join(encode_frame(_p) for _p in PAYLOADS)
+    _rnd = random.Random(1)
+    for _ in range(100):
+        _sizes = [_rnd.randint(1, 64) for _ in range(len(_data) // 8)]
+        _dec, _payloads = _decode_in_chunks(_data, _sizes)
+        assert _payloads == PAYLOADS
+        assert _dec.pending == 0
+        assert _dec.stats.frames_decoded == len(PAYLOADS)
+        assert _dec.stats.bytes_discarded == 0
+
+
+def test_partial_frame_held_back():
+    _frame = encode_frame(b"\x02abc")
+    _dec = JediDecoder()
+    assert _dec.feed(_frame[:-1]) == []
+    assert _dec.pending == len(_frame) - 1
+    assert [bytes(_p) for _p in _dec.feed(_frame[-1:])] == [b"\x02abc"]
+    # A lone 0xFF at the end may start the next header.
+    assert _dec.feed(b"\x00\xff") == []
+    assert _dec.pending == 1
+
+
+def test_resync_after_corruption():
+    _good = encode_frame(b"\x01ARIMU")
+    _bad = bytearray(encode_frame(b"\x01lost"))
+    _bad[-1] ^= 0xff
+    _data = b"junk" + bytes(_bad) + b"\xff\xff\x00" + _good
+    _dec, _payloads = _decode_in_chunks(_data, [3] * (len(_data) // 3))
+    assert _payloads == [b"\x01ARIMU"]
+    assert _dec.stats.checksum_failures == 1
+    assert _dec.stats.bad_length_frames == 1
+    assert _dec.stats.bytes_discarded == len(_data) - len(_good)
+
+
+def test_reset_drops_partial_frame():
+    _dec = JediDecoder()
+    _dec.feed(encode_frame(b"\x02abc")[:4])
+    _dec.reset()
+    assert _dec.pending == 0
+    assert [bytes(_p) for _p in _dec.feed(encode_frame(b"\x01"))] == [b"\x01"]
+
+
+def test_payloads_are_readonly_views():
+    _chunk = encode_frame(b"\x03\x03\xffdata") + encode_frame(b"\x01")
+    _payloads = JediDecoder().feed(_chunk)
+    assert all(isinstance(_p, memoryview) and _p.readonly
+               for _p in _payloads)
+    assert [bytes(_p) for _p in _payloads] == [b"\x03\x03\xffdata", b"\x01"]
+    # Views of the same received chunk, with nothing copied.
+    assert _payloads[0].obj is _payloads[1].obj